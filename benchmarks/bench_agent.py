@@ -0,0 +1,17 @@
+from agent import Agent
+from gym_tictactoe.envs.tictactoe_env import TicTacToeEnv
+
+from benchmarks.harness import benchmark
+
+
+def agent_run(n_cycles):
+    agent = Agent(rng=0)
+    env = TicTacToeEnv()
+    env.seed(0)
+    env.reset()
+    return lambda: agent.run(env, n=n_cycles, render=False)
+
+
+# ops: cognitive cycles per call
+benchmark('agent.run', number=1, ops=100, n_cycles=[100])(agent_run)
+benchmark('agent.run', number=1, ops=1000, repeat=1, n_cycles=[1000])(agent_run)
@@ -0,0 +1,31 @@
+from gym_tictactoe.envs.board import Board, BitBoard, X, O
+
+from benchmarks.harness import benchmark
+
+# Mid-game position without a winner: X at 0, 4, 5 and O at 3, 8
+MID_GAME = [(0, X), (3, O), (4, X), (8, O), (5, X)]
+
+
+def mid_game_board(board_class, size=3):
+    board = board_class(size)
+    for pos, mark in MID_GAME:
+        board[pos] = mark
+    return board
+
+
+@benchmark('board.has_winner', board_class=[Board, BitBoard])
+def has_winner(board_class):
+    board = mid_game_board(board_class)
+    return board.has_winner
+
+
+@benchmark('board.has_winner_last_move', board_class=[Board, BitBoard], size=[3, 7])
+def has_winner_last_move(board_class, size):
+    board = mid_game_board(board_class, size)
+    return lambda: board.has_winner(5)
+
+
+@benchmark('board.blanks', board_class=[Board, BitBoard])
+def blanks(board_class):
+    board = mid_game_board(board_class)
+    return lambda: board.blanks
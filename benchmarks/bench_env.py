@@ -0,0 +1,44 @@
+import numpy as np
+
+from gym_tictactoe.envs.board import Board, BitBoard
+from gym_tictactoe.envs.tictactoe_env import TicTacToeEnv
+from gym_tictactoe.envs.tictactoe_vec_env import TicTacToeVecEnv
+
+from benchmarks.harness import benchmark
+
+
+def env_stepper(env):
+    env.seed(0)
+    env.reset()
+
+    def step():
+        obs, reward, done, info = env.step(('move', env._board.blanks[0]))
+        if done:
+            env.reset()
+
+    return step
+
+
+@benchmark('env.step', board_class=[Board, BitBoard], fast=[False, True])
+def env_step(board_class, fast):
+    return env_stepper(TicTacToeEnv(board_class=board_class, fast=fast))
+
+
+@benchmark('env.step_opponent', opponent=['random', 'heuristic', 'perfect'])
+def env_step_opponent(opponent):
+    return env_stepper(TicTacToeEnv(board_class=BitBoard, fast=True, opponent=opponent))
+
+
+def vec_env_step(n_envs):
+    env = TicTacToeVecEnv(n_envs=n_envs)
+    env.seed(0)
+    env.reset()
+    actions = np.random.default_rng(0).integers(9, size=(64, n_envs))
+    steps = iter(range(1 << 62))
+
+    return lambda: env.step(actions[next(steps) % 64])
+
+
+# ops: game steps per call
+for n_envs in [64, 1024]:
+    benchmark('vec_env.step', ops=n_envs, n_envs=[n_envs])(vec_env_step)
@@ -0,0 +1,109 @@
+import os
+import tempfile
+
+import numpy as np
+
+from agent import create_feature_detectors, create_feature_detector_bank
+from common import CognitiveContent, Coalition, CurrentSituationalModel, GarbageCollector, ProceduralMemory, \
+    Scheme, AttentionCodelet, Action, SensoryMemory, TransientEpisodicMemory, \
+    DeclarativeMemory, match_pct
+
+from benchmarks.harness import benchmark
+
+
+def random_context(rng):
+    # A board as the set of its position nodes plus a feeling node
+    marks = rng.choice(['X', 'O', 'B'], size=9)
+    return [CognitiveContent('{}_{}'.format(mark, pos)) for pos, mark in enumerate(marks)] + \
+           [CognitiveContent(rng.choice(['happy', 'sad']))]
+
+
+def random_broadcast(rng):
+    csm = CurrentSituationalModel()
+    return Coalition(random_context(rng), AttentionCodelet(domain=csm))
+
+
+@benchmark('sensory_memory.features', bank=[False, True])
+def sensory_memory_features(bank):
+    memory = SensoryMemory(create_feature_detector_bank() if bank else create_feature_detectors())
+    sensors = (np.array([1, 0, 0, 0, -1, 0, 0, 0, 0]), 0)
+
+    def detect():
+        memory.receive_sensors(sensors)
+        return memory.detected_features
+
+    return detect
+
+
+@benchmark('match_pct')
+def bench_match_pct():
+    rng = np.random.default_rng(0)
+    context, content = random_context(rng), random_context(rng)
+    return lambda: match_pct(context, content)
+
+
+def procedural_memory(n_schemes):
+    rng = np.random.default_rng(0)
+    schemes = [Scheme(context=random_context(rng), action=Action('move', int(rng.integers(9))))
+               for i in range(n_schemes)]
+    return ProceduralMemory(initial_schemes=schemes, rng=rng), random_broadcast(rng)
+
+
+@benchmark('procedural_memory.activate_schemes', number=1, n_schemes=[100, 1000, 10000, 100000])
+def activate_schemes(n_schemes):
+    memory, broadcast = procedural_memory(n_schemes)
+    return lambda: memory.activate_schemes(broadcast)
+
+
+@benchmark('procedural_memory.candidate_behaviors', number=1, n_schemes=[100, 1000, 10000, 100000])
+def candidate_behaviors(n_schemes):
+    memory, broadcast = procedural_memory(n_schemes)
+    memory.activate_schemes(broadcast)
+    return lambda: memory.candidate_behaviors
+
+
+@benchmark('garbage_collector.csm', number=1, csm_size=[100, 1000, 10000])
+def garbage_collector(csm_size):
+    # Half of the content has decayed below the removal threshold
+    csm = CurrentSituationalModel()
+    csm.receive_content([CognitiveContent('node_{}'.format(i), current_activation=float(i % 2))
+                         for i in range(csm_size)])
+    return lambda: GarbageCollector(csm, 'current_activation')
+
+
+@benchmark('episodic_memory.store', n_episodes=[0, 1000, 10000])
+def episodic_memory_store(n_episodes):
+    # The cost of storing an episode does not depend on how many were stored before
+    rng = np.random.default_rng(0)
+    memory = TransientEpisodicMemory(rng=rng)
+    memory.store_episodes([random_context(rng) for i in range(n_episodes)])
+    episode = random_context(rng)
+    return lambda: memory.store(episode)
+
+
+# Declarative memory stores by number of entries, shared by the repetitions of a benchmark
+_store_directory = tempfile.TemporaryDirectory()
+_stores = {}
+
+
+def declarative_memory(n_entries):
+    if n_entries not in _stores:
+        rng = np.random.default_rng(0)
+        memory = DeclarativeMemory(os.path.join(_store_directory.name, 'store_{}'.format(n_entries)))
+        memory.store_entries([(random_context(rng), 1.0) for i in range(n_entries)])
+        memory.flush()
+        _stores[n_entries] = memory
+    return _stores[n_entries]
+
+
+@benchmark('declarative_memory.receive_cue', n_entries=[1000, 100000, 1000000])
+def declarative_memory_receive_cue(n_entries):
+    memory = declarative_memory(n_entries)
+    cue = CognitiveContent('X_4')
+    return lambda: memory.receive_cue(cue)
+
+
+@benchmark('declarative_memory.open', number=1, n_entries=[1000, 100000, 1000000])
+def declarative_memory_open(n_entries):
+    path = declarative_memory(n_entries).path
+    return lambda: DeclarativeMemory(path, mode='r')
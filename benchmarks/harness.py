@@ -0,0 +1,128 @@
+import collections
+import itertools
+import json
+import platform
+import time
+
+Benchmark = collections.namedtuple('Benchmark', ['name', 'factory', 'params', 'number', 'ops', 'repeat'])
+
+# Registered benchmarks in definition order
+registry = []
+
+
+def benchmark(name, number=None, ops=1, repeat=None, **param_grid):
+    """
+    Registers a benchmark factory, once for every combination of the parameter values in param_grid.
+
+    The factory is called with one combination of parameters before every timed repetition and must return the
+    callable to time, so that setup is never included in the timings.
+    :param number: calls per repetition (None -> calibrated to take at least the runner's min_time)
+    :param ops: operations performed per call (timings are reported per operation)
+    :param repeat: repetitions (None -> the runner's default)
+    """
+    def decorator(factory):
+        for values in itertools.product(*param_grid.values()):
+            params = collections.OrderedDict(zip(param_grid, values))
+            full_name = name
+            if params:
+                full_name += '[' + ','.join('{}={}'.format(k, getattr(v, '__name__', v))
+                                            for k, v in params.items()) + ']'
+            registry.append(Benchmark(full_name, factory, params, number, ops, repeat))
+        return factory
+
+    return decorator
+
+
+def _calibrate(func, min_time):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    return max(1, min(1000000, int(min_time / max(elapsed, 1e-9))))
+
+
+def time_benchmark(bench, repeat=3, min_time=0.1):
+    """
+    Times a benchmark and returns its best and mean seconds per operation.
+    """
+    times = []
+    for r in range(bench.repeat or repeat):
+        func = bench.factory(**bench.params)
+        number = bench.number or _calibrate(func, min_time)
+
+        start = time.perf_counter()
+        for i in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+
+        times.append(elapsed / (number * bench.ops))
+
+    best = min(times)
+    return {'seconds': best,
+            'mean_seconds': sum(times) / len(times),
+            'ops_per_second': 1.0 / best if best > 0 else float('inf'),
+            'repeat': len(times)
+            }
+
+
+def select(name_filter=None, max_scale=None):
+    """
+    Returns the registered benchmarks whose name contains name_filter and whose integer parameters do not exceed
+    max_scale.
+    """
+    selected = []
+    for bench in registry:
+        if name_filter is not None and name_filter not in bench.name:
+            continue
+        if max_scale is not None and any(isinstance(v, int) and not isinstance(v, bool) and v > max_scale
+                                         for v in bench.params.values()):
+            continue
+        selected.append(bench)
+    return selected
+
+
+def run(benchmarks, repeat=3, min_time=0.1, report=None):
+    results = collections.OrderedDict()
+    for bench in benchmarks:
+        results[bench.name] = time_benchmark(bench, repeat=repeat, min_time=min_time)
+        if report is not None:
+            report(bench.name, results[bench.name])
+    return results
+
+
+def save(results, path):
+    with open(path, 'w') as file:
+        json.dump({'machine': platform.platform(),
+                   'python': platform.python_version(),
+                   'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                   'results': results}, file, indent=1)
+
+
+def load(path):
+    with open(path) as file:
+        return json.load(file)['results']
+
+
+Comparison = collections.namedtuple('Comparison', ['name', 'baseline', 'current', 'ratio', 'regression'])
+
+
+def compare(results, baseline, tolerance=0.25):
+    """
+    Compares results against a baseline.  A benchmark regresses when its time per operation grew by more than
+    tolerance (as a fraction of the baseline).  Benchmarks missing from either side are skipped.
+    """
+    comparisons = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]['seconds']
+        after = result['seconds']
+        ratio = after / before if before > 0 else float('inf')
+        comparisons.append(Comparison(name, before, after, ratio, ratio > 1.0 + tolerance))
+    return comparisons
+
+
+def format_seconds(seconds):
+    for unit, factor in [('s', 1.0), ('ms', 1e-3), ('us', 1e-6)]:
+        if seconds >= factor:
+            return '{:.3f} {}'.format(seconds / factor, unit)
+    return '{:.1f} ns'.format(seconds / 1e-9)
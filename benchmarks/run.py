@@ -0,0 +1,67 @@
+"""
+Runs the benchmark suite, saves the results as JSON and compares them against a baseline.
+
+    python benchmarks/run.py --save-baseline baseline.json
+    python benchmarks/run.py --output results.json --baseline baseline.json
+    python benchmarks/run.py --filter board --max-scale 1000
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'src')]
+
+import logging
+logging.disable(logging.WARNING)
+
+from benchmarks import harness
+from benchmarks import bench_board, bench_env, bench_memory, bench_agent  # Needed to register the benchmarks
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(description='Runs the benchmark suite.')
+    parser.add_argument('--filter', default=None, help='only run benchmarks whose name contains this string')
+    parser.add_argument('--max-scale', type=int, default=None,
+                        help='skip benchmarks with an integer parameter (e.g. n_schemes) above this value')
+    parser.add_argument('--repeat', type=int, default=3, help='timed repetitions per benchmark')
+    parser.add_argument('--min-time', type=float, default=0.1, help='minimum seconds per calibrated repetition')
+    parser.add_argument('--output', default=None, help='JSON file to save the results to')
+    parser.add_argument('--baseline', default=None, help='JSON file of earlier results to compare against')
+    parser.add_argument('--save-baseline', default=None, help='JSON file to save the results to as a new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown relative to the baseline before reporting a regression')
+    return parser.parse_args(args)
+
+
+def report(name, result):
+    print('{:<64}{:>14}{:>16.1f} ops/s'.format(name, harness.format_seconds(result['seconds']),
+                                                result['ops_per_second']))
+    sys.stdout.flush()
+
+
+def main(args=None):
+    args = parse_args(args)
+
+    results = harness.run(harness.select(args.filter, args.max_scale), repeat=args.repeat, min_time=args.min_time,
+                          report=report)
+
+    for path in [args.output, args.save_baseline]:
+        if path is not None:
+            harness.save(results, path)
+
+    if args.baseline is None:
+        return 0
+
+    comparisons = harness.compare(results, harness.load(args.baseline), tolerance=args.tolerance)
+    print()
+    for comparison in comparisons:
+        print('{:<64}{:>14}{:>14}{:>8.2f}x{}'.format(comparison.name, harness.format_seconds(comparison.baseline),
+                                                     harness.format_seconds(comparison.current), comparison.ratio,
+                                                     '  REGRESSION' if comparison.regression else ''))
+
+    return 1 if any(comparison.regression for comparison in comparisons) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -10,3 +10,10 @@ register(
     reward_threshold=1.0,
     nondeterministic=True,
 )
+
+register(
+    id='TicTacToeVec-v0',
+    entry_point='gym_tictactoe.envs:TicTacToeVecEnv',
+    reward_threshold=1.0,
+    nondeterministic=True,
+)
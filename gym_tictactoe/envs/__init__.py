@@ -1 +1,5 @@
-from gym_tictactoe.envs.tictactoe_env import TicTacToeEnv
\ No newline at end of file
+from gym_tictactoe.envs.board import Board, BitBoard
+from gym_tictactoe.envs.tictactoe_env import TicTacToeEnv
+from gym_tictactoe.envs.tictactoe_vec_env import TicTacToeVecEnv
+from gym_tictactoe.envs.state_table import StateTable, get_state_table
+from gym_tictactoe.envs.opponents import RandomOpponent, HeuristicOpponent, PerfectOpponent, make_opponent
@@ -0,0 +1,326 @@
+import numpy as np
+
+BLANK = 0
+X = 1
+O = -1
+
+
+class Board(object):
+
+    def __init__(self, size=3, k=None):
+        self.size = size
+        # number of marks in a row needed to win (defaults to a full row, column or diagonal)
+        self.k = size if k is None else k
+        self._board = np.array([BLANK] * (self.size ** 2))
+
+        self._mark_dict = {BLANK: ' ', X: 'X', O: 'O'}
+
+    @classmethod
+    def from_list(cls, board, k=None):
+        obj = Board(int(len(board)**.5), k=k)
+        obj._board = board
+        return obj
+
+
+    @property
+    def blanks(self):
+        return np.flatnonzero(np.asarray(self._board) == BLANK).tolist()
+
+    def is_blank(self, pos):
+        return 0 <= pos < self.size ** 2 and self._board[pos] == BLANK
+
+    def __getitem__(self, pos):
+        return self._board[pos]
+
+    def __setitem__(self, pos, mark):
+        if mark not in [BLANK, X, O]:
+            raise ValueError
+
+        self._board[pos] = mark
+
+    def __repr__(self):
+        return str(self._board)
+
+    def __str__(self):
+        return self.board_string()
+
+    def __eq__(self, other):
+        if not isinstance(other, Board):
+            return False
+
+        return self._board == other._board
+
+    def board_string(self):
+        row_template = '│'.join(['{}'] * self.size)
+        separator = '┼'.join(['─'] * self.size)
+        board_template = '\n' + ('\n' + separator + '\n').join([row_template] * self.size) + '\n'
+
+        ox_board = [self._mark_dict[mark] for mark in self.asarray()]
+        return board_template.format(*ox_board)
+
+    def is_full(self):
+        return not np.any(np.asarray(self._board) == BLANK)
+
+    def is_empty(self):
+        return bool(np.all(np.asarray(self._board) == BLANK))
+
+    def asarray(self):
+        return self._board
+
+    def write_to(self, out):
+        """
+        Writes the marks into a preallocated array (without building a new one) and returns it.
+        """
+        out[:] = self._board
+        return out
+
+    def has_winner(self, last_move=None):
+        """
+        Returns True if either player has k marks in a row.  If last_move is given, only the lines through that
+        position are checked (O(k)), which is sufficient when the board had no winner before that move.
+        """
+        if last_move is not None:
+            return self._completes_line(last_move)
+
+        # sum of board elements along every row, column and diagonal window of length k
+        line_sums = np.sum(np.asarray(self._board)[line_indices(self.size, self.k)], axis=1)
+
+        return bool(np.any(self.k == np.abs(line_sums)))
+
+    def _completes_line(self, pos):
+        mark = self[pos]
+        if mark == BLANK:
+            return False
+
+        row, col = divmod(int(pos), self.size)
+        for d_row, d_col in [(0, 1), (1, 0), (1, 1), (1, -1)]:
+            count = 1
+            for sign in [1, -1]:
+                r, c = row + sign * d_row, col + sign * d_col
+                while count < self.k and 0 <= r < self.size and 0 <= c < self.size \
+                        and self[r * self.size + c] == mark:
+                    count += 1
+                    r, c = r + sign * d_row, c + sign * d_col
+
+            if count >= self.k:
+                return True
+
+        return False
+
+    def is_draw(self):
+        return self.is_full() and not self.has_winner()
+
+
+def line_indices(size, k=None):
+    """
+    Returns an array of shape (n_lines, k) holding the board positions of every run of k cells along a row, column
+    or diagonal of a size x size board (k defaults to size: the rows, columns and both main diagonals).
+    """
+    k = size if k is None else k
+    if (size, k) not in _line_indices:
+        positions = np.arange(size ** 2).reshape(size, size)
+        diagonals = [np.diag(positions, offset) for offset in range(k - size, size - k + 1)]
+        anti_diagonals = [np.diag(np.fliplr(positions), offset) for offset in range(k - size, size - k + 1)]
+
+        lines = list(positions) + list(positions.T) + diagonals + anti_diagonals
+        _line_indices[(size, k)] = np.array([line[start:start + k]
+                                             for line in lines for start in range(len(line) - k + 1)])
+
+    return _line_indices[(size, k)]
+
+
+_line_indices = {}
+
+
+def line_masks(size, k=None):
+    """
+    Returns the bitmasks of every winning line (see line_indices) on a size x size board.  Bit i of a mask
+    corresponds to board position i.
+    """
+    k = size if k is None else k
+    if (size, k) not in _line_masks:
+        _line_masks[(size, k)] = tuple(sum(1 << int(pos) for pos in line) for line in line_indices(size, k))
+
+    return _line_masks[(size, k)]
+
+
+_line_masks = {}
+
+
+def _line_masks_through(size, k):
+    """
+    Returns, for each board position, the bitmasks of the winning lines that pass through it.
+    """
+    if (size, k) not in _line_masks_through_cache:
+        masks = line_masks(size, k)
+        _line_masks_through_cache[(size, k)] = [tuple(mask for mask in masks if mask >> pos & 1)
+                                                for pos in range(size ** 2)]
+    return _line_masks_through_cache[(size, k)]
+
+
+_line_masks_through_cache = {}
+
+
+# Blank positions for every possible blank mask on a 3x3 board (512 entries)
+_blank_lists = {}
+
+
+def _blank_list_table(size):
+    if size not in _blank_lists:
+        n_cells = size ** 2
+        _blank_lists[size] = [[pos for pos in range(n_cells) if mask >> pos & 1] for mask in range(1 << n_cells)]
+    return _blank_lists[size]
+
+
+class BitBoard(Board):
+    """
+    Board engine that stores the marks of each player as an integer bitmask.  Winners are found by AND-ing the
+    player's mask against the precomputed line masks, and blank positions are tracked as a bitmask as well.
+    """
+
+    def __init__(self, size=3, k=None):
+        self.size = size
+        self.k = size if k is None else k
+        self._x = 0
+        self._o = 0
+
+        self._full_mask = (1 << size ** 2) - 1
+        self._lines = line_masks(size, self.k)
+        self._lines_through = _line_masks_through(size, self.k)
+        self._blank_table = _blank_list_table(size) if size <= 3 else None
+        self._shifts = np.arange(size ** 2)
+        self._scratch = np.zeros(size ** 2, dtype=np.int64)
+
+        self._mark_dict = {BLANK: ' ', X: 'X', O: 'O'}
+
+    @classmethod
+    def from_list(cls, board, k=None):
+        obj = cls(int(len(board)**.5), k=k)
+        for pos, mark in enumerate(board):
+            if mark != BLANK:
+                obj[pos] = mark
+        return obj
+
+    @property
+    def x_mask(self):
+        return self._x
+
+    @property
+    def o_mask(self):
+        return self._o
+
+    @property
+    def blank_mask(self):
+        return self._full_mask & ~(self._x | self._o)
+
+    @property
+    def blanks(self):
+        mask = self.blank_mask
+        if self._blank_table is not None:
+            return list(self._blank_table[mask])
+
+        blanks = []
+        while mask:
+            low_bit = mask & -mask
+            blanks.append(low_bit.bit_length() - 1)
+            mask ^= low_bit
+        return blanks
+
+    def is_blank(self, pos):
+        return 0 <= pos < self.size ** 2 and not (self._x | self._o) >> pos & 1
+
+    def __getitem__(self, pos):
+        if not 0 <= pos < self.size ** 2:
+            raise IndexError(pos)
+
+        if self._x >> pos & 1:
+            return X
+        if self._o >> pos & 1:
+            return O
+        return BLANK
+
+    def __setitem__(self, pos, mark):
+        if mark not in [BLANK, X, O]:
+            raise ValueError
+        if not 0 <= pos < self.size ** 2:
+            raise IndexError(pos)
+
+        bit = 1 << int(pos)
+        self._x &= ~bit
+        self._o &= ~bit
+
+        if mark == X:
+            self._x |= bit
+        elif mark == O:
+            self._o |= bit
+
+    def __iter__(self):
+        return iter(self.asarray())
+
+    def __len__(self):
+        return self.size ** 2
+
+    def __repr__(self):
+        return str(self.asarray())
+
+    def __eq__(self, other):
+        if isinstance(other, BitBoard):
+            return self._x == other._x and self._o == other._o
+
+        return isinstance(other, Board) and np.array_equal(self.asarray(), other.asarray())
+
+    def __hash__(self):
+        return hash((self._x, self._o))
+
+    def copy(self):
+        obj = self.__class__(self.size, self.k)
+        obj._x = self._x
+        obj._o = self._o
+        return obj
+
+    def is_full(self):
+        return self.blank_mask == 0
+
+    def is_empty(self):
+        return (self._x | self._o) == 0
+
+    def asarray(self):
+        if self.size ** 2 > 62:
+            return np.array([self[pos] for pos in range(self.size ** 2)])
+        return ((self._x >> self._shifts) & 1) - ((self._o >> self._shifts) & 1)
+
+    def write_to(self, out):
+        if self.size ** 2 > 62:
+            out[:] = self.asarray()
+            return out
+
+        scratch = self._scratch
+        np.right_shift(self._x, self._shifts, out=out)
+        np.bitwise_and(out, 1, out=out)
+        np.right_shift(self._o, self._shifts, out=scratch)
+        np.bitwise_and(scratch, 1, out=scratch)
+        np.subtract(out, scratch, out=out)
+        return out
+
+    @property
+    def winner(self):
+        for line in self._lines:
+            if self._x & line == line:
+                return X
+            if self._o & line == line:
+                return O
+        return None
+
+    def has_winner(self, last_move=None):
+        if last_move is not None:
+            marks = self._x if self._x >> last_move & 1 else self._o
+            for line in self._lines_through[last_move]:
+                if marks & line == line:
+                    return True
+            return False
+
+        x, o = self._x, self._o
+        for line in self._lines:
+            if x & line == line or o & line == line:
+                return True
+        return False
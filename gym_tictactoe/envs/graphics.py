@@ -1,72 +1,166 @@
-import pygame
+"""
+Rendering backends for the tic-tac-toe environments.  Nothing is loaded or initialized when this module is
+imported: pygame is only imported (and images only loaded) the first time a backend that needs it renders.
+
+    ansi      -- the board as text
+    rgb_array -- an offscreen (height, width, 3) uint8 frame composed from cached, pre-scaled sprites
+    human     -- a pygame window showing the rgb_array frame
+"""
+import os
+
+import numpy as np
+
+IMAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'images')
 
-mark_img = {'X': pygame.image.load("tic.jpg"),
-            'O': pygame.image.load("tac.jpg")
-           }
-bkg_x_offset = 50
-bkg_y_offset = 50
 board_x_offset = 10
 board_y_offset = 10
 
-def reset():
-    img = pygame.image.load("board.jpg")
-    screen = pygame.display.set_mode((1000,1000))
-    screen.blit(img, (bkg_x_offset,bkg_y_offset))
-    pygame.display.flip()
-    return screen
+# width of a cell on the 3x3 background image (in pixels)
+cell_size = 200
 
+# Sprites (as arrays) shared by every renderer in the process, keyed by (board size, scale)
+_sprite_cache = {}
 
-def initialize():
-    pygame.init()
 
-    screen = reset()
+def _load_image(name):
+    import pygame
 
-    # define a variable to control the main loop
-    running = True
+    return pygame.image.load(os.path.join(IMAGE_DIR, name))
 
-    '''
-    # main loop
-    while running:
-        # event handling, gets all event from the event queue
-        for event in pygame.event.get():
-            # only do something if the event is of type QUIT
-            if event.type == pygame.QUIT:
-                # change the value to False, to exit the main loop
-                running = False
-    '''
 
-    pygame.display.flip()
-    return screen
+def _scaled_array(image, factor):
+    import pygame
+
+    if factor != 1.0:
+        width, height = image.get_size()
+        image = pygame.transform.smoothscale(image, (max(1, int(width * factor)), max(1, int(height * factor))))
+
+    # surfarray is indexed (x, y); frames are indexed (row, column)
+    return np.ascontiguousarray(pygame.surfarray.array3d(image).swapaxes(0, 1))
+
+
+def sprites(size=3, scale=1.0):
+    """
+    Returns the background and mark sprites for a size x size board, scaled and converted to arrays on first use.
+    """
+    if (size, scale) not in _sprite_cache:
+        mark_factor = scale * 3.0 / size
+        _sprite_cache[(size, scale)] = {
+            'board': _scaled_array(_load_image('board.jpg'), scale),
+            'X': _scaled_array(_load_image('tic.jpg'), mark_factor),
+            'O': _scaled_array(_load_image('tac.jpg'), mark_factor)
+        }
+    return _sprite_cache[(size, scale)]
+
+
+class AnsiRenderer:
+    def __init__(self, size=3, scale=1.0):
+        self.size = size
+
+    def render(self, board):
+        return str(board)
+
+    def close(self):
+        pass
+
+
+class RgbArrayRenderer:
+    def __init__(self, size=3, scale=1.0):
+        self.size = size
+        self.scale = scale
+        self._sprites = None
+
+    def render(self, board):
+        if self._sprites is None:
+            self._sprites = sprites(self.size, self.scale)
+
+        frame = self._sprites['board'].copy()
+        cell = cell_size * self.scale * 3.0 / self.size
+
+        for pos, mark in enumerate(board.asarray()):
+            if mark == 0:
+                continue
+
+            sprite = self._sprites['X' if mark > 0 else 'O']
+            x = int((pos % self.size) * cell + board_x_offset * self.scale)
+            y = int((pos // self.size) * cell + board_y_offset * self.scale)
+
+            # clip sprites that would overhang the background
+            height = min(sprite.shape[0], frame.shape[0] - y)
+            width = min(sprite.shape[1], frame.shape[1] - x)
+            frame[y:y + height, x:x + width] = sprite[:height, :width]
+
+        return frame
+
+    def close(self):
+        pass
+
+
+class HumanRenderer:
+    def __init__(self, size=3, scale=1.0):
+        self._frames = RgbArrayRenderer(size, scale)
+        self._screen = None
+
+    def render(self, board):
+        import pygame
+
+        frame = self._frames.render(board)
+
+        if self._screen is None:
+            pygame.init()
+            self._screen = pygame.display.set_mode((frame.shape[1], frame.shape[0]))
+
+        # keep the window responsive
+        pygame.event.pump()
+
+        self._screen.blit(pygame.surfarray.make_surface(frame.swapaxes(0, 1)), (0, 0))
+        pygame.display.flip()
+
+        print(board)
+
+    def close(self):
+        if self._screen is not None:
+            import pygame
+
+            pygame.display.quit()
+            self._screen = None
+
+
+renderers = {'ansi': AnsiRenderer,
+             'rgb_array': RgbArrayRenderer,
+             'human': HumanRenderer
+             }
+
+
+def make_renderer(mode, size=3, scale=1.0):
+    if mode not in renderers:
+        raise ValueError('Unknown render mode: {}'.format(mode))
+
+    return renderers[mode](size=size, scale=scale)
+
+
+_human_renderer = None
 
-screen = initialize()
 
 def draw(board):
-    reset()
-    for i, b in enumerate(board):
-        if b != 0:
-            put({1: 'X', -1: 'O'}[b], i+1)
-
-def put(mark, pos, screen=screen):
-    pos = pos-1
-    x = (pos%3)*200 + bkg_x_offset + board_x_offset
-    y = int(pos/3)*200 + bkg_y_offset + board_y_offset
-    screen.blit(mark_img[mark], (x,y))
-    pygame.display.flip()
+    """
+    Draws a board (or a flat list of marks) in a shared pygame window.
+    """
+    global _human_renderer
+    from gym_tictactoe.envs.board import Board
 
-def main():
+    if not isinstance(board, Board):
+        board = Board.from_list(list(board))
+
+    if _human_renderer is None:
+        _human_renderer = HumanRenderer(size=board.size)
+    _human_renderer.render(board)
 
-    screen = initialize()
 
-    put('X',1,screen)
-    put('X',2,screen)
-    put('X',3,screen)
-    put('O',4,screen)
-    put('O',5,screen)
-    put('O',6,screen)
-    put('O',7,screen)
-    put('X',8,screen)
-    put('X',9,screen)
+def main():
+    import pygame
 
+    draw([1, 1, 1, -1, -1, -1, -1, 1, 1])
 
     # define a variable to control the main loop
     running = True
@@ -82,4 +176,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,163 @@
+import numpy as np
+
+from gym_tictactoe.envs.board import BLANK, X, O, BitBoard, line_indices
+from gym_tictactoe.envs.state_table import get_state_table
+
+
+def _choice(rng, seq):
+    return seq[rng.integers(len(seq))]
+
+
+class RandomOpponent:
+    """
+    Marks a blank position chosen uniformly at random.
+    """
+
+    def __init__(self, mark=O, size=3, k=None, rng=None):
+        self.mark = mark
+        self.rng = np.random.default_rng() if rng is None else rng
+
+    def __call__(self, board):
+        return _choice(self.rng, board.blanks)
+
+
+class HeuristicOpponent:
+    """
+    Completes its own line if it can, otherwise blocks the other player's line, otherwise prefers the center,
+    then the corners, then any blank position.
+    """
+
+    def __init__(self, mark=O, size=3, k=None, rng=None):
+        self.mark = mark
+        self.rng = np.random.default_rng() if rng is None else rng
+        self._lines = line_indices(size, k)
+
+        center = (size ** 2) // 2 if size % 2 else None
+        corners = [0, size - 1, size * (size - 1), size ** 2 - 1]
+        self._preferences = ([center] if center is not None else []) + corners
+
+    def _completing_move(self, board, mark):
+        for line in self._lines:
+            marks = [board[pos] for pos in line]
+            if marks.count(mark) == len(line) - 1 and marks.count(BLANK) == 1:
+                return int(line[marks.index(BLANK)])
+        return None
+
+    def __call__(self, board):
+        for mark in [self.mark, -self.mark]:
+            move = self._completing_move(board, mark)
+            if move is not None:
+                return move
+
+        for pos in self._preferences:
+            if board.is_blank(pos):
+                return pos
+
+        return _choice(self.rng, board.blanks)
+
+
+class MinimaxTable:
+    """
+    Game-theoretic value of every reachable 3x3 position, computed by backward induction over the state table.
+    Values are from X's point of view: positive when X wins with perfect play, negative when O wins, and 0 for a
+    draw.  The magnitude of a won position is 1 + the number of blanks left when the game ends, so that faster
+    wins (and slower losses) are preferred.
+    """
+
+    def __init__(self, table=None):
+        table = get_state_table() if table is None else table
+
+        n_marks = np.sum(table.boards != BLANK, axis=1)
+        n_blanks = 9 - n_marks
+
+        self.values = np.zeros(len(table))
+        self.values[table.winner == X] = 1 + n_blanks[table.winner == X]
+        self.values[table.winner == O] = -(1 + n_blanks[table.winner == O])
+
+        # Every successor has one more mark than its parent, so positions are resolved from the fullest down
+        for layer in range(8, -1, -1):
+            states = np.flatnonzero((n_marks == layer) & ~table.is_terminal)
+            if len(states) == 0:
+                continue
+
+            successors = table.successors[states]
+            legal = successors >= 0
+            child_values = self.values[np.where(legal, successors, 0)]
+
+            x_to_move = table.to_move[states] == X
+            signed = np.where(x_to_move[:, np.newaxis], child_values, -child_values)
+            self.values[states] = np.where(x_to_move, 1, -1) * np.max(np.where(legal, signed, -np.inf), axis=1)
+
+        # optimal_moves[s, pos] is True when marking pos is a best move for the player to move in state s
+        legal = table.successors >= 0
+        child_values = self.values[np.where(legal, table.successors, 0)]
+        signed = np.where((table.to_move == X)[:, np.newaxis], child_values, -child_values)
+        signed = np.where(legal, signed, -np.inf)
+        self.optimal_moves = legal & (signed == np.max(signed, axis=1)[:, np.newaxis])
+        self.best_move = np.where(np.any(legal, axis=1), np.argmax(signed, axis=1), -1)
+
+        # Optimal moves of each state as lists, so that a move can be drawn without touching NumPy
+        self.optimal_move_lists = [np.flatnonzero(row).tolist() for row in self.optimal_moves]
+
+
+_minimax_table = None
+
+
+def get_minimax_table():
+    """
+    Returns the process-wide minimax table, building it on first use.
+    """
+    global _minimax_table
+    if _minimax_table is None:
+        _minimax_table = MinimaxTable()
+    return _minimax_table
+
+
+class PerfectOpponent:
+    """
+    Plays a best move according to the shared minimax table (3x3 boards only).  When several moves are equally
+    good, one of them is chosen at random unless deterministic is True.
+    """
+
+    def __init__(self, mark=O, size=3, k=None, rng=None, deterministic=False):
+        if size != 3 or k not in [None, 3]:
+            raise ValueError('PerfectOpponent only supports 3x3 boards with 3 in a row')
+
+        self.mark = mark
+        self.rng = np.random.default_rng() if rng is None else rng
+        self.deterministic = deterministic
+        self._state_table = get_state_table()
+        self._minimax_table = get_minimax_table()
+
+    def __call__(self, board):
+        if isinstance(board, BitBoard):
+            state = self._state_table.index_of_masks(board.x_mask, board.o_mask)
+        else:
+            state = self._state_table.index(board.asarray())
+        if state < 0:
+            raise ValueError('unreachable board')
+        if self.deterministic:
+            return int(self._minimax_table.best_move[state])
+
+        return _choice(self.rng, self._minimax_table.optimal_move_lists[state])
+
+
+opponents = {'random': RandomOpponent,
+             'heuristic': HeuristicOpponent,
+             'perfect': PerfectOpponent
+             }
+
+
+def make_opponent(opponent, mark=O, size=3, k=None, rng=None):
+    """
+    Returns an opponent policy: a callable mapping a board to the position the opponent marks.
+    :param opponent: name of a registered policy ('random', 'heuristic' or 'perfect') or a policy callable
+    :param rng: numpy.random.Generator used by the registered policies for their random choices
+    """
+    if not isinstance(opponent, str):
+        return opponent
+
+    if opponent not in opponents:
+        raise ValueError('Unknown opponent: {}'.format(opponent))
+
+    return opponents[opponent](mark=mark, size=size, k=k, rng=rng)
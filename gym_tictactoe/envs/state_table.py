@@ -0,0 +1,132 @@
+import numpy as np
+
+from gym_tictactoe.envs.board import BLANK, X, O, line_indices
+
+SIZE = 3
+N_CELLS = SIZE ** 2
+
+# base-3 digit value of each cell (BLANK -> 0, X -> 1, O -> 2)
+POWERS = 3 ** np.arange(N_CELLS)
+N_CODES = 3 ** N_CELLS
+
+
+def _symmetries():
+    positions = np.arange(N_CELLS).reshape(SIZE, SIZE)
+    rotations = [np.rot90(positions, k) for k in range(4)]
+    return np.array([p.ravel() for r in rotations for p in (r, np.fliplr(r))])
+
+
+# Position permutations of the 8 symmetries of the board (the dihedral group D4)
+SYMMETRIES = _symmetries()
+
+
+def encode(boards):
+    """
+    Returns the base-3 code of a board (or of each row in an array of boards).
+    """
+    return np.remainder(boards, 3) @ POWERS
+
+
+class StateTable:
+    """
+    Table of every position reachable in a game of 3x3 tic-tac-toe where X moves first (5,478 positions).  Each
+    position is given a dense integer index, and terminal status, winner, legal moves and successor positions
+    are precomputed so that they can be read with a single array lookup.
+
+    Indices are assigned in increasing order of the board's base-3 code, so index 0 is always the empty board.
+    """
+
+    def __init__(self):
+        codes = np.arange(N_CODES)
+        boards = (codes[:, np.newaxis] // POWERS) % 3
+        boards[boards == 2] = O
+
+        n_x = np.sum(boards == X, axis=1)
+        n_o = np.sum(boards == O, axis=1)
+
+        line_sums = boards[:, line_indices(SIZE)].sum(axis=2)
+        x_wins = np.any(line_sums == SIZE * X, axis=1)
+        o_wins = np.any(line_sums == SIZE * O, axis=1)
+
+        # A position is reachable when the mark counts are consistent with alternating play, and
+        # play stopped as soon as either player completed a line
+        reachable = ((n_x == n_o) | (n_x == n_o + 1)) \
+            & ~(x_wins & o_wins) \
+            & ~(x_wins & (n_x == n_o)) \
+            & ~(o_wins & (n_x == n_o + 1))
+
+        self.codes = codes[reachable]
+        self.boards = boards[reachable].astype(np.int8)
+        self.n_states = len(self.codes)
+
+        # Perfect hash from board code to state index (-1 for unreachable boards)
+        self._index_of_code = np.full(N_CODES, -1, dtype=np.int32)
+        self._index_of_code[self.codes] = np.arange(self.n_states)
+
+        # State index by (X bitmask, O bitmask), for BitBoards (bit i of a mask is board position i)
+        bits = 1 << np.arange(N_CELLS)
+        x_masks = (self.boards == X) @ bits
+        o_masks = (self.boards == O) @ bits
+        self._index_of_masks = dict(zip(zip(x_masks.tolist(), o_masks.tolist()), range(self.n_states)))
+
+        self.winner = np.zeros(self.n_states, dtype=np.int8)
+        self.winner[x_wins[reachable]] = X
+        self.winner[o_wins[reachable]] = O
+
+        self.is_full = np.all(self.boards != BLANK, axis=1)
+        self.is_terminal = (self.winner != BLANK) | self.is_full
+        self.is_draw = self.is_full & (self.winner == BLANK)
+
+        self.to_move = np.where(n_x[reachable] == n_o[reachable], X, O).astype(np.int8)
+
+        self.legal_moves = (self.boards == BLANK) & ~self.is_terminal[:, np.newaxis]
+
+        # successors[s, pos] is the state reached when the player to move marks pos (-1 if the move is illegal)
+        mover_digit = np.where(self.to_move == X, 1, 2)
+        child_codes = self.codes[:, np.newaxis] + mover_digit[:, np.newaxis] * POWERS
+        self.successors = np.where(self.legal_moves, self._index_of_code[np.where(self.legal_moves, child_codes, 0)],
+                                   -1).astype(np.int32)
+
+        # canonical[s] is the state with the smallest code among the 8 symmetric images of s
+        symmetric_codes = encode(self.boards[:, SYMMETRIES])
+        self.symmetry = np.argmin(symmetric_codes, axis=1)
+        self.canonical = self._index_of_code[np.min(symmetric_codes, axis=1)]
+
+        # Dense numbering of the symmetry classes
+        representatives, self.canonical_id = np.unique(self.canonical, return_inverse=True)
+        self.n_canonical_states = len(representatives)
+
+    def index(self, board):
+        """
+        Returns the state index of a board (or an array of indices for an (n, 9) array of boards); -1 is
+        returned for unreachable boards.
+        """
+        return self._index_of_code[encode(np.asarray(board))]
+
+    def index_of_masks(self, x_mask, o_mask):
+        """
+        Returns the state index of a board given as the bitmasks of its X and O marks (-1 for unreachable boards).
+        """
+        return self._index_of_masks.get((x_mask, o_mask), -1)
+
+    def canonical_index(self, board):
+        return self.canonical[self.index(board)]
+
+    def board(self, index):
+        return self.boards[index]
+
+    def __len__(self):
+        return self.n_states
+
+
+_state_table = None
+
+
+def get_state_table():
+    """
+    Returns the process-wide state table, building it on first use.
+    """
+    global _state_table
+    if _state_table is None:
+        _state_table = StateTable()
+    return _state_table
@@ -1,25 +1,92 @@
+import collections.abc
 import logging
-import random
 
 import gym
 import numpy as np
 from gym import spaces
 
 from gym_tictactoe.envs import graphics as ttt_graphics
+from gym_tictactoe.envs.board import BLANK, X, O, Board, BitBoard
+from gym_tictactoe.envs.opponents import make_opponent
+from gym_tictactoe.envs.state_table import get_state_table
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.ERROR)
 
+# step comment codes
+COMMENT_NONE = 0
+COMMENT_NO_ACTION = 1
+COMMENT_POST_GAME = 2
+COMMENT_ILLEGAL = 3
+COMMENT_PLAYER_WINS = 4
+COMMENT_DRAW = 5
+COMMENT_OPPONENT_WINS = 6
+
+COMMENTS = {COMMENT_NONE: 'none',
+            COMMENT_NO_ACTION: 'No action taken',
+            COMMENT_POST_GAME: 'post-game action',
+            COMMENT_ILLEGAL: 'illegal action',
+            COMMENT_PLAYER_WINS: 'player wins',
+            COMMENT_DRAW: 'draw',
+            COMMENT_OPPONENT_WINS: 'opponent wins'
+            }
+
+
+class StepInfo(collections.abc.Mapping):
+    """
+    Info returned by TicTacToeEnv.step in fast mode.  Holds the comment code and the board; the 'board' and 'comment'
+    strings are only built when they are read.
+
+    The environment reuses one StepInfo for every step, so, like the observation buffer, it is only valid until the
+    next step (use dict(info) to keep it).
+    """
+    __slots__ = ('code', 'done', '_board')
+    _keys = ('board', 'done', 'comment', 'code')
+
+    def __init__(self, code=COMMENT_NONE, board=None, done=False):
+        self.code = code
+        self.done = done
+        self._board = board
+
+    def __getitem__(self, key):
+        if key == 'code':
+            return self.code
+        if key == 'done':
+            return self.done
+        if key == 'comment':
+            return COMMENTS[self.code]
+        if key == 'board':
+            return str(self._board)
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
 
 class TicTacToeEnv(gym.Env):
-    metadata = {'render.modes': ['human']}
+    metadata = {'render.modes': ['human', 'rgb_array', 'ansi']}
 
-    def __init__(self, size=3):
+    def __init__(self, size=3, k=None, board_class=Board, opponent='random', fast=False):
         self._size = size
+        self._k = size if k is None else k
+        self._board_class = board_class
+        self._rng = np.random.default_rng()
+        self._opponent = make_opponent(opponent, mark=O, size=size, k=self._k, rng=self._rng)
         self._board = None
         self._done = False
         self._n_moves = 0
 
+        # rendering backends, created on first use of each mode
+        self._renderers = {}
+
+        # fast mode: observations written into a preallocated buffer and lazily formatted info
+        self.fast = fast
+        self._observation = np.zeros(self._size ** 2, dtype=np.int64)
+        self._info = StepInfo()
+
         # reward values
         self.win_reward = 1
         self.lose_reward = -1
@@ -34,9 +101,23 @@ class TicTacToeEnv(gym.Env):
                                             high=np.array([1] * (self._size ** 2)),
                                             dtype=np.int64)
 
-    def step(self, action):
-
-        reward = 0
+    def step(self, action, out=None):
+        """
+        Advances the game by one move of the player (and the opponent's reply).
+
+        In fast mode the observation is written into out (or into a buffer owned by the environment) and info is
+        a StepInfo whose 'code' is one of the COMMENT_* constants; its human-readable entries are only formatted
+        when they are read.  Nothing is allocated per step: the buffer and the StepInfo are overwritten by the next
+        step.
+        """
+        if self.fast:
+            reward, code = self._play(action)
+            observation = self._observe(out)
+            info = self._info
+            info.code = code
+            info.done = self._done
+            info._board = self._board
+            return observation, reward, self._done, info
 
         info = {
             'board': str(self._board),
@@ -44,10 +125,24 @@ class TicTacToeEnv(gym.Env):
             'comment:': 'none'
         }
 
+        reward, code = self._play(action)
+
+        if code != COMMENT_NONE:
+            info['comment'] = COMMENTS[code]
+
+        # No action and post-game actions report the board as it was before the call
+        if code not in [COMMENT_NO_ACTION, COMMENT_POST_GAME]:
+            info['board'] = str(self._board)
+            info['done'] = self._done
+
+        return self._board.asarray(), reward, self._done, info
+
+    def _play(self, action):
+        reward = 0
+
         # Check if current state is terminal, if so then return warning
         if action is None:
-            info['comment'] = 'No action taken'
-            return self._board.asarray(), reward, self._done, info
+            return reward, COMMENT_NO_ACTION
 
         action_type, action_value = action
 
@@ -61,147 +156,82 @@ class TicTacToeEnv(gym.Env):
             )
 
             self.reset()
-            info['comment'] = 'post-game action'
 
-            return self._board.asarray(), reward, self._done, info
+            return reward, COMMENT_POST_GAME
 
         # Verify legal action -- action compatible with current board
-        elif action_value not in self._board.blanks:
+        if not self._board.is_blank(action_value):
             logger.warning('Illegal action: ({})'.format(action_value))
 
-            reward = self.illegal_move
-            info['comment'] = 'illegal action'
-
-        else:
-            # update board with player's action
-            self._board[action_value] = X
-
-            # check if player won
-            if self._board.has_winner():
-
-                reward = self.win_reward
-                self._done = True
-
-                info['comment'] = 'player wins'
-
-            elif self._board.is_full():
+            return self.illegal_move, COMMENT_ILLEGAL
 
-                reward = self.draw_reward
-                self._done = True
+        # update board with player's action
+        self._board[action_value] = X
 
-                info['comment'] = 'draw'
+        # check if player won (only lines through the new mark can have been completed)
+        if self._board.has_winner(action_value):
+            self._done = True
+            return self.win_reward, COMMENT_PLAYER_WINS
 
-            # add opponent's action
-            else:
+        if self._board.is_full():
+            self._done = True
+            return self.draw_reward, COMMENT_DRAW
 
-                opponent_action = random.choice(self._board.blanks)
-                self._board[opponent_action] = O
+        # add opponent's action
+        opponent_action = self._opponent(self._board)
+        self._board[opponent_action] = O
 
-                # check if opponent won
-                if self._board.has_winner():
-                    reward = self.lose_reward
-                    self._done = True
+        # check if opponent won
+        if self._board.has_winner(opponent_action):
+            self._done = True
+            return self.lose_reward, COMMENT_OPPONENT_WINS
 
-                    info['comment'] = 'opponent wins'
+        # boards with an even number of cells are filled by the opponent
+        if self._board.is_full():
+            self._done = True
+            return self.draw_reward, COMMENT_DRAW
 
-        info['board'] = str(self._board)
-        info['done'] = self._done
+        return reward, COMMENT_NONE
 
+    def _observe(self, out=None):
+        observation = self._observation if out is None else out
+        return self._board.write_to(observation)
 
-
-        return self._board.asarray(), reward, self._done, info
+    def seed(self, seed=None):
+        """
+        Seeds the random number generator used by the opponent.
+        :param seed: an int, a numpy.random.SeedSequence (e.g. one spawned per worker) or None for fresh entropy
+        """
+        self._rng = np.random.default_rng(seed)
+        if hasattr(self._opponent, 'rng'):
+            self._opponent.rng = self._rng
+        return [seed]
 
     def reset(self):
-        self._board = Board()
+        self._board = self._board_class(self._size, self._k)
         self._done = False
 
-    def render(self, mode='human', close=False):
-        if mode == 'human':
-            ttt_graphics.draw(self._board.asarray())
-            print(self._board)
-        else:
-            return self._board.asarray()
-
-
-BLANK = 0
-X = 1
-O = -1
-
-
-class Board(object):
-
-    def __init__(self, size=3):
-        self.size = size
-        self._board = np.array([BLANK] * (self.size ** 2))
-
-        self._mark_dict = {BLANK: ' ', X: 'X', O: 'O'}
-
-    @classmethod
-    def from_list(cls, board):
-        obj = Board(int(len(board)**.5))
-        obj._board = board
-        return obj
-
-
     @property
-    def blanks(self):
-        temp1 = list(enumerate(self))
-        temp = [i for i, x in temp1 if x == BLANK]
-        return temp
-
-    def __getitem__(self, pos):
-        return self._board[pos]
-
-    def __setitem__(self, pos, mark):
-        if mark not in [BLANK, X, O]:
-            raise ValueError
-
-        self._board[pos] = mark
+    def state_id(self):
+        """
+        Index of the current board in the state table (3x3 boards only).
+        """
+        return int(get_state_table().index(self._board.asarray()))
 
-    def __repr__(self):
-        return str(self._board)
-
-    def __str__(self):
-        return self.board_string()
-
-    def __eq__(self, other):
-        if not isinstance(other, Board):
-            return False
-
-        return self._board == other._board
-
-    def board_string(self):
-        board_template = '\n' \
-                         '{}│{}│{}\n' \
-                         '─┼─┼─\n' \
-                         '{}│{}│{}\n' \
-                         '─┼─┼─\n' \
-                         '{}│{}│{}\n'
-        ox_board = [self._mark_dict[mark] for mark in self._board]
-        return board_template.format(*ox_board)
-
-    def is_full(self):
-        return len(self.blanks) == 0
-
-    def is_empty(self):
-        return len(self.blanks) == self.size
-
-    def asarray(self):
-        return self._board
-
-    def has_winner(self):
-        board_2d = np.reshape(np.array(self._board), (self.size, self.size))
-
-        # sum of board elements along rows
-        row_sums = list(np.sum(board_2d, 0))
+    def render(self, mode='human', close=False):
+        if close:
+            self.close()
+            return
 
-        # sum of board elements along columns
-        col_sums = list(np.sum(board_2d, 1))
+        if mode not in ttt_graphics.renderers:
+            return self._board.asarray()
 
-        # sum of elements along diagonals
-        diag_sums = [np.sum(np.diag(board_2d)), np.sum(np.diag(np.flip(board_2d, axis=1)))]
+        if mode not in self._renderers:
+            self._renderers[mode] = ttt_graphics.make_renderer(mode, size=self._size)
 
-        return True in (self.size == np.abs(row_sums + col_sums + diag_sums))
+        return self._renderers[mode].render(self._board)
 
-    def is_draw(self):
-        return self.is_full() and not self.has_winner()
+    def close(self):
+        for renderer in self._renderers.values():
+            renderer.close()
+        self._renderers = {}
@@ -0,0 +1,113 @@
+import logging
+
+import gym
+import numpy as np
+from gym import spaces
+
+from gym_tictactoe.envs.board import BLANK, X, O, Board, line_indices
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.ERROR)
+
+
+class TicTacToeVecEnv(gym.Env):
+    """
+    Plays n_envs independent games against a random opponent in lock step.  The boards are held in a single
+    (n_envs, size**2) array and every step (move legality, win / draw detection and the opponent's reply) is
+    computed for all games at once.  Games that finish are reset automatically; the boards as they were when
+    the game ended are returned in info['terminal_observation'].
+    """
+    metadata = {'render.modes': ['human']}
+
+    def __init__(self, n_envs=16, size=3, k=None):
+        self.n_envs = n_envs
+        self._size = size
+        self._k = size if k is None else k
+        self._n_cells = size ** 2
+        self._lines = line_indices(size, self._k)
+        self._boards = np.zeros((n_envs, self._n_cells), dtype=np.int8)
+        self._rows = np.arange(n_envs)
+        self._rng = np.random.default_rng()
+
+        # reward values
+        self.win_reward = 1
+        self.lose_reward = -1
+        self.draw_reward = 0
+        self.illegal_move = -0.1
+
+        # actions
+        self.action_space = spaces.MultiDiscrete([self._n_cells] * n_envs)
+
+        # observations
+        self.observation_space = spaces.Box(low=-1, high=1, shape=(n_envs, self._n_cells), dtype=np.int8)
+
+    def _winners(self, mark):
+        return np.any(self._boards[:, self._lines].sum(axis=2) == mark * self._k, axis=1)
+
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=np.int64).reshape(self.n_envs)
+        rewards = np.zeros(self.n_envs)
+
+        # Verify legal actions -- actions compatible with current boards
+        in_range = (actions >= 0) & (actions < self._n_cells)
+        legal = in_range.copy()
+        legal[in_range] = self._boards[self._rows[in_range], actions[in_range]] == BLANK
+        rewards[~legal] = self.illegal_move
+
+        # update boards with players' actions
+        self._boards[self._rows[legal], actions[legal]] = X
+
+        # check if players won
+        player_wins = legal & self._winners(X)
+        full = ~np.any(self._boards == BLANK, axis=1)
+        draws = legal & full & ~player_wins
+
+        # add opponents' actions to the games still in play
+        playing = legal & ~player_wins & ~draws
+        if np.any(playing):
+            scores = self._rng.random((self.n_envs, self._n_cells))
+            scores[self._boards != BLANK] = -1.0
+            opponent_actions = np.argmax(scores, axis=1)
+            self._boards[self._rows[playing], opponent_actions[playing]] = O
+
+        # check if opponents won (or filled the last blank on boards with an even number of cells)
+        opponent_wins = playing & self._winners(O)
+        draws |= playing & ~opponent_wins & ~np.any(self._boards == BLANK, axis=1)
+
+        rewards[player_wins] = self.win_reward
+        rewards[draws] = self.draw_reward
+        rewards[opponent_wins] = self.lose_reward
+
+        dones = player_wins | draws | opponent_wins
+
+        info = {
+            'terminal_observation': self._boards.copy(),
+            'illegal': ~legal,
+            'player_wins': player_wins,
+            'opponent_wins': opponent_wins,
+            'draws': draws
+        }
+
+        # auto-reset finished games
+        self._boards[dones] = BLANK
+
+        return self._boards.copy(), rewards, dones, info
+
+    def seed(self, seed=None):
+        """
+        Seeds the random number generator used by the opponents.
+        :param seed: an int, a numpy.random.SeedSequence (e.g. one spawned per worker) or None for fresh entropy
+        """
+        self._rng = np.random.default_rng(seed)
+        return [seed]
+
+    def reset(self):
+        self._boards[:] = BLANK
+        return self._boards.copy()
+
+    def render(self, mode='human', close=False):
+        if mode == 'human':
+            for board in self._boards:
+                print(Board.from_list(board))
+        else:
+            return self._boards.copy()
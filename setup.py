@@ -2,5 +2,5 @@ from setuptools import setup
 
 setup(name='tictactoe-agent',
       version='0.0.1',
-      install_requires=['gym>=0.2.3', 'numpy>=1.15', 'scipy>=1.2.0']
+      install_requires=['gym>=0.2.3', 'numpy>=1.17', 'scipy>=1.2.0']
       )
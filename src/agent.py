@@ -1,5 +1,6 @@
 from common import *
-from graphics import initialize, draw
+from events import *
+from profiler import NULL_STAGE
 
 import gym
 import sys
@@ -7,6 +8,7 @@ sys.path.append("..")
 
 import gym_tictactoe  # Needed to add 'TicTacToe-v0' into gym registry
 
+import heapq
 import logging
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -16,224 +18,455 @@ N_STEPS = 1000
 # TODO: can be removed if we figure out logging and another control on graphics.
 experimenting = False
 
-# Module initialization
-#TODO: 'happy' and 'sad' should be interpretive feeling nodes (like 'sweetness' related feeling node)
-feature_detectors = [FeatureDetector("happy", lambda x: x[1] if x[1] > 0 else 0.0),
-                     FeatureDetector("sad", lambda x: abs(x[1]) if x[1] < 0 else 0.0)
-                    ]
 mark_dict = {1: 'X', -1: 'O', 0: 'B'}
 mark_dict_r = {'X':1 , 'O':-1, 'B':0}
 
-def lambda_mark_detector(mark, pos):
-    return lambda x: (x[0][pos] == mark)*1.0
+position_nodes = [mark_dict[mark]+'_'+str(pos)
+                  for mark in [1, 0, -1] for pos in range(9)]
 
-mark_detectors = [FeatureDetector(mark_dict[mark]+'_'+str(pos),
-                                   lambda_mark_detector(mark, pos))
-                       for pos in range(9) for mark in [1, -1, 0]
-                  ]
+removal_activation = {CurrentSituationalModel: 'current_activation',
+                      GlobalWorkspace: 'activation',
+                      ProceduralMemory: 'base_level_activation',
+                      list: 'base_level_activation' # for attention codelets
+                     }
 
-feature_detectors += mark_detectors
 
-sensory_memory = SensoryMemory(feature_detectors=feature_detectors)
-workspace = Workspace()
+def lambda_mark_detector(mark, pos):
+    return lambda x: (x[0][pos] == mark)*1.0
 
-# Feature Detectors
 
-pam = PerceptualAssociativeMemory(initial_concepts=[
-                                                    #TODO: affective_valence is really valence
-                                                    FeelingNode("happy", valence=1.0),
-                                                    FeelingNode("sad", valence=-1.0),
-                                                    ])
-global_workspace = GlobalWorkspace()
+def lambda_mark_attn_codelet(pos_code):
+    return lambda x: x.content == pos_code and x.activation > .99
 
-# Initial Schemes
-move_schemes = [Scheme(context=None, action=Action('move', position), result=None) for position in range(9)]
 
-procedural_memory = ProceduralMemory(initial_schemes= move_schemes, context_match=exact_match_by_board)
-action_selection = ActionSelection()
+def create_feature_detectors():
+    #TODO: 'happy' and 'sad' should be interpretive feeling nodes (like 'sweetness' related feeling node)
+    feature_detectors = [FeatureDetector("happy", lambda x: x[1] if x[1] > 0 else 0.0),
+                         FeatureDetector("sad", lambda x: abs(x[1]) if x[1] < 0 else 0.0)
+                        ]
 
-# Motor Plan Templates
-reset_mpt = MotorPlanTemplate(motor_commands=[MotorCommand(actuator='reset', value=None)],
-                              triggers=[lambda mc: True],
-                              choice_function=lambda mcs: random.choice(mcs))
+    mark_detectors = [FeatureDetector(mark_dict[mark]+'_'+str(pos),
+                                       lambda_mark_detector(mark, pos))
+                           for pos in range(9) for mark in [1, -1, 0]
+                      ]
 
-mp_templates = {i: MotorPlanTemplate(motor_commands=[MotorCommand(actuator='move', value=i)],
-                             triggers=[lambda mc: True],
-                             choice_function=lambda mcs: random.choice(mcs))
-                                    for i in range(10) }
+    return feature_detectors + mark_detectors
 
-mp_templates['reset'] = reset_mpt
 
-sensory_motor_system = SensoryMotorSystem(motor_plan_templates=mp_templates)
+def create_feature_detector_bank():
+    """
+    The detectors of create_feature_detectors (in the same order) as a single vectorized FeatureDetectorBank.
+    """
+    return FeatureDetectorBank(affect_detectors=[("happy", 1.0), ("sad", -1.0)],
+                               mark_detectors=[(mark_dict[mark]+'_'+str(pos), pos, mark)
+                                               for pos in range(9) for mark in [1, -1, 0]])
 
-# Create Codelets
-sb_codelets = []
-attn_codelets = [AttentionCodelet(lambda x: x.content == "happy",
-                                  tag="happy", domain=workspace.csm),
-                 AttentionCodelet(lambda x: x.content == "sad",
-                                  tag="sad", domain=workspace.csm)
-                ]
-position_nodes = [mark_dict[mark]+'_'+str(pos)
-                  for mark in [1, 0, -1] for pos in range(9)]
 
+def create_motor_plan_templates():
+    reset_mpt = MotorPlanTemplate(motor_commands=[MotorCommand(actuator='reset', value=None)],
+                                  triggers=[lambda mc: True],
+                                  choice_function=lambda mcs: random.choice(mcs))
 
-def lambda_mark_attn_codelet(pos_code):
-    return lambda x: x.content == pos_code and x.activation > .99
+    mp_templates = {i: MotorPlanTemplate(motor_commands=[MotorCommand(actuator='move', value=i)],
+                                 triggers=[lambda mc: True],
+                                 choice_function=lambda mcs: random.choice(mcs))
+                                        for i in range(10) }
 
+    mp_templates['reset'] = reset_mpt
 
-default_attn_codelet = [AttentionCodelet(lambda x: x.activation > .99,
-                                         tag='default_attn_codelet',
-                                         base_level_activation=.9,
-                                         domain=workspace.csm
-                                         )]
+    return mp_templates
 
-mark_attn_codelets = [AttentionCodelet(lambda_mark_attn_codelet(pos_code),
-                                       tag=pos_code, domain=workspace.csm)
-                      for pos_code in position_nodes
-                     ]
-#attn_codelets += mark_attn_codelets
-attn_codelets += default_attn_codelet
-cueable_modules = [pam]
-broadcast_recipients = [procedural_memory]
 
-# Initialize Cueing Process
-cue_process = CueingProcess(cueable_modules)
-coalition_manager = CoalitionManager()
+class Agent:
+    """
+    A tic-tac-toe playing LIDA agent.  Each agent owns all of its modules, so any number of independent agents
+    can be created in one process.
+    """
 
-removal_activation = {CurrentSituationalModel: 'current_activation',
-                      GlobalWorkspace: 'activation',
-                      ProceduralMemory: 'base_level_activation',
-                      list: 'base_level_activation' # for attention codelets
-                     }
+    def __init__(self, rng=None, activation_threshold=0.6, percept_threshold=0.8, csm_capacity=None,
+                 episodic_memory=False, declarative_memory=None, events=None, profiler=None):
+        """
+        :param rng: numpy.random.Generator, int seed or numpy.random.SeedSequence (None -> fresh entropy)
+        :param activation_threshold: procedural memory's activation threshold for candidate behaviors
+        :param percept_threshold: PAM's activation threshold for the percept
+        :param csm_capacity: maximum number of nodes in the CSM (None -> unbounded)
+        :param episodic_memory: if True, the CSM of every cycle is stored in a transient episodic memory, which is
+                                cued along with PAM
+        :param declarative_memory: DeclarativeMemory, or the path of its store, that receives the conscious broadcasts
+                                   and is cued along with PAM (None -> no declarative memory)
+        :param events: EventBus on which the agent publishes its cycle events (None -> a new, private bus)
+        :param profiler: CycleProfiler that times each stage of the cycle (None -> no profiling)
+        """
+        self.rng = rng if isinstance(rng, np.random.Generator) else np.random.default_rng(rng)
+        self.events = EventBus() if events is None else events
+        self.profiler = profiler
+
+        # Module initialization
+        self.feature_detectors = create_feature_detector_bank()
+        self.sensory_memory = SensoryMemory(feature_detectors=self.feature_detectors)
+        self.workspace = Workspace(csm_capacity=csm_capacity)
+
+        self.pam = PerceptualAssociativeMemory(initial_concepts=[
+                                                    #TODO: affective_valence is really valence
+                                                    FeelingNode("happy", valence=1.0),
+                                                    FeelingNode("sad", valence=-1.0),
+                                                    ], percept_threshold=percept_threshold)
+        self.global_workspace = GlobalWorkspace()
+        self.episodic_memory = TransientEpisodicMemory(rng=self._child_seed()) if episodic_memory else None
+        if isinstance(declarative_memory, str):
+            declarative_memory = DeclarativeMemory(declarative_memory)
+        self.declarative_memory = declarative_memory
+
+        # Initial Schemes
+        move_schemes = [Scheme(context=None, action=Action('move', position), result=None) for position in range(9)]
+
+        self.procedural_memory = ProceduralMemory(initial_schemes=move_schemes, context_match=exact_match_by_board,
+                                                  activation_threshold=activation_threshold, rng=self.rng)
+        self.action_selection = ActionSelection(rng=self.rng)
+
+        # Motor Plan Templates
+        self.sensory_motor_system = SensoryMotorSystem(motor_plan_templates=create_motor_plan_templates())
+
+        # Create Codelets
+        csm = self.workspace.csm
+        self.sb_codelets = []
+        self.sb_engine = StructureBuildingEngine(self.sb_codelets)
+        self.attn_codelets = [AttentionCodelet(lambda x: x.content == "happy",
+                                               tag="happy", domain=csm),
+                              AttentionCodelet(lambda x: x.content == "sad",
+                                               tag="sad", domain=csm)
+                             ]
+
+        default_attn_codelet = [AttentionCodelet(lambda x: x.activation > .99,
+                                                 tag='default_attn_codelet',
+                                                 base_level_activation=.9,
+                                                 domain=csm
+                                                 )]
+
+        mark_attn_codelets = [AttentionCodelet(lambda_mark_attn_codelet(pos_code),
+                                               tag=pos_code, domain=csm)
+                              for pos_code in position_nodes
+                             ]
+        #self.attn_codelets += mark_attn_codelets
+        self.attn_codelets += default_attn_codelet
+        self.cueable_modules = [self.pam]
+        if self.episodic_memory is not None:
+            self.cueable_modules.append(self.episodic_memory)
+        self.broadcast_recipients = [self.procedural_memory]
+        if self.declarative_memory is not None:
+            self.cueable_modules.append(self.declarative_memory)
+            self.broadcast_recipients.append(self.declarative_memory)
+
+        # Initialize Cueing Process
+        self.cue_process = CueingProcess(self.cueable_modules)
+        self.coalition_manager = CoalitionManager()
+
+        # Most recent results of the cognitive cycle
+        self.cycle = 0
+        self.broadcast = None
+        self.selected_behavior = None
+        self.motor_command = None
+
+    def _child_seed(self):
+        # Seed of a stream of its own for a stochastic module, drawn from the agent's generator
+        return int(self.rng.integers(2 ** 63))
+
+    def seed(self, seed=None):
+        """
+        Seeds every stochastic module: procedural memory and action selection share the agent's generator, and the
+        episodic memory gets a stream of its own drawn from it (as when the agent is created with the same seed).
+        :param seed: an int, a numpy.random.SeedSequence (e.g. one spawned per worker) or None for fresh entropy
+        """
+        self.rng = np.random.default_rng(seed)
+        if self.episodic_memory is not None:
+            self.episodic_memory.seed(self._child_seed())
+        self.procedural_memory.rng = self.rng
+        self.action_selection.rng = self.rng
+
+    def step(self, obs, reward):
+        """
+        Executes a single cognitive cycle on an observation and reward from the environment.
+        :return: the motor command to send to the environment (the previous command if no new behavior was selected)
+        """
+        events = self.events
+
+        if self.profiler is not None:
+            self.profiler.cycle = self.cycle
+
+        if events.has_subscribers(CycleStarted):
+            events.publish(CycleStarted(self, self.cycle, obs, reward))
+
+        self.perceive(obs, reward)
+        coalitions = self.attend()
+        broadcast = self.compete(coalitions)
+        if broadcast is not None:
+            self.act(broadcast)
 
+        if events.has_subscribers(HousekeepingStarted):
+            events.publish(HousekeepingStarted(self, self.cycle))
 
-def running(step, last=None):
-    """
-    A boolean function for the running state of the agent.  If a last step is specified, then it will return True when
-    step is less than or equal to last and False otherwise.
-    :param step: current step
-    :param last:  last step to run
-    :return: returns True if agent should continue running; False otherwise.
-    """
-    return True if last is None else step < last
+        self.housekeeping()
 
+        if events.has_subscribers(CycleEnded):
+            events.publish(CycleEnded(self, self.cycle, self.motor_command))
 
-def run(environment, n=None, render=True):
-    """
-    Main control loop of agent.  Runs for n cognitive cycles.  If n is not specified, it will run forever.
-    :param n: number of cognitive cycles to execute
-    """
-    count = 0
-    total_reward = 0
+        self.cycle += 1
 
-    motor_command = None
+        return self.motor_command
 
-    while running(count, n):
+    # The stages of the cognitive cycle.  step runs them in order; scheduler.AsyncScheduler runs them as
+    # coroutines at their own rates.
 
-        # Display environment state for human consumption
-        if render:
-            environment.render()
+    def perceive(self, obs, reward):
+        """
+        Processes sensors into features, updates PAM and integrates the sensory scene and percept into the CSM.
+        """
+        sensory_memory = self.sensory_memory
+        workspace = self.workspace
+        pam = self.pam
+        stage = self._stage
 
-        obs, reward, done, info = environment.step(motor_command)
-        total_reward += reward if abs(reward) > .99 else 0.0
         # Process sensors into modality specific representations
-        #draw(sender=environment, receiver=sensory_memory, content= (obs,reward))
-        sensory_memory.receive_sensors((obs, reward))
-
-        pam.receive_features(sensory_memory.detected_features)
+        with stage('sensory_memory'):
+            sensory_memory.receive_sensors((obs, reward))
+            sensory_scene = sensory_memory.build_sensory_scene()
 
+        with stage('pam'):
+            pam.receive_feature_activations(self.feature_detectors.concept_ids, sensory_memory.feature_activations)
+            pam.spread_activation()
 
         # Integrate sensory scene into workspace
-        workspace.csm.receive_sensory_scene(sensory_memory.sensory_scene)
+        with stage('csm'):
+            workspace.csm.receive_sensory_scene(sensory_scene)
+
+            workspace.csm.receive_content(pam.percept)
 
-        workspace.csm.receive_content(pam.percept)
-        '''
         # Structure building codelets scan the workspace, potentially creating new content
-        sbc_content = []
-        for codelet in sb_codelets:
-            sbc_content.append(codelet.apply(workspace))
-        workspace.csm.receive_content(sbc_content)
-        '''
+        with stage('structure_building'):
+            self.sb_engine.run(workspace.csm)
+
         # Cueing process
-        cued_content = cue_process.process(workspace)
-        workspace.csm.receive_content(cued_content)
+        with stage('cueing'):
+            self.cue_process.process(workspace)
+
+        # The situation of this cycle becomes an episode
+        if self.episodic_memory is not None:
+            with stage('episodic_memory'):
+                self.episodic_memory.store(workspace.csm.content)
+
+    def attend(self):
+        """
+        Attention codelets scan the workspace and form coalitions around the content they select.
+        :return: list of coalitions
+        """
+        stage = self._stage
 
         # Attention codelets scan workspace and select content of interest
-        for codelet in attn_codelets:
-            coalition_manager.receive(codelet, codelet.apply())
+        with stage('attention_codelets'):
+            for codelet in self.attn_codelets:
+                self.coalition_manager.receive(codelet, codelet.apply())
 
-        global_workspace.receive_coalitions(coalition_manager.coalitions)
+        with stage('coalition_manager'):
+            return self.coalition_manager.coalitions
 
-        # Conscious broadcast retrieved from global workspace
-        broadcast = global_workspace.broadcast
-        if broadcast is not None:
+    def compete(self, coalitions):
+        """
+        Coalitions compete in the global workspace for the conscious broadcast.
+        :return: the broadcast (None if there is no coalition)
+        """
+        events = self.events
 
-            # Broadcast sent to all broadcast recipients
-            for module in broadcast_recipients:
+        # Conscious broadcast retrieved from global workspace
+        with self._stage('global_workspace'):
+            self.global_workspace.receive_coalitions(coalitions)
+            broadcast = self.global_workspace.broadcast
+        self.broadcast = broadcast
+
+        if broadcast is not None and events.has_subscribers(BroadcastSent):
+            events.publish(BroadcastSent(self, self.cycle, broadcast))
+
+        return broadcast
+
+    def act(self, broadcast):
+        """
+        Sends the broadcast to its recipients, selects a behavior and turns it into a motor command.
+        :return: the motor command (the previous command if no new behavior was selected)
+        """
+        workspace = self.workspace
+        procedural_memory = self.procedural_memory
+        events = self.events
+        stage = self._stage
+
+        # Broadcast sent to all broadcast recipients
+        with stage('procedural_memory'):
+            for module in self.broadcast_recipients:
                 module.receive_broadcast(broadcast)
 
             candidate_behaviors = procedural_memory.candidate_behaviors
-            action_selection.receive_behaviors(candidate_behaviors)
 
-            # Process selected behavior
-            selected_behavior = action_selection.selected_behavior
+        # Process selected behavior
+        with stage('action_selection'):
+            self.action_selection.receive_behaviors(candidate_behaviors)
+            selected_behavior = self.action_selection.selected_behavior
+        self.selected_behavior = selected_behavior
+
+        if events.has_subscribers(BehaviorSelected):
+            events.publish(BehaviorSelected(self, self.cycle, selected_behavior))
 
+        with stage('procedural_learning'):
             procedural_memory.receive_selected_behavior(selected_behavior)
 
-            if selected_behavior is not None:
-                # Expectation codelet created from selected behavior
-                if selected_behavior.result is not None:
-                    attn_codelets.append(ExpectationCodelet(scheme=selected_behavior,
-                                                            select=lambda x: x in selected_behavior.result and x.activation > 0.0,
-                                                            tag='exp',
-                                                            domain=workspace.csm.perceptual_scene))
-
-                sensory_motor_system.receive_selected_behavior(selected_behavior)
-
-                motor_plan = sensory_motor_system.motor_plan
-                motor_command = motor_plan.choose_motor_command(sensory_memory.sensory_scene)
-
-                # Action execution - conceptually we can think of this as 2 actuators:
-                # a move actuator and a reset actuator
-
-        logger.debug(('broadcast: ', broadcast))
-        logger.debug(('attn_codelets: ', attn_codelets))
-        logger.debug(('selected_behavior: ', selected_behavior))
-        logger.debug(('motor_command: ', motor_command))
-        if render:
-            print('attn_codelets: ', attn_codelets)
-            print('broadcast: ', broadcast)
-            print('selected_behavior: ', selected_behavior)
-            print('motor_command: ', motor_command)
-            print('Strategy:')
-            for i, scheme in enumerate(sorted(procedural_memory.content, key=lambda x: x.base_level_activation, reverse=True)):
-                if i>5:
-                    break
-                print(get_board_string_from_context(scheme.context), scheme.action.value)
+        if selected_behavior is not None:
+            # Expectation codelet created from selected behavior
+            if selected_behavior.result is not None:
+                self.attn_codelets.append(ExpectationCodelet(scheme=selected_behavior,
+                                                             select=lambda x: x in selected_behavior.result and x.activation > 0.0,
+                                                             tag='exp',
+                                                             domain=workspace.csm.perceptual_scene))
+
+            with stage('sensory_motor_system'):
+                self.sensory_motor_system.receive_selected_behavior(selected_behavior)
+
+                motor_plan = self.sensory_motor_system.motor_plan
+                self.motor_command = motor_plan.choose_motor_command(self.sensory_memory.sensory_scene)
+
+            if events.has_subscribers(MotorCommandIssued):
+                events.publish(MotorCommandIssued(self, self.cycle, self.motor_command))
+
+            # Action execution - conceptually we can think of this as 2 actuators:
+            # a move actuator and a reset actuator
+
+        return self.motor_command
+
+    def _stage(self, name):
+        return NULL_STAGE if self.profiler is None else self.profiler.stage(name)
+
+    def housekeeping(self):
+        stage = self._stage
+
+        with stage('decay'):
+            Decay(self.workspace.csm.content)
+            Decay(self.attn_codelets)
+            Decay(self.pam.content)
+        with stage('forget'):
+            Forget(self.procedural_memory.content)
+            #Forget(self.procedural_memory.content, function=lambda x: norm.pdf(x, loc=0.5, scale=0.12)*(1.0/50))
+        with stage('garbage_collector'):
+            for module in [self.workspace.csm, self.global_workspace, self.attn_codelets, self.procedural_memory]:
+                GarbageCollector(module, removal_activation[type(module)])
+
+    def run(self, environment, n=None, render=True):
+        """
+        Main control loop of agent.  Runs for n cognitive cycles.  If n is not specified, it will run forever.
+        :param n: number of cognitive cycles to execute
+        """
+        count = 0
+        total_reward = 0
+
+        while running(count, n):
+
+            # Display environment state for human consumption
+            if render:
+                environment.render()
+
+            obs, reward, done, info = environment.step(self.motor_command)
+            total_reward += reward if abs(reward) > .99 else 0.0
+
+            self.step(obs, reward)
+
+            if render:
+                #draw([sensory_memory, workspace.csm, global_workspace])
+                import time
+                time.sleep(2)
+
+            count += 1
+
+        return count, total_reward
+
+
+# Optional subscribers (see Agent.events)
+
+def print_cycle_count(event):
+    """
+    Prints the number of completed cycles (subscribe to CycleEnded).
+    """
+    print(event.cycle + 1)
+
+
+def print_state(event):
+    """
+    Prints the results of the cycle and the agent's strongest schemes (subscribe to CycleEnded).
+    """
+    agent = event.agent
+    print('attn_codelets: ', agent.attn_codelets)
+    print('broadcast: ', agent.broadcast)
+    print('selected_behavior: ', agent.selected_behavior)
+    print('motor_command: ', agent.motor_command)
+    print('Strategy:')
+    for scheme in heapq.nlargest(6, agent.procedural_memory.content, key=lambda x: x.base_level_activation):
+        print(get_board_string_from_context(scheme.context), scheme.action.value)
+
+
+def log_cycle(event):
+    """
+    Logs the results of the cycle and the currently active schemes (subscribe to HousekeepingStarted).
+    """
+    agent = event.agent
+    logger.debug(('broadcast: ', agent.broadcast))
+    logger.debug(('attn_codelets: ', agent.attn_codelets))
+    logger.debug(('selected_behavior: ', agent.selected_behavior))
+    logger.debug(('motor_command: ', agent.motor_command))
+    if logger.isEnabledFor(logging.NOTSET):
         logger.log(logging.NOTSET, ('schemes: '))
-        for scheme in procedural_memory._schemes:
+        for scheme in agent.procedural_memory.content:
             if scheme.current_activation > .5:
                 logger.log(logging.NOTSET, scheme)
 
-        if render:
-            #draw([sensory_memory, workspace.csm, global_workspace])
-            import time
-            time.sleep(2)
 
-        #housekeeping
-        Decay(workspace.csm.content)
-        Decay(attn_codelets)
-        Decay(pam.content)
-        Forget(procedural_memory.content)
-        #Forget(procedural_memory.content, function=lambda x: norm.pdf(x, loc=0.5, scale=0.12)*(1.0/50))
-        for module in [workspace.csm, global_workspace, attn_codelets, procedural_memory]:
-            GarbageCollector(module, removal_activation[type(module)])
+def attach_console_subscribers(agent, render=True):
+    """
+    Restores the agent's console output: the cycle count, logging and (if rendering) the state of every cycle.
+    """
+    agent.events.subscribe(HousekeepingStarted, log_cycle)
+    if render:
+        agent.events.subscribe(CycleEnded, print_state)
+    agent.events.subscribe(CycleEnded, print_cycle_count)
 
 
-        count += 1
-        print(count)
+def running(step, last=None):
+    """
+    A boolean function for the running state of the agent.  If a last step is specified, then it will return True when
+    step is less than or equal to last and False otherwise.
+    :param step: current step
+    :param last:  last step to run
+    :return: returns True if agent should continue running; False otherwise.
+    """
+    return True if last is None else step < last
+
+
+_default_agent = None
+
+
+def default_agent():
+    """
+    Returns the agent used by the module-level run and seed functions, creating it on first use.
+    """
+    global _default_agent
+    if _default_agent is None:
+        _default_agent = Agent()
+    return _default_agent
+
+
+def seed(seed=None):
+    default_agent().seed(seed)
+
+
+def run(environment, n=None, render=True):
+    """
+    Runs the default agent for n cognitive cycles (see Agent.run).  State is kept across calls.
+    """
+    return default_agent().run(environment, n=n, render=render)
 
-    return count, total_reward
 
 def get_board_string_from_context(context):
     board = [0]*9
@@ -247,6 +480,7 @@ def get_board_string_from_context(context):
 if __name__ == '__main__':
     environment = gym.make('TicTacToe-v0')
     environment.reset()
-    print(run(environment, n=N_STEPS, render=not experimenting))
-
 
+    agent = Agent()
+    attach_console_subscribers(agent, render=not experimenting)
+    print(agent.run(environment, n=N_STEPS, render=not experimenting))
@@ -0,0 +1,351 @@
+import json
+import os
+
+import numpy as np
+
+from common import CognitiveContent, FeelingNode, Scheme, Action, AttentionCodelet, ExpectationCodelet, Coalition, \
+    MotorCommand, ContentStore, TransientEpisodicMemory, DeclarativeMemory
+from events import CycleEnded
+from agent import Agent
+
+# Version of the checkpoint layout (bumped on incompatible changes)
+VERSION = 1
+
+
+class _Table:
+    """
+    Assigns consecutive indices to objects by identity, so that objects shared between modules (e.g. a node in both
+    PAM and the CSM) are written once and shared again after loading.
+    """
+
+    def __init__(self):
+        self.items = []
+        self._index = {}
+
+    def add(self, item):
+        key = id(item)
+        if key not in self._index:
+            self._index[key] = len(self.items)
+            self.items.append(item)
+        return self._index[key]
+
+    def add_all(self, items):
+        return np.array([self.add(item) for item in items], dtype=np.int64)
+
+    def get(self, item):
+        return -1 if item is None else self._index[id(item)]
+
+
+def _pack(lists, table):
+    """
+    Packs a list of lists (or Nones) of table objects into CSR arrays: offsets, flat indices and a None mask.
+    """
+    offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+    indices = []
+    for i, items in enumerate(lists):
+        if items is not None:
+            indices.extend(table.add(item) for item in items)
+        offsets[i + 1] = len(indices)
+    return offsets, np.array(indices, dtype=np.int64), np.array([items is None for items in lists], dtype=bool)
+
+
+def _unpack(offsets, indices, is_none, items):
+    return [None if none else [items[i] for i in indices[start:end]]
+            for start, end, none in zip(offsets[:-1], offsets[1:], is_none)]
+
+
+def _encode_action(action, action_types):
+    if action is None:
+        return -1, 0
+    if action.type not in action_types:
+        action_types.append(action.type)
+    return action_types.index(action.type), -1 if action.value is None else int(action.value)
+
+
+def _decode_action(type_index, value, action_types):
+    if type_index < 0:
+        return None
+    return Action(action_types[type_index], None if value < 0 else int(value))
+
+
+def save(agent, path, cycle=None):
+    """
+    Writes the agent's learned and working state to a compressed numpy archive.
+
+    Content nodes, schemes, codelets and coalitions are stored as flat arrays that refer to each other by index, so
+    the file holds no pickled objects.  The file is replaced atomically, so an interrupted save leaves the previous
+    checkpoint intact.
+    :param cycle: cycle number to record (None -> agent.cycle)
+    """
+    nodes = _Table()
+    schemes = _Table()
+    codelets = _Table()
+    coalitions = _Table()
+
+    pm = agent.procedural_memory
+    gw = agent.global_workspace
+
+    # Register everything reachable from the agent's modules.  Schemes, codelets and coalitions may be referenced
+    # after they have been garbage collected from their module (e.g. an expectation codelet's scheme).
+    pm_indices = schemes.add_all(pm.content)
+    recent_indices = schemes.add_all(pm.recently_selected_behaviors)
+    attn_indices = codelets.add_all(agent.attn_codelets)
+    gw_indices = coalitions.add_all(gw.coalitions)
+    for item in [pm._last_broadcast, agent.broadcast]:
+        if item is not None:
+            coalitions.add(item)
+    if agent.selected_behavior is not None:
+        schemes.add(agent.selected_behavior)
+    for coalition in coalitions.items:
+        codelets.add(coalition.attn_codelets)
+    for codelet in codelets.items:
+        if isinstance(codelet, ExpectationCodelet):
+            schemes.add(codelet.scheme)
+
+    pam_indices = nodes.add_all(agent.pam.content)
+    csm_indices = nodes.add_all(agent.workspace.csm.content)
+
+    arrays = {}
+    (arrays['scheme_context_offsets'], arrays['scheme_context_nodes'],
+     arrays['scheme_context_none']) = _pack([scheme.context for scheme in schemes.items], nodes)
+    (arrays['scheme_result_offsets'], arrays['scheme_result_nodes'],
+     arrays['scheme_result_none']) = _pack([scheme.result for scheme in schemes.items], nodes)
+    (arrays['coalition_offsets'], arrays['coalition_nodes'],
+     arrays['coalition_none']) = _pack([coalition.content for coalition in coalitions.items], nodes)
+
+    action_types = []
+    actions = [_encode_action(scheme.action, action_types) for scheme in schemes.items]
+    arrays['scheme_action'] = np.array(actions, dtype=np.int64).reshape(-1, 2)
+    arrays['scheme_activation'] = np.array([[scheme.current_activation, scheme.base_level_activation]
+                                            for scheme in schemes.items], dtype=np.float64).reshape(-1, 2)
+    arrays['action_types'] = np.array(action_types, dtype=str)
+
+    for codelet in codelets.items:
+        if type(codelet) not in (AttentionCodelet, ExpectationCodelet):
+            raise TypeError('Cannot checkpoint attention codelets of type {}'.format(type(codelet).__name__))
+    arrays['codelet_tag'] = np.array([codelet.tag for codelet in codelets.items], dtype=str)
+    arrays['codelet_scheme'] = np.array([schemes.get(codelet.scheme) if isinstance(codelet, ExpectationCodelet)
+                                         else -1 for codelet in codelets.items], dtype=np.int64)
+    arrays['codelet_activation'] = np.array([[codelet._current_activation, codelet._base_level_activation]
+                                             for codelet in codelets.items], dtype=np.float64).reshape(-1, 2)
+    arrays['coalition_codelet'] = np.array([codelets.get(coalition.attn_codelets)
+                                            for coalition in coalitions.items], dtype=np.int64)
+
+    for node in nodes.items:
+        if not isinstance(node.content, str):
+            raise TypeError('Cannot checkpoint content of type {}'.format(type(node.content).__name__))
+    arrays['node_content'] = np.array([node.content for node in nodes.items], dtype=str)
+    arrays['node_feeling'] = np.array([isinstance(node, FeelingNode) for node in nodes.items], dtype=bool)
+    arrays['node_valence'] = np.array([node.valence if isinstance(node, FeelingNode) else 0.0
+                                       for node in nodes.items], dtype=np.float64)
+    arrays['node_virtual'] = np.array([node.virtual for node in nodes.items], dtype=bool)
+    arrays['node_activation'] = np.array([[node.current_activation, node.base_level_activation,
+                                           node.current_incentive_salience, node.base_level_incentive_salience]
+                                          for node in nodes.items], dtype=np.float64).reshape(-1, 4)
+
+    pam = agent.pam
+    arrays['pam_links'] = np.array([[nodes.get(source), nodes.get(target)] for source, target, weight in pam.links],
+                                   dtype=np.int64).reshape(-1, 2)
+    arrays['pam_link_weights'] = np.array([weight for source, target, weight in pam.links], dtype=np.float64)
+    arrays['pam_spread_nodes'] = np.array([nodes.get(node) for node, value in pam._spread_activation.values()],
+                                          dtype=np.int64)
+    arrays['pam_spread_values'] = np.array([value for node, value in pam._spread_activation.values()],
+                                           dtype=np.float64)
+
+    arrays.update(procedural_memory=pm_indices, recently_selected_behaviors=recent_indices,
+                  attn_codelets=attn_indices, global_workspace=gw_indices, pam=pam_indices, csm=csm_indices)
+
+    if agent.declarative_memory is not None:
+        agent.declarative_memory.flush()
+
+    episodic_memory = agent.episodic_memory
+    if episodic_memory is not None:
+        arrays['episodic_locations'] = episodic_memory._locations
+        arrays['episodic_counters'] = episodic_memory._counters
+        arrays['episodic_context'] = episodic_memory._context
+        arrays['episodic_vocabulary'] = np.array(episodic_memory.vocabulary, dtype=str)
+
+    meta = {'version': VERSION,
+            'cycle': agent.cycle if cycle is None else cycle,
+            'rng': agent.rng.bit_generator.state,
+            'activation_threshold': pm.activation_threshold,
+            'percept_threshold': agent.pam.percept_threshold,
+            'csm_capacity': agent.workspace.csm.capacity,
+            'spread_decay': agent.pam.spread_decay,
+            'spread_depth': agent.pam.spread_depth,
+            'broadcast': coalitions.get(agent.broadcast),
+            'last_broadcast': coalitions.get(pm._last_broadcast),
+            'selected_behavior': schemes.get(agent.selected_behavior),
+            'motor_command': None if agent.motor_command is None else list(agent.motor_command),
+            'episodic_memory': None if episodic_memory is None else {'n_active': episodic_memory.n_active,
+                                                                     'decay': episodic_memory.decay,
+                                                                     'version': episodic_memory.version},
+            # The declarative memory store is already a file, so only its path is recorded
+            'declarative_memory': None if agent.declarative_memory is None else {
+                'path': os.path.abspath(agent.declarative_memory.path), 'depth': agent.declarative_memory.depth,
+                'mode': agent.declarative_memory.mode}
+            }
+    arrays['meta'] = np.array(json.dumps(meta))
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as file:
+        np.savez_compressed(file, **arrays)
+    os.replace(tmp_path, path)
+
+
+def restore(agent, path):
+    """
+    Replaces the state of an agent with a checkpoint written by save.  The agent's event bus and profiler are kept.
+    """
+    with np.load(path, allow_pickle=False) as archive:
+        arrays = {name: archive[name] for name in archive.files}
+
+    meta = json.loads(str(arrays['meta']))
+    if meta['version'] != VERSION:
+        raise ValueError('Unsupported checkpoint version: {}'.format(meta['version']))
+
+    nodes = []
+    for content, feeling, valence, virtual, (current, bla, cis, blis) in zip(
+            arrays['node_content'].tolist(), arrays['node_feeling'], arrays['node_valence'], arrays['node_virtual'],
+            arrays['node_activation'].tolist()):
+        if feeling:
+            node = FeelingNode(content, valence=float(valence), current_activation=current, bla=bla)
+            node.current_incentive_salience = cis
+            node.base_level_incentive_salience = blis
+        else:
+            node = CognitiveContent(content, current_activation=current, bla=bla, current_incentive_salience=cis,
+                                    blis=blis)
+        node.virtual = bool(virtual)
+        nodes.append(node)
+
+    action_types = arrays['action_types'].tolist()
+    contexts = _unpack(arrays['scheme_context_offsets'], arrays['scheme_context_nodes'],
+                       arrays['scheme_context_none'], nodes)
+    results = _unpack(arrays['scheme_result_offsets'], arrays['scheme_result_nodes'],
+                      arrays['scheme_result_none'], nodes)
+    schemes = [Scheme(context, _decode_action(type_index, value, action_types), result, current, bla)
+               for context, result, (type_index, value), (current, bla)
+               in zip(contexts, results, arrays['scheme_action'].tolist(), arrays['scheme_activation'].tolist())]
+
+    # Built-in codelets keep the selection functions of the agent they are restored into
+    builtin_codelets = {codelet.tag: codelet for codelet in agent.attn_codelets
+                        if not isinstance(codelet, ExpectationCodelet)}
+    csm = agent.workspace.csm
+    codelets = []
+    for tag, scheme_index, (current, bla) in zip(arrays['codelet_tag'].tolist(), arrays['codelet_scheme'].tolist(),
+                                                 arrays['codelet_activation'].tolist()):
+        if scheme_index >= 0:
+            codelet = _expectation_codelet(schemes[scheme_index], csm.perceptual_scene)
+        elif tag in builtin_codelets:
+            codelet = builtin_codelets[tag]
+        else:
+            raise ValueError('Unknown attention codelet: {}'.format(tag))
+        codelet._current_activation = current
+        codelet._base_level_activation = bla
+        codelets.append(codelet)
+
+    coalitions = [Coalition(content, codelets[codelet_index]) for content, codelet_index in zip(
+        _unpack(arrays['coalition_offsets'], arrays['coalition_nodes'], arrays['coalition_none'], nodes),
+        arrays['coalition_codelet'].tolist())]
+
+    def lookup(items, index):
+        return None if index < 0 else items[index]
+
+    pm = agent.procedural_memory
+    pm._schemes = [schemes[i] for i in arrays['procedural_memory']]
+    pm.recently_selected_behaviors.clear()
+    pm.recently_selected_behaviors.extend(schemes[i] for i in arrays['recently_selected_behaviors'])
+    pm._last_broadcast = lookup(coalitions, meta['last_broadcast'])
+    pm.activation_threshold = meta['activation_threshold']
+
+    agent.pam.clear()
+    for i in arrays['pam']:
+        agent.pam.add_concept(nodes[i])
+    agent.pam.percept_threshold = meta['percept_threshold']
+
+    agent.pam.spread_decay = meta['spread_decay']
+    agent.pam.spread_depth = meta['spread_depth']
+    for (source, target), weight in zip(arrays['pam_links'].tolist(), arrays['pam_link_weights'].tolist()):
+        agent.pam.add_link(nodes[source], nodes[target], weight)
+    agent.pam._spread_activation = {id(nodes[i]): (nodes[i], value) for i, value in
+                                    zip(arrays['pam_spread_nodes'].tolist(), arrays['pam_spread_values'].tolist())}
+    csm._content = ContentStore(nodes[i] for i in arrays['csm'])
+    csm.capacity = meta['csm_capacity']
+    agent.attn_codelets = [codelets[i] for i in arrays['attn_codelets']]
+    agent.global_workspace.coalitions = [coalitions[i] for i in arrays['global_workspace']]
+
+    if agent.episodic_memory is not None:
+        agent.cueable_modules.remove(agent.episodic_memory)
+        agent.episodic_memory = None
+    if meta.get('episodic_memory') is not None:
+        locations = arrays['episodic_locations']
+        episodic_memory = TransientEpisodicMemory(n_bits=locations.shape[1], n_locations=locations.shape[0],
+                                                  n_active=meta['episodic_memory']['n_active'],
+                                                  decay=meta['episodic_memory']['decay'])
+        episodic_memory._locations = locations
+        episodic_memory._location_weights = locations.sum(axis=1)
+        episodic_memory._counters = arrays['episodic_counters']
+        episodic_memory._context = arrays['episodic_context']
+        episodic_memory.version = meta['episodic_memory']['version']
+        for content in arrays['episodic_vocabulary'].tolist():
+            episodic_memory._bit(content, add=True)
+        agent.episodic_memory = episodic_memory
+        agent.cueable_modules.append(episodic_memory)
+
+    if agent.declarative_memory is not None:
+        agent.cueable_modules.remove(agent.declarative_memory)
+        agent.broadcast_recipients.remove(agent.declarative_memory)
+        agent.declarative_memory = None
+    if meta.get('declarative_memory') is not None:
+        declarative_memory = DeclarativeMemory(**meta['declarative_memory'])
+        agent.declarative_memory = declarative_memory
+        agent.cueable_modules.append(declarative_memory)
+        agent.broadcast_recipients.append(declarative_memory)
+
+    agent.rng.bit_generator.state = meta['rng']
+    agent.cycle = meta['cycle']
+    agent.broadcast = lookup(coalitions, meta['broadcast'])
+    agent.selected_behavior = lookup(schemes, meta['selected_behavior'])
+    agent.motor_command = None if meta['motor_command'] is None else MotorCommand(*meta['motor_command'])
+
+    return agent
+
+
+def _expectation_codelet(scheme, domain):
+    # Same codelet as the one created by Agent.step for a selected behavior
+    return ExpectationCodelet(scheme=scheme,
+                              select=lambda x: x in scheme.result and x.activation > 0.0,
+                              tag='exp',
+                              domain=domain)
+
+
+def load(path, events=None, profiler=None):
+    """
+    Creates an agent from a checkpoint written by save, e.g. to warm start an experiment or resume a run:
+
+        agent = checkpoint.load('agent.npz')
+        agent.run(environment, n=N_STEPS - agent.cycle, render=False)
+    """
+    return restore(Agent(events=events, profiler=profiler), path)
+
+
+class Checkpointer:
+    """
+    Saves an agent every n cycles (subscribe to CycleEnded), so that an interrupted run can be resumed with load.
+
+        Checkpointer('agent.npz', every=100).attach(agent)
+    """
+
+    def __init__(self, path, every=100):
+        self.path = path
+        self.every = every
+
+    def attach(self, agent):
+        agent.events.subscribe(CycleEnded, self)
+        return self
+
+    def __call__(self, event):
+        # The agent's cycle counter is only advanced after CycleEnded
+        completed = event.cycle + 1
+        if completed % self.every == 0:
+            save(event.agent, self.path, cycle=completed)
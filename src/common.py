@@ -1,8 +1,12 @@
 import collections
+import heapq
+import json
+import os
 import random
 import math
 
 import numpy as np
+import scipy.sparse
 from scipy.special import expit as sigmoid
 from scipy.special import softmax
 from scipy.stats import norm
@@ -47,31 +51,107 @@ def match_pct(content1, content2):
     return match
 
 
+def content_key(content):
+    '''
+    Returns a hashable key for content, under which modules index and deduplicate it: the content itself if it is
+    hashable, and otherwise an equivalent hashable value (e.g. a tuple for the list content of structure building
+    codelets).
+    '''
+    if type(content) is str:
+        return content
+
+    try:
+        hash(content)
+        return content
+    except TypeError:
+        pass
+
+    if isinstance(content, (list, tuple)):
+        return tuple(content_key(elem) for elem in content)
+    if isinstance(content, (set, frozenset)):
+        return frozenset(content_key(elem) for elem in content)
+    if isinstance(content, dict):
+        return frozenset((content_key(k), content_key(v)) for k, v in content.items())
+    if isinstance(content, np.ndarray):
+        return content.dtype.str, content.shape, content.tobytes()
+    return repr(content)
+
+
+def spawn_rngs(seed, n):
+    '''
+    Returns n independent random number generators derived from a single seed, e.g. one per worker process.
+    :param seed: an int, a numpy.random.SeedSequence or None for fresh entropy
+    :param n: number of generators
+    :return: list of numpy.random.Generator
+    '''
+    seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    return [np.random.default_rng(child) for child in seed_sequence.spawn(n)]
+
+
 SensoryScene = collections.namedtuple('SensoryScene', ['observation', 'outcome'])
 
 EPSILON = 0.000001
 
 class SensoryMemory:
-    def __init__(self, feature_detectors):
+    def __init__(self, feature_detectors=None):
+        """
+        :param feature_detectors: a FeatureDetectorBank, or a list of FeatureDetectors applied one by one
+        """
         self.sensory_scene = []
         self._sensor_data = None
-        self._feature_detectors = feature_detectors
+        self._feature_detectors = [] if feature_detectors is None else feature_detectors
+        self._activations = None
+        self._features = None
 
     def receive_sensors(self, sensors):
 
         self._sensor_data = sensors
+        self._features = None
+
+        if isinstance(self._feature_detectors, FeatureDetectorBank):
+            self._activations = self._feature_detectors.apply(sensors)
+
+    @property
+    def feature_activations(self):
+        """
+        Activation of every feature detector in the bank for the current sensors, indexed by concept ID (see
+        FeatureDetectorBank.concepts).
+        """
+        return self._activations
 
     @property
     def detected_features(self):
-        features = []
-        for fd in self._feature_detectors:
-            features.append(fd.apply(self._sensor_data))
+        if self._features is None:
+            self.build_sensory_scene()
+
+        return self._features
+
+    def build_sensory_scene(self):
+        """
+        Applies the feature detectors to the current sensors and builds the sensory scene from the detected features.
+
+        :return: the sensory scene
+        """
+        if self._features is not None:
+            return self.sensory_scene
+
+        if isinstance(self._feature_detectors, FeatureDetectorBank):
+            # Content is only created for the features that are active
+            concepts = self._feature_detectors.concepts
+            activations = self._activations
+            features = [CognitiveContent(concepts[i], current_activation=float(activations[i]))
+                        for i in np.flatnonzero(activations)]
+        else:
+            features = []
+            for fd in self._feature_detectors:
+                features.append(fd.apply(self._sensor_data))
 
         self.sensory_scene = SensoryScene(observation=features,
                                           # TODO: outcome is obsolete, remove
                                           outcome=self._sensor_data[1])
+        self._features = features
 
-        return features
+        return self.sensory_scene
 
 
     @property
@@ -97,31 +177,271 @@ class FeatureDetector:
                                 current_activation=self._similarity_metric(content))
 
 
+class FeatureDetectorBank:
+    """
+    All feature detectors of a sensory memory, applied to (observation, reward) sensors in one vectorized operation.
+
+    Affect detectors respond to rewards of one sign with the magnitude of the reward; mark detectors respond with
+    1.0 when observation[position] == mark.  The concept of each detector is identified by its index in concepts.
+    """
+
+    def __init__(self, affect_detectors=(), mark_detectors=()):
+        """
+        :param affect_detectors: list of (concept, sign) with sign +1.0 or -1.0
+        :param mark_detectors: list of (concept, position, mark)
+        """
+        affect_detectors = list(affect_detectors)
+        mark_detectors = list(mark_detectors)
+
+        self.concepts = [concept for concept, sign in affect_detectors] + \
+                        [concept for concept, position, mark in mark_detectors]
+        self.concept_ids = {concept: i for i, concept in enumerate(self.concepts)}
+
+        self._n_affect = len(affect_detectors)
+        self._signs = np.array([sign for concept, sign in affect_detectors], dtype=np.float64)
+        self._positions = np.array([position for concept, position, mark in mark_detectors], dtype=np.intp)
+        self._marks = np.array([mark for concept, position, mark in mark_detectors])
+
+    def __len__(self):
+        return len(self.concepts)
+
+    def apply(self, sensors, out=None):
+        """
+        :return: activation vector indexed by concept ID (written into out if given, otherwise a new array)
+        """
+        observation, reward = sensors
+        activations = np.empty(len(self.concepts)) if out is None else out
+
+        np.maximum(self._signs * reward, 0.0, out=activations[:self._n_affect])
+        np.equal(np.asarray(observation)[self._positions], self._marks, out=activations[self._n_affect:],
+                 casting='unsafe')
+        return activations
+
+
 class PerceptualAssociativeMemory:
-    def __init__(self, initial_concepts, percept_threshold=0.8):
+    def __init__(self, initial_concepts, percept_threshold=0.8, spread_decay=0.5, spread_depth=1):
+        """
+        :param spread_decay: fraction of a node's activation passed along a link of weight 1.0
+        :param spread_depth: number of links activation spreads across
+        """
+
+        self._concepts = []
+        self._percept_threshold = percept_threshold
+
+        # Concepts above the percept threshold, and concepts whose activation changed since the percept was last
+        # read (both keyed by id, since equal content does not make concepts the same node)
+        self._percept = {}
+        self._dirty = {}
+
+        # Incremented whenever concepts are added or removed
+        self.version = 0
+
+        # Concepts indexed by content and by node type
+        self._by_content = {}
+        self._by_type = collections.defaultdict(list)
+
+        # (concept_ids, concepts, feature IDs) bound by receive_feature_activations
+        self._feature_binding = None
 
-        self._concepts = initial_concepts
-        self.percept_threshold = percept_threshold
+        # Weighted links between concepts: {(id(source), id(target)): (source, target, weight)}
+        self._links = {}
+        self.spread_decay = spread_decay
+        self.spread_depth = spread_depth
+
+        # (linked concepts, sparse matrix of link weights from column to row) built from the links when needed
+        self._spreading = None
+
+        # Activation each concept currently owes to spreading: {id(concept): (concept, activation)}
+        self._spread_activation = {}
+
+        for concept in initial_concepts:
+            self.add_concept(concept)
 
     @property
     def content(self):
         return self._concepts
 
+    def add_concept(self, concept):
+        self.version += 1
+        concept._activation_listener = self._activation_changed
+        self._dirty[id(concept)] = concept
+
+        self._concepts.append(concept)
+        self._by_content.setdefault(content_key(concept.content), []).append(concept)
+        self._by_type[type(concept)].append(concept)
+        self._feature_binding = None
+
+    def remove_concept(self, concept):
+        self.version += 1
+
+        # Removed by identity (concepts with equal content are different nodes)
+        del self._concepts[next(i for i, c in enumerate(self._concepts) if c is concept)]
+
+        for key in [key for key in self._links if id(concept) in key]:
+            del self._links[key]
+        self._spreading = None
+        self._spread_activation.pop(id(concept), None)
+
+        concept._activation_listener = None
+        self._dirty.pop(id(concept), None)
+        self._percept.pop(id(concept), None)
+
+        key = content_key(concept.content)
+        same_content = self._by_content[key]
+        del same_content[next(i for i, c in enumerate(same_content) if c is concept)]
+        if len(same_content) == 0:
+            del self._by_content[key]
+
+        same_type = self._by_type[type(concept)]
+        del same_type[next(i for i, c in enumerate(same_type) if c is concept)]
+        self._feature_binding = None
+
+    def clear(self):
+        for concept in list(self._concepts):
+            self.remove_concept(concept)
+
+    def add_link(self, source, target, weight=1.0):
+        """
+        Adds (or replaces) a weighted link along which activation spreads from source to target.  Both must be
+        concepts of this PAM.
+        """
+        concept_ids = {id(concept) for concept in self._concepts}
+        if id(source) not in concept_ids or id(target) not in concept_ids:
+            raise ValueError('Links can only connect concepts in PAM')
+
+        self._links[(id(source), id(target))] = (source, target, weight)
+        self._spreading = None
+
+    def remove_link(self, source, target):
+        del self._links[(id(source), id(target))]
+        self._spreading = None
+
+    @property
+    def links(self):
+        """
+        List of (source, target, weight).
+        """
+        return list(self._links.values())
+
+    def _spreading_matrix(self):
+        if self._spreading is None:
+            nodes = []
+            index = {}
+            for source, target, weight in self._links.values():
+                for concept in [source, target]:
+                    if id(concept) not in index:
+                        index[id(concept)] = len(nodes)
+                        nodes.append(concept)
+
+            links = list(self._links.values())
+            rows = [index[id(target)] for source, target, weight in links]
+            cols = [index[id(source)] for source, target, weight in links]
+            weights = [weight for source, target, weight in links]
+            matrix = scipy.sparse.csr_matrix((weights, (rows, cols)), shape=(len(nodes), len(nodes)))
+
+            self._spreading = nodes, matrix
+
+        return self._spreading
+
+    def spread_activation(self):
+        """
+        Spreads activation along the links, up to spread_depth links away, as sparse matrix-vector products.
+
+        Spreading starts from the concepts' own activation (excluding what they received from spreading before) and
+        replaces the previously spread activation, so repeated spreading does not accumulate.  Setting a concept's
+        activation from features (receive_features, receive_feature_activations) discards what it received.
+        """
+        if not self._links and not self._spread_activation:
+            return
+
+        nodes, matrix = self._spreading_matrix()
+        previous = self._spread_activation
+
+        own = np.array([node.current_activation - previous[id(node)][1] if id(node) in previous
+                        else node.current_activation for node in nodes])
+        spread = np.zeros(len(nodes))
+        activation = own
+        for depth in range(self.spread_depth):
+            activation = self.spread_decay * (matrix @ activation)
+            spread += activation
+
+        current = {id(nodes[i]): (nodes[i], float(spread[i])) for i in np.flatnonzero(spread)}
+        for node, value in current.values():
+            node.current_activation += value - previous.get(id(node), (node, 0.0))[1]
+        for key, (node, value) in previous.items():
+            if key not in current:
+                node.current_activation -= value
+
+        self._spread_activation = current
+
+    def concepts_with_content(self, content):
+        return self._by_content.get(content_key(content), [])
+
+    def concepts_of_type(self, node_type):
+        return self._by_type.get(node_type, [])
+
     def receive_broadcast(self, broadcast):
         pass
 
+    def _activation_changed(self, concept):
+        self._dirty[id(concept)] = concept
+
     @property
-    def percept(self):
-        percept = []
+    def percept_threshold(self):
+        return self._percept_threshold
+
+    @percept_threshold.setter
+    def percept_threshold(self, percept_threshold):
+        self._percept_threshold = percept_threshold
         for concept in self._concepts:
-            if concept.activation > self.percept_threshold:
-                percept.append(concept)
+            self._dirty[id(concept)] = concept
+
+    @property
+    def percept(self):
+        """
+        Concepts with activation above the percept threshold.  The percept is maintained incrementally: only the
+        concepts whose activation changed since the last read are checked against the threshold.
+        """
+        if self._dirty:
+            threshold = self._percept_threshold
+            percept = self._percept
+            for key, concept in self._dirty.items():
+                if concept.activation > threshold:
+                    percept[key] = concept
+                else:
+                    percept.pop(key, None)
+            self._dirty = {}
+
+        return list(self._percept.values())
 
     def receive_features(self, features):
+        spread = self._spread_activation
         for feature in features:
-            for concept in self._concepts:
-                if feature == concept:
-                    concept.current_activation = feature.current_activation
+            for concept in self._by_content.get(content_key(feature.content), ()):
+                # The activation is replaced, including what the concept received from spreading
+                spread.pop(id(concept), None)
+                concept.current_activation = feature.current_activation
+
+    def receive_feature_activations(self, concept_ids, activations):
+        """
+        Sets the current activation of the concepts detected by a FeatureDetectorBank, including the inactive ones.
+        :param concept_ids: {concept: index into activations} (FeatureDetectorBank.concept_ids)
+        :param activations: activation vector (SensoryMemory.feature_activations)
+        """
+        binding = self._feature_binding
+        if binding is None or binding[0] is not concept_ids:
+            bound = [(concept, concept_ids[content_key(concept.content)]) for concept in self._concepts
+                     if content_key(concept.content) in concept_ids]
+            binding = self._feature_binding = (concept_ids, [concept for concept, i in bound],
+                                               np.array([i for concept, i in bound], dtype=np.intp))
+
+        concept_ids, concepts, feature_ids = binding
+        spread = self._spread_activation
+        for concept, activation in zip(concepts, activations[feature_ids].tolist()):
+            # The activation is replaced, including what the concept received from spreading
+            if spread:
+                spread.pop(id(concept), None)
+            concept.current_activation = activation
 
     def receive_cue(self, content):
         cued_content = {}
@@ -132,7 +452,9 @@ class PerceptualAssociativeMemory:
         #TODO: check if content is iterable
 
         #TODO: Need to look at a broader definition of cueing and approximate matching
-        cued_content = [concept for concept in self._concepts if content == concept]
+        if not hasattr(content, 'content'):
+            return []
+        cued_content = list(self._by_content.get(content_key(content.content), ()))
 
         # Recognize winning board (add feeling node with positive affective valence)
 
@@ -143,6 +465,9 @@ class PerceptualAssociativeMemory:
 
 class CognitiveContent:
 
+    # Called with the node whenever its activation changes (set by the PerceptualAssociativeMemory holding it)
+    _activation_listener = None
+
     def __init__(self, content, current_activation=0.0, bla=0.0,
                  current_incentive_salience=0.0, blis=0.0):
         self.content = content
@@ -172,6 +497,8 @@ class CognitiveContent:
     @current_activation.setter
     def current_activation(self, current_activation):
         self._current_activation = current_activation
+        if self._activation_listener is not None:
+            self._activation_listener(self)
 
     @property
     def base_level_activation(self):
@@ -181,6 +508,8 @@ class CognitiveContent:
     @base_level_activation.setter
     def base_level_activation(self, bla):
         self._bla = bla
+        if self._activation_listener is not None:
+            self._activation_listener(self)
 
     @property
     def activation(self):
@@ -205,7 +534,7 @@ class CognitiveContent:
         return self.content == other.content if hasattr(other, "content") else False
 
     def __hash__(self):
-        return hash(self.content)
+        return hash(content_key(self.content))
 
 
 class FeelingNode(CognitiveContent):
@@ -230,8 +559,91 @@ class StructureBuildingCodelet:
 
         self.id = id
 
+    def select(self, content):
+        return self._select(content)
+
     def apply(self, workspace):
-        return list(map(self._transform, filter(self._select, workspace.csm)))
+        return self.apply_to(workspace.csm)
+
+    def apply_to(self, content):
+        return list(map(self._transform, filter(self._select, content)))
+
+
+def _apply_codelet(codelet, snapshot):
+    return codelet.apply_to(snapshot)
+
+
+class StructureBuildingEngine:
+    """
+    Runs structure building codelets over a snapshot of the CSM and merges the structures they build back into it
+    in one batch.
+
+    A codelet only runs again when content it selects was added to or removed from the CSM since its last run, or
+    when a structure it built was removed (e.g. by the garbage collector).  Changes in activation alone do not make
+    a codelet run again.  Codelets run in the executor if one is given (a process pool requires picklable codelets
+    and content).
+    """
+
+    def __init__(self, codelets=None, executor=None):
+        """
+        :param codelets: list of StructureBuildingCodelets (shared, so codelets can be registered by appending)
+        :param executor: concurrent.futures.Executor (None -> run the codelets in the calling thread)
+        """
+        self.codelets = [] if codelets is None else codelets
+        self.executor = executor
+
+        # CSM nodes by content when the engine last ran
+        self._snapshot = {}
+
+        # Contents of the structures each codelet last built: {id(codelet): set of contents}
+        self._built = {}
+
+        # Codelets run by the last call of run
+        self.last_run = []
+
+    def _dirty_codelets(self, added, removed):
+        removed_keys = {ContentStore._key(node) for node in removed}
+        changed = added + removed
+
+        dirty = []
+        for codelet in self.codelets:
+            built = self._built.get(id(codelet))
+            if built is None or not built.isdisjoint(removed_keys) or any(map(codelet.select, changed)):
+                dirty.append(codelet)
+        return dirty
+
+    def run(self, csm):
+        """
+        Runs the codelets whose input changed and adds the structures they built to the CSM.
+        :return: list of the structures built
+        """
+        if not self.codelets:
+            self.last_run = []
+            return []
+
+        snapshot = {ContentStore._key(node): node for node in csm.content}
+        previous = self._snapshot
+        added = [node for key, node in snapshot.items() if previous.get(key) is not node]
+        removed = [node for key, node in previous.items() if snapshot.get(key) is not node]
+
+        dirty = self._dirty_codelets(added, removed)
+        content = tuple(snapshot.values())
+        if self.executor is None or len(dirty) < 2:
+            results = [codelet.apply_to(content) for codelet in dirty]
+        else:
+            results = list(self.executor.map(_apply_codelet, dirty, [content] * len(dirty)))
+
+        structures = []
+        for codelet, built in zip(dirty, results):
+            self._built[id(codelet)] = {ContentStore._key(node) for node in built}
+            structures.extend(built)
+        csm.receive_content(structures)
+
+        # Structures built in this run are not changes for the next run
+        self._snapshot = {ContentStore._key(node): node for node in csm.content}
+        self.last_run = dirty
+
+        return structures
 
 
 class Decay:
@@ -262,11 +674,18 @@ class GarbageCollector:
         else:
             content = module.content
 
-        for elem in content.copy():
-            # TODO: replace current activation with activation_type
-            # TODO:     'CognitiveContent' object has no attribute 'activation_type'
-            if elem and getattr(elem, removal_activation_type) < EPSILON:
-                content.remove(elem)
+        # TODO: replace current activation with activation_type
+        # TODO:     'CognitiveContent' object has no attribute 'activation_type'
+        def removable(elem):
+            return elem and getattr(elem, removal_activation_type) < EPSILON
+
+        if isinstance(content, list):
+            # Filtered in place in a single pass (list.remove per element is quadratic)
+            content[:] = [elem for elem in content if not removable(elem)]
+        else:
+            for elem in content.copy():
+                if removable(elem):
+                    content.remove(elem)
 
 
 def merge_cue(cue, contents):
@@ -288,9 +707,66 @@ class PerceptualScene:
         merge_cue(cue, self.content)
 
 
+class ContentStore:
+    """
+    An insertion-ordered collection of cognitive content holding at most one node per content.  Adding content that
+    is already held merges it into the held node (keeping the higher current activation) instead of duplicating it.
+    Supports the list operations used on module content (iteration, append, extend, remove, copy) with O(1) removal.
+    """
+
+    def __init__(self, content=()):
+        self._nodes = {}
+        self.extend(content)
+
+    @staticmethod
+    def _key(node):
+        return content_key(getattr(node, 'content', node))
+
+    def append(self, node):
+        key = self._key(node)
+        held = self._nodes.get(key)
+        if held is None:
+            self._nodes[key] = node
+        elif held is not node and node.current_activation > held.current_activation:
+            held.current_activation = node.current_activation
+
+    def extend(self, nodes):
+        for node in nodes:
+            self.append(node)
+
+    def remove(self, node):
+        try:
+            del self._nodes[self._key(node)]
+        except KeyError:
+            raise ValueError('{} not in content'.format(node))
+
+    def get(self, content):
+        """
+        Returns the node held for content (None if there is none).
+        """
+        return self._nodes.get(content_key(content))
+
+    def copy(self):
+        return list(self._nodes.values())
+
+    def __contains__(self, node):
+        return self._key(node) in self._nodes
+
+    def __iter__(self):
+        return iter(self._nodes.values())
+
+    def __len__(self):
+        return len(self._nodes)
+
+
 class CurrentSituationalModel:
-    def __init__(self):
-        self._content = []
+    def __init__(self, capacity=None):
+        """
+        :param capacity: maximum number of nodes; the nodes with the lowest current activation are evicted when
+                         receiving content beyond it (None -> unbounded)
+        """
+        self._content = ContentStore()
+        self.capacity = capacity
 
         self.perceptual_scene = PerceptualScene([])
 
@@ -301,6 +777,13 @@ class CurrentSituationalModel:
 
         self._content.extend(content)
 
+        if self.capacity is not None and len(self._content) > self.capacity:
+            self._evict(len(self._content) - self.capacity)
+
+    def _evict(self, n):
+        for node in heapq.nsmallest(n, self._content, key=lambda node: node.current_activation):
+            self._content.remove(node)
+
     def receive_cued_content(self, cue):
         merge_cue(cue, self.content)
 
@@ -310,7 +793,7 @@ class CurrentSituationalModel:
 
     @property
     def contents_str(self):
-        return recursive_str_parse(self._content)
+        return recursive_str_parse(self._content.copy())
 
     def receive_sensory_scene(self, scene):
 
@@ -332,41 +815,564 @@ class ConsciousContentsQueue:
 class Workspace:
     initial_current_activation = 0.5
 
-    def __init__(self):
-        self.csm = CurrentSituationalModel()
+    def __init__(self, csm_capacity=None):
+        self.csm = CurrentSituationalModel(capacity=csm_capacity)
         self.ccq = ConsciousContentsQueue()
 
 
+class TransientEpisodicMemory:
+    """
+    Stores the content of the workspace of every cycle as an episode in a sparse distributed memory (SDM).
+
+    An episode is encoded as a binary vector with one bit per content (bits are assigned to contents as they are
+    first seen, up to n_bits contents).  It is written to, and read from, the n_active hard locations nearest to it
+    in Hamming distance, so reads and writes are batched numpy operations over all hard locations and cost the same
+    however many episodes have been stored.  Counters decay with every write, so old episodes fade.
+
+    As a cueable module, it recalls the content that co-occurred with the cue in past episodes, and returns what is
+    not in the most recently stored episode as virtual content (which is not stored back in later episodes).  Cues
+    are read in batches (receive_cues), and the version changes with every write.
+    """
+
+    def __init__(self, n_bits=256, n_locations=2000, n_active=20, location_density=0.05, decay=0.01, rng=None):
+        """
+        :param n_bits: length of the episode vectors (maximum number of distinct contents)
+        :param n_locations: number of hard locations
+        :param n_active: number of hard locations (nearest to the address) each read and write uses
+        :param location_density: fraction of the bits set in the addresses of the hard locations
+        :param decay: fraction of every counter lost at each write
+        :param rng: numpy.random.Generator or seed for the addresses of the hard locations (see seed)
+        """
+        self.n_bits = n_bits
+        self.n_active = min(n_active, n_locations)
+        self.decay = decay
+
+        self._n_location_bits = max(1, int(round(location_density * n_bits)))
+        self._counters = np.zeros((n_locations, n_bits), dtype=np.float32)
+
+        # Contents by bit, and bits by content
+        self.vocabulary = []
+        self._bits = {}
+
+        # Most recently stored episode
+        self._context = np.zeros(n_bits, dtype=np.float32)
+
+        # Incremented by every write, so that cached cue results are dropped
+        self.version = 0
+
+        # Hard locations read by a cue of each bit (computed on first use)
+        self._bit_locations = None
+
+        self.seed(rng)
+
+    def seed(self, seed=None):
+        """
+        Draws the addresses of the hard locations.  Stored episodes are addressed by the current addresses, so they
+        are only redrawn while the memory is empty.
+        :param seed: numpy.random.Generator, an int, a numpy.random.SeedSequence or None for fresh entropy
+        """
+        if self.version > 0:
+            return
+
+        rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+        n_locations = len(self._counters)
+
+        # Every hard location address has the same number of bits set, so that the Hamming distance from an address
+        # ranks the hard locations by their overlap with it
+        self._locations = np.zeros((n_locations, self.n_bits), dtype=np.float32)
+        bits = np.argsort(rng.random((n_locations, self.n_bits)), axis=1)[:, :self._n_location_bits]
+        self._locations[np.arange(n_locations)[:, np.newaxis], bits] = 1.0
+        self._location_weights = self._locations.sum(axis=1)
+        self._bit_locations = None
+
+    def _bit(self, content, add=False):
+        key = content_key(content)
+        bit = self._bits.get(key)
+        if bit is None and add and len(self.vocabulary) < self.n_bits:
+            bit = self._bits[key] = len(self.vocabulary)
+            self.vocabulary.append(content)
+        return bit
+
+    def encode(self, contents, add=False):
+        """
+        Returns the episode vector of a collection of cognitive content (contents without a bit are left out unless
+        add is True).
+        """
+        vector = np.zeros(self.n_bits, dtype=np.float32)
+        for content in contents:
+            bit = self._bit(getattr(content, 'content', content), add)
+            if bit is not None:
+                vector[bit] = 1.0
+        return vector
+
+    def decode(self, vector):
+        return [self.vocabulary[bit] for bit in np.flatnonzero(vector) if bit < len(self.vocabulary)]
+
+    def _nearest_locations(self, addresses):
+        # Hamming distance between binary vectors a and l: |a| + |l| - 2 a.l
+        distances = addresses.sum(axis=1, keepdims=True) + self._location_weights - 2.0 * (addresses @ self._locations.T)
+        return np.argpartition(distances, self.n_active - 1, axis=1)[:, :self.n_active]
+
+    def write(self, addresses, data):
+        """
+        Writes a batch of data vectors at a batch of addresses (both of shape (batch, n_bits)).
+        """
+        locations = self._nearest_locations(addresses)
+        self._counters *= (1.0 - self.decay) ** len(addresses)
+        np.add.at(self._counters, locations, (2.0 * data - 1.0)[:, np.newaxis, :])
+        self.version += 1
+
+    def read(self, addresses):
+        """
+        Reads the data vectors stored at a batch of addresses.
+        """
+        return self._read_locations(self._nearest_locations(addresses))
+
+    def _read_locations(self, locations):
+        return (self._counters[locations].sum(axis=1) > 0).astype(np.float32)
+
+    @property
+    def _cue_locations(self):
+        # A cue addresses a single bit, so the hard locations it reads depend only on the bit
+        if self._bit_locations is None:
+            self._bit_locations = self._nearest_locations(np.eye(self.n_bits, dtype=np.float32))
+        return self._bit_locations
+
+    def store(self, contents):
+        """
+        Stores an episode (e.g. the content of the CSM) autoassociatively.
+        """
+        self.store_episodes([contents])
+
+    def store_episodes(self, episodes):
+        if len(episodes) == 0:
+            return
+
+        # Virtual content (e.g. recollections cued from this memory) is not part of what happened
+        vectors = np.stack([self.encode([content for content in contents if not getattr(content, 'virtual', False)],
+                                        add=True) for contents in episodes])
+        self.write(vectors, vectors)
+        self._context = vectors[-1]
+
+    def recall(self, contents):
+        """
+        Returns the contents of the episode recalled by a cue (a collection of cognitive content).
+        """
+        return self.decode(self.read(self.encode(contents)[np.newaxis, :])[0])
+
+    def receive_cue(self, content):
+        return self.receive_cues([content])[0]
+
+    def receive_cues(self, contents):
+        """
+        Cues the memory with every content in one batched read.
+        :return: the cued content of each content (see receive_cue)
+        """
+        results = [None if content is None else [] for content in contents]
+
+        cues = []
+        for i, content in enumerate(contents):
+            bit = None if content is None else self._bit(getattr(content, 'content', None))
+            if bit is not None:
+                cues.append((i, bit))
+        if not cues:
+            return results
+
+        indices, bits = zip(*cues)
+
+        # Recollections not in the current situation (nor the cue itself) are added as virtual content
+        recalled = self._read_locations(self._cue_locations[list(bits)]) * (1.0 - self._context)
+        recalled[np.arange(len(cues)), bits] = 0.0
+        for i, row in zip(indices, recalled):
+            recalled_contents = self.decode(row)
+            if recalled_contents:
+                results[i] = [contents[i]]
+                for recalled_content in recalled_contents:
+                    node = CognitiveContent(recalled_content)
+                    node.virtual = True
+                    results[i].append(node)
+        return results
+
+    @property
+    def content(self):
+        return self.vocabulary
+
+
+class DeclarativeMemory:
+    """
+    Long-term declarative memory kept in a file, so that what the agent learns persists across runs.
+
+    Every entry (e.g. a conscious broadcast) is a fixed-size record of content ids (-1 padded) and an activation in
+    a numpy.memmap, so entries are paged in by the operating system as they are read rather than loaded into memory.
+    The contents themselves are appended, one JSON string per line, to a vocabulary file next to the store.  The only
+    in-memory structures are the vocabulary and an index of the depth most recent entries of every content (for cue
+    lookups), which grow with the number of distinct contents and not with the number of entries.
+
+    A store is opened for writing ('r+') by a single process; any number of processes may open it read-only ('r') and
+    share its pages without copying them.  Readers call refresh to see entries written since they opened the store.
+    A store is pickled by path, so it can be passed to worker processes.
+    """
+
+    MAGIC = 0x4c49444144454d31
+    VERSION = 1
+    HEADER_SIZE = 64
+    INITIAL_CAPACITY = 1024
+
+    # Header fields (int64)
+    _MAGIC, _VERSION, _WIDTH, _COUNT = range(4)
+
+    def __init__(self, path, width=16, depth=16, mode='r+'):
+        """
+        :param path: file of the store (created if missing and mode is 'r+'); the vocabulary is kept in path.vocab
+        :param width: maximum number of contents in an entry (ignored when the store exists)
+        :param depth: number of most recent entries of a content that a cue recalls
+        :param mode: 'r+' to read and write, 'r' to read only
+        """
+        if mode not in ('r', 'r+'):
+            raise ValueError('Unsupported mode: {}'.format(mode))
+
+        self.path = path
+        self.depth = depth
+        self.mode = mode
+
+        if not os.path.exists(path):
+            if mode == 'r':
+                raise FileNotFoundError(path)
+            with open(path, 'wb') as file:
+                header = np.zeros(self.HEADER_SIZE // 8, dtype='<i8')
+                header[[self._MAGIC, self._VERSION, self._WIDTH]] = [self.MAGIC, self.VERSION, width]
+                file.write(header.tobytes())
+            open(self.vocabulary_path, 'w').close()
+
+        self._header = np.memmap(path, dtype='<i8', mode=mode, shape=(self.HEADER_SIZE // 8,))
+        if self._header[self._MAGIC] != self.MAGIC:
+            raise ValueError('Not a declarative memory store: {}'.format(path))
+        if self._header[self._VERSION] != self.VERSION:
+            raise ValueError('Unsupported declarative memory version: {}'.format(self._header[self._VERSION]))
+
+        self.width = int(self._header[self._WIDTH])
+        self.dtype = np.dtype([('contents', '<i4', (self.width,)), ('activation', '<f4')])
+
+        self._entries = None
+        self._capacity = 0
+
+        # Contents by id, and ids by content
+        self.vocabulary = []
+        self._ids = {}
+        self._vocabulary_offset = 0
+
+        # Rows of the most recent entries of every content id, most recent first (-1 padded)
+        self._index = np.full((0, depth), -1, dtype=np.int64)
+        self._indexed = 0
+
+        self._last_broadcast = None
+
+        self.refresh()
+
+    @property
+    def vocabulary_path(self):
+        return self.path + '.vocab'
+
+    def __len__(self):
+        return self._indexed
+
+    @property
+    def version(self):
+        # Changes whenever entries are added, so that cached cue results are dropped
+        return self._indexed
+
+    def __reduce__(self):
+        return self.__class__, (self.path, self.width, self.depth, self.mode)
+
+    def _map(self, capacity):
+        self._entries = np.memmap(self.path, dtype=self.dtype, mode=self.mode, offset=self.HEADER_SIZE,
+                                  shape=(capacity,)) if capacity > 0 else None
+        self._capacity = capacity
+
+    def _file_capacity(self):
+        return (os.path.getsize(self.path) - self.HEADER_SIZE) // self.dtype.itemsize
+
+    def refresh(self):
+        """
+        Reads the contents and indexes the entries added to the store (by this or another process) since the last
+        refresh.
+        """
+        # A writer appends the contents of an entry before counting it, so reading the count first guarantees that
+        # the vocabulary read next covers every counted entry
+        count = int(self._header[self._COUNT])
+        self._read_vocabulary()
+
+        if count > self._capacity:
+            self._map(self._file_capacity())
+        self._index_rows(self._indexed, count)
+
+    def _read_vocabulary(self):
+        with open(self.vocabulary_path) as file:
+            file.seek(self._vocabulary_offset)
+            for line in iter(file.readline, ''):
+                # A line still being written is read by the next refresh
+                if not line.endswith('\n'):
+                    break
+                self._add_content(json.loads(line))
+                self._vocabulary_offset = file.tell()
+
+    def _add_content(self, content):
+        self._ids[content] = len(self.vocabulary)
+        self.vocabulary.append(content)
+        if len(self.vocabulary) > len(self._index):
+            grown = np.full((max(2 * len(self._index), 64), self.depth), -1, dtype=np.int64)
+            grown[:len(self._index)] = self._index
+            self._index = grown
+
+    def _index_rows(self, start, stop, chunk_size=65536):
+        # Keeps the depth most recent rows of every content, reading the entries a chunk at a time
+        if start >= stop:
+            return
+        if stop - start <= 16:
+            for row, ids in zip(range(start, stop), self._entries['contents'][start:stop]):
+                for content_id in ids[ids >= 0].tolist():
+                    rows = self._index[content_id]
+                    rows[1:] = rows[:-1]
+                    rows[0] = row
+            self._indexed = max(self._indexed, stop)
+            return
+
+        # Scan the new entries from the most recent, a chunk at a time, until every content has depth rows
+        index = np.full_like(self._index, -1)
+        filled = np.zeros(len(index), dtype=np.int64)
+        for chunk_stop in range(stop, start, -chunk_size):
+            chunk_start = max(start, chunk_stop - chunk_size)
+            contents = np.asarray(self._entries['contents'][chunk_start:chunk_stop])[::-1]
+            rows = np.repeat(np.arange(chunk_stop - 1, chunk_start - 1, -1), self.width)
+            ids = contents.ravel()
+            valid = ids >= 0
+            ids, rows = ids[valid], rows[valid]
+
+            # Group by id, keeping the rows of each group most recent first, and rank them after the filled rows
+            order = np.argsort(ids, kind='stable')
+            ids, rows = ids[order], rows[order]
+            starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+            counts = np.diff(np.r_[starts, len(ids)])
+            ranks = np.arange(len(ids)) - np.repeat(starts, counts) + filled[ids]
+            recent = ranks < self.depth
+            index[ids[recent], ranks[recent]] = rows[recent]
+            filled[ids[starts]] = np.minimum(filled[ids[starts]] + counts, self.depth)
+
+            if filled[:len(self.vocabulary)].min(initial=self.depth) >= self.depth:
+                break
+
+        # Older rows fill the remaining places
+        columns = np.arange(self.depth) - filled[:, np.newaxis]
+        older = columns >= 0
+        index[older] = self._index[np.nonzero(older)[0], columns[older]]
+        self._index = index
+        self._indexed = max(self._indexed, stop)
+
+    def _encode(self, contents):
+        # Ids of the contents (up to width of them), adding new contents to the vocabulary file
+        ids = []
+        new_contents = []
+        for content in contents:
+            key = getattr(content, 'content', content)
+            if not isinstance(key, str):
+                continue
+            content_id = self._ids.get(key)
+            if content_id is None:
+                content_id = len(self.vocabulary)
+                self._add_content(key)
+                new_contents.append(key)
+            if content_id not in ids:
+                ids.append(content_id)
+            if len(ids) == self.width:
+                break
+
+        if new_contents:
+            with open(self.vocabulary_path, 'a') as file:
+                file.write(''.join(json.dumps(content) + '\n' for content in new_contents))
+                self._vocabulary_offset = file.tell()
+        return ids
+
+    def store(self, contents, activation=0.0):
+        """
+        Appends an entry (a collection of cognitive content).
+        """
+        self.store_entries([(contents, activation)])
+
+    def store_entries(self, entries):
+        """
+        Appends a batch of (contents, activation) entries.
+        """
+        if self.mode != 'r+':
+            raise ValueError('Declarative memory is open read-only: {}'.format(self.path))
+
+        records = np.zeros(len(entries), dtype=self.dtype)
+        records['contents'] = -1
+        for record, (contents, activation) in zip(records, entries):
+            ids = self._encode(contents)
+            record['contents'][:len(ids)] = ids
+            record['activation'] = activation
+
+        count = int(self._header[self._COUNT])
+        if count + len(records) > self._capacity:
+            capacity = max(self.INITIAL_CAPACITY, 2 * self._capacity, count + len(records))
+            if self._entries is not None:
+                self._entries.flush()
+            with open(self.path, 'r+b') as file:
+                file.truncate(self.HEADER_SIZE + capacity * self.dtype.itemsize)
+            self._map(capacity)
+
+        self._entries[count:count + len(records)] = records
+        self._header[self._COUNT] = count + len(records)
+        self._index_rows(count, count + len(records))
+
+    def flush(self):
+        if self.mode == 'r+':
+            if self._entries is not None:
+                self._entries.flush()
+            self._header.flush()
+
+    def recall(self, content):
+        """
+        Returns the contents of the most recent entries that contain a content (most recent first, without the content
+        itself).
+        """
+        content_id = self._ids.get(content)
+        if content_id is None:
+            return []
+
+        rows = self._index[content_id]
+        rows = rows[rows >= 0]
+        recalled = collections.OrderedDict()
+        for ids in self._entries['contents'][rows]:
+            for recalled_id in ids[ids >= 0].tolist():
+                if recalled_id != content_id:
+                    recalled[self.vocabulary[recalled_id]] = None
+        return list(recalled)
+
+    def receive_cue(self, content):
+        if content is None:
+            return None
+
+        key = getattr(content, 'content', None)
+        if not isinstance(key, str):
+            return []
+
+        cued_content = [content]
+        for recalled_content in self.recall(key):
+            node = CognitiveContent(recalled_content)
+            node.virtual = True
+            cued_content.append(node)
+        return cued_content if len(cued_content) > 1 else []
+
+    def receive_broadcast(self, broadcast):
+        # Read-only stores (e.g. shared by worker processes) only recall
+        if self.mode != 'r+' or broadcast is None or broadcast is self._last_broadcast:
+            return
+        self._last_broadcast = broadcast
+
+        self.store(sorted(broadcast.content, key=lambda node: node.salience, reverse=True), broadcast.activation)
+
+
+def merge_cues(cues, contents):
+    """
+    Applies a batch of (content, cued content) pairs to contents in a single pass (see merge_cue).  Content that
+    cues exactly itself is left in place.
+    """
+    replaced = collections.OrderedDict()
+    additions = []
+    for content, cued_content in cues:
+        if len(cued_content) > 0 and not (len(cued_content) == 1 and cued_content[0] is content):
+            # Content cued by several modules is replaced once
+            replaced[id(content)] = content
+            additions.extend(cued_content)
+
+        for elem in cued_content:
+            elem.current_activation = content.current_activation
+
+    if len(replaced) == 0:
+        return
+
+    if isinstance(contents, list):
+        contents[:] = [content for content in contents if id(content) not in replaced]
+    else:
+        for content in replaced.values():
+            contents.remove(content)
+    contents.extend(additions)
+
+
 class CueingProcess:
+    """
+    Cues the cueable modules with the content of the perceptual scene and the CSM.
+
+    Cue results are cached per module and content, for modules that have a version attribute.  A module's cache is
+    dropped when its version changes (i.e. when its contents change).
+    """
+
     def __init__(self, cueable_modules=None):
         self.cueable_modules = cueable_modules or []
 
+        # {id(module): (module version, {content: cued content})}
+        self._cache = {}
+
+    def _cue(self, module, contents):
+        """
+        Cues a module with every content, returning the cued content of each.  Modules with a receive_cues method are
+        cued with all the (uncached) contents at once.
+        """
+        version = getattr(module, 'version', None)
+        cache = None
+        if version is not None:
+            cache = self._cache.get(id(module))
+            if cache is None or cache[0] != version:
+                cache = self._cache[id(module)] = (version, {})
+            cache = cache[1]
+
+        results = [None] * len(contents)
+        misses = []
+        for i, content in enumerate(contents):
+            key = content_key(content.content) if hasattr(content, 'content') else None
+            try:
+                results[i] = cache[key]
+            except (KeyError, TypeError):
+                # Not cached yet (or uncacheable: no cache, no content or unhashable content)
+                misses.append(i)
+
+        if hasattr(module, 'receive_cues'):
+            cued = module.receive_cues([contents[i] for i in misses])
+        else:
+            cued = [module.receive_cue(contents[i]) for i in misses]
+
+        for i, cued_content in zip(misses, cued):
+            results[i] = cued_content
+            key = content_key(contents[i].content) if hasattr(contents[i], 'content') else None
+            if cache is not None and key is not None:
+                try:
+                    cache[key] = cued_content
+                except TypeError:
+                    pass
+        return results
+
     def cue_for(self, cuee):
-        update_for_perceptual_scene = []
-        for content in cuee.content:
-            for module in self.cueable_modules:
-                cued_content = module.receive_cue(content)
+        contents = list(cuee.content)
+        results = [self._cue(module, contents) for module in self.cueable_modules]
+
+        cues = []
+        for i, content in enumerate(contents):
+            for module_results in results:
+                cued_content = module_results[i]
                 if cued_content is not None:
                     #TODO: merge_cue and CSM.receive_cued_content do the same thing
                     #TODO: merge cue allows reusability. Need to make code consistent
-                    update_for_perceptual_scene.append([content, cued_content])
+                    cues.append((content, cued_content))
 
-        for elem in update_for_perceptual_scene:
-            merge_cue(elem, cuee.content)
+        merge_cues(cues, cuee.content)
 
     def process(self, workspace):
         # TODO: Currently implemented as 2 passes: 1 for perceptual scene and
         # another for generated content in the csm.  Need to rethink this later.
 
-        cue = self.cue_for(workspace.csm.perceptual_scene)
-        if cue is not None:
-            for elem in cue:
-                merge_cue(elem, workspace.csm.perceptual_scene)
-
-        cue = self.cue_for(workspace.csm)
-        if cue is not None:
-            for elem in cue:
-                merge_cue(elem, workspace.csm)
+        self.cue_for(workspace.csm.perceptual_scene)
+        self.cue_for(workspace.csm)
 
 
 class AttentionCodelet:
@@ -532,7 +1538,7 @@ class Scheme:
 class ProceduralMemory:
 
     def __init__(self, initial_schemes=None, context_match=lambda s, b: 0.0, result_match=lambda s, b: 0.0,
-                 activation_threshold=0.6):
+                 activation_threshold=0.6, rng=None):
         self._schemes = [] if initial_schemes is None else list(initial_schemes)
         self._context_match = context_match
         self._result_match = result_match
@@ -544,6 +1550,9 @@ class ProceduralMemory:
         # Use for learning
         self.recently_selected_behaviors = collections.deque(maxlen=3)
 
+        # numpy.random.Generator (defaults to numpy's global random state)
+        self.rng = np.random if rng is None else rng
+
     @property
     def candidate_behaviors(self):
         # Find schemes with activation >= activation_threshold
@@ -551,7 +1560,8 @@ class ProceduralMemory:
 
         # if no schemes above activation threshold return a random scheme
         if len(candidate_behaviors) == 0 and len(self._schemes) > 0:
-            return [np.random.choice(self._schemes, p=softmax([s.activation for s in self._schemes]))]
+            p = softmax([s.activation for s in self._schemes])
+            return [self._schemes[self.rng.choice(len(self._schemes), p=p)]]
 
         return candidate_behaviors
 
@@ -628,9 +1638,12 @@ def exact_match_by_board(content, scheme):
 
 
 class ActionSelection:
-    def __init__(self):
+    def __init__(self, rng=None):
         self.behaviors = []
 
+        # numpy.random.Generator (defaults to numpy's global random state)
+        self.rng = np.random if rng is None else rng
+
     def receive_behaviors(self, behaviors):
         self.behaviors = behaviors
 
@@ -649,8 +1662,8 @@ class ActionSelection:
             return value
 
         max_value = value_function(max(self.behaviors, key=lambda b: value_function(b)))
-        selected_behavior = np.random.choice([behavior for behavior in self.behaviors
-                                              if value_function(behavior) == max_value])
+        best_behaviors = [behavior for behavior in self.behaviors if value_function(behavior) == max_value]
+        selected_behavior = best_behaviors[self.rng.choice(len(best_behaviors))]
         return selected_behavior
 
 
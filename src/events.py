@@ -0,0 +1,43 @@
+import collections
+
+# Events published by the agent during a cognitive cycle.  Every event carries the publishing agent and the
+# number of the cycle (starting from 0).
+CycleStarted = collections.namedtuple('CycleStarted', ['agent', 'cycle', 'observation', 'reward'])
+BroadcastSent = collections.namedtuple('BroadcastSent', ['agent', 'cycle', 'broadcast'])
+BehaviorSelected = collections.namedtuple('BehaviorSelected', ['agent', 'cycle', 'behavior'])
+MotorCommandIssued = collections.namedtuple('MotorCommandIssued', ['agent', 'cycle', 'motor_command'])
+HousekeepingStarted = collections.namedtuple('HousekeepingStarted', ['agent', 'cycle'])
+CycleEnded = collections.namedtuple('CycleEnded', ['agent', 'cycle', 'motor_command'])
+
+EVENT_TYPES = (CycleStarted, BroadcastSent, BehaviorSelected, MotorCommandIssued, HousekeepingStarted, CycleEnded)
+
+
+class EventBus:
+    """
+    Dispatches events to the subscribers of their type.  Publishers should check has_subscribers before building
+    an event, so that an event type without subscribers costs a single dictionary lookup.
+    """
+
+    def __init__(self):
+        self._subscribers = {event_type: [] for event_type in EVENT_TYPES}
+
+    def subscribe(self, event_type, callback):
+        """
+        Registers callback(event) for events of event_type.
+        :return: the callback (so that it can be unsubscribed later)
+        """
+        if event_type not in self._subscribers:
+            raise ValueError('Unknown event type: {}'.format(event_type))
+
+        self._subscribers[event_type].append(callback)
+        return callback
+
+    def unsubscribe(self, event_type, callback):
+        self._subscribers[event_type].remove(callback)
+
+    def has_subscribers(self, event_type):
+        return len(self._subscribers[event_type]) > 0
+
+    def publish(self, event):
+        for callback in self._subscribers[type(event)]:
+            callback(event)
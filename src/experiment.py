@@ -1,29 +1,152 @@
 from common import *
+import argparse
+import concurrent.futures
+
 import tqdm
 import numpy as np
-from agent import run
+from scipy.stats import t as student_t
+from agent import Agent
 
 import gym
 import sys
 sys.path.append("..")
 import gym_tictactoe  # Needed to add 'TicTacToe-v0' into gym registry
+from gym_tictactoe.envs import TicTacToeEnv
 
 import logging
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 # Number of cognitive cycles to execute (None -> forever)
-# Number of cognitive cycles to execute (None -> forever)
 N_STEPS = 1000
+N_TRIALS = 100
 experimenting = True
 
 
+class OutcomeCounter:
+    """
+    Wraps an environment and counts the games won, drawn and lost by the agent.
+    """
+
+    def __init__(self, environment):
+        self.environment = environment
+        self.wins = 0
+        self.draws = 0
+        self.losses = 0
+
+    def step(self, action):
+        obs, reward, done, info = self.environment.step(action)
+
+        # done is also returned for post-game actions, which do not end a game
+        if done and action is not None:
+            if reward == self.environment.win_reward:
+                self.wins += 1
+            elif reward == self.environment.lose_reward:
+                self.losses += 1
+            else:
+                self.draws += 1
+
+        return obs, reward, done, info
+
+    def render(self, *args, **kwargs):
+        return self.environment.render(*args, **kwargs)
+
+    def reset(self):
+        return self.environment.reset()
+
+
+def run_trial(trial, seed_sequence, n_steps=N_STEPS, env_kwargs=None):
+    """
+    Runs a single trial: a new agent playing n_steps cognitive cycles against a new environment.
+    :param trial: trial number (returned with the results)
+    :param seed_sequence: numpy.random.SeedSequence from which the environment's and agent's streams are spawned
+    :return: dict of trial results
+    """
+    env_seed, agent_seed = seed_sequence.spawn(2)
+
+    environment = TicTacToeEnv(**(env_kwargs or {}))
+    environment.seed(env_seed)
+    environment.reset()
+
+    counter = OutcomeCounter(environment)
+    agent = Agent(rng=agent_seed)
+
+    steps, reward = agent.run(counter, n=n_steps, render=False)
+
+    return {'trial': trial,
+            'steps': steps,
+            'reward': reward,
+            'wins': counter.wins,
+            'draws': counter.draws,
+            'losses': counter.losses
+            }
+
+
+def iter_trials(n_trials=N_TRIALS, n_steps=N_STEPS, seed=None, max_workers=None, env_kwargs=None):
+    """
+    Runs independent trials in a pool of worker processes and yields each trial's results as it finishes.
+    :param seed: an int or numpy.random.SeedSequence; every trial gets its own spawned stream
+    :param max_workers: number of worker processes (None -> number of CPUs, 1 -> run in this process)
+    """
+    seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    trial_seeds = seed_sequence.spawn(n_trials)
+
+    if max_workers == 1:
+        for trial, trial_seed in enumerate(trial_seeds):
+            yield run_trial(trial, trial_seed, n_steps, env_kwargs)
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(run_trial, trial, trial_seed, n_steps, env_kwargs)
+                   for trial, trial_seed in enumerate(trial_seeds)]
+
+        for future in concurrent.futures.as_completed(futures):
+            yield future.result()
+
+
+def summarize(results, confidence=0.95):
+    """
+    Aggregates trial results: mean reward with its confidence interval and total win / draw / loss counts.
+    """
+    rewards = np.array([result['reward'] for result in results], dtype=float)
+    n = len(rewards)
+
+    mean = np.mean(rewards) if n > 0 else float('nan')
+    if n > 1:
+        half_width = student_t.ppf((1 + confidence) / 2, n - 1) * np.std(rewards, ddof=1) / np.sqrt(n)
+    else:
+        half_width = float('nan')
+
+    return {'trials': n,
+            'mean_reward': mean,
+            'ci_low': mean - half_width,
+            'ci_high': mean + half_width,
+            'confidence': confidence,
+            'wins': sum(result['wins'] for result in results),
+            'draws': sum(result['draws'] for result in results),
+            'losses': sum(result['losses'] for result in results)
+            }
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(description='Runs independent trials of the agent in parallel.')
+    parser.add_argument('--trials', type=int, default=N_TRIALS, help='number of trials')
+    parser.add_argument('--steps', type=int, default=N_STEPS, help='cognitive cycles per trial')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: number of CPUs)')
+    parser.add_argument('--seed', type=int, default=None, help='root seed of the experiment')
+    parser.add_argument('--opponent', default='random', help="opponent policy ('random', 'heuristic' or 'perfect')")
+    return parser.parse_args(args)
+
+
 if __name__ == '__main__':
-    rewards = []
-    for i in tqdm.tqdm(range(100)):
-        environment = gym.make('TicTacToe-v0')
-        environment.reset()
-        _, reward = run(environment, n=N_STEPS, render=not experimenting)
-        rewards.append(reward)
+    args = parse_args()
 
-    print(np.mean(rewards))
+    results = []
+    for result in tqdm.tqdm(iter_trials(args.trials, args.steps, seed=args.seed, max_workers=args.workers,
+                                        env_kwargs={'opponent': args.opponent}),
+                            total=args.trials):
+        results.append(result)
 
+    summary = summarize(results)
+    print('mean reward: {mean_reward:.4f} ({confidence:.0%} CI: {ci_low:.4f} to {ci_high:.4f}) over {trials} trials'
+          .format(**summary))
+    print('wins: {wins}  draws: {draws}  losses: {losses}'.format(**summary))
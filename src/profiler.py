@@ -0,0 +1,114 @@
+import collections
+import csv
+import json
+import time
+
+StageRecord = collections.namedtuple('StageRecord', ['cycle', 'stage', 'wall', 'cpu'])
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+# Context manager used in place of a stage timer when profiling is off
+NULL_STAGE = _NullStage()
+
+
+class _StageTimer:
+    def __init__(self, profiler, stage):
+        self._profiler = profiler
+        self._stage = stage
+
+    def __enter__(self):
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc_info):
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        self._profiler.records.append(StageRecord(self._profiler.cycle, self._stage, wall, cpu))
+        return False
+
+
+class CycleProfiler:
+    """
+    Records the wall-clock and CPU time of each stage of the cognitive cycle, cycle by cycle.
+
+        profiler = CycleProfiler()
+        agent = Agent(profiler=profiler)
+        agent.run(environment, n=1000, render=False)
+        print(profiler.summary())
+        profiler.to_csv('timings.csv')
+    """
+
+    def __init__(self):
+        self.records = []
+        self.cycle = 0
+
+    def stage(self, name):
+        """
+        Returns a context manager that times the enclosed code as one call of the named stage in the current cycle.
+        """
+        return _StageTimer(self, name)
+
+    def reset(self):
+        self.records = []
+
+    @property
+    def stages(self):
+        """
+        Stage names in the order they were first recorded.
+        """
+        return list(collections.OrderedDict.fromkeys(record.stage for record in self.records))
+
+    def totals(self):
+        """
+        Returns {stage: {'calls': ..., 'wall': ..., 'cpu': ...}} summed over all recorded cycles.
+        """
+        totals = collections.OrderedDict((stage, {'calls': 0, 'wall': 0.0, 'cpu': 0.0}) for stage in self.stages)
+        for record in self.records:
+            total = totals[record.stage]
+            total['calls'] += 1
+            total['wall'] += record.wall
+            total['cpu'] += record.cpu
+        return totals
+
+    def per_cycle(self, stage, field='wall'):
+        """
+        Returns {cycle: total time} of a stage, e.g. to see how a stage's cost grows over a run.
+        """
+        times = collections.OrderedDict()
+        for record in self.records:
+            if record.stage == stage:
+                times[record.cycle] = times.get(record.cycle, 0.0) + getattr(record, field)
+        return times
+
+    def to_json(self, path):
+        with open(path, 'w') as file:
+            json.dump({'totals': self.totals(),
+                       'records': [record._asdict() for record in self.records]}, file, indent=1)
+
+    def to_csv(self, path):
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(StageRecord._fields)
+            writer.writerows(self.records)
+
+    def summary(self):
+        """
+        Returns a table of the calls, total and mean wall time, and total CPU time of each stage.
+        """
+        totals = self.totals()
+        all_wall = sum(total['wall'] for total in totals.values()) or 1.0
+
+        lines = ['{:<24}{:>8}{:>12}{:>12}{:>12}{:>8}'.format('stage', 'calls', 'wall (s)', 'mean (us)', 'cpu (s)', '%')]
+        for stage, total in totals.items():
+            lines.append('{:<24}{:>8}{:>12.4f}{:>12.1f}{:>12.4f}{:>8.1f}'.format(
+                stage, total['calls'], total['wall'], 1e6 * total['wall'] / max(total['calls'], 1), total['cpu'],
+                100.0 * total['wall'] / all_wall))
+        return '\n'.join(lines)
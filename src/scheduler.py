@@ -0,0 +1,229 @@
+import asyncio
+import inspect
+
+from events import CycleStarted, HousekeepingStarted, CycleEnded
+
+# Stages run as coroutines by AsyncScheduler, in the order of the data flowing between them
+STAGES = ('environment', 'perception', 'attention', 'global_workspace', 'action', 'housekeeping')
+
+
+def _put_latest(queue, item):
+    """
+    Puts an item into a bounded queue, dropping the oldest item when the queue is full.  A stage that falls behind
+    therefore always works on the newest input instead of a backlog.
+    """
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(item)
+
+
+class SyncScheduler:
+    """
+    Runs the cognitive cycle sequentially, exactly as Agent.run does.
+    """
+
+    def __init__(self, agent, environment):
+        self.agent = agent
+        self.environment = environment
+
+    def run(self, n=None):
+        return self.agent.run(self.environment, n=n, render=False)
+
+
+class AsyncScheduler:
+    """
+    Runs the stages of the agent's cognitive cycle as asyncio coroutines that communicate through bounded queues:
+
+        environment -> perception -> attention -> global_workspace -> action -> environment
+
+    while housekeeping runs on a timer.  Each stage waits for its input and then for its period (in seconds) before
+    its next tick, so slow stages run at lower rates and drop stale inputs instead of blocking the others.
+
+    The environment does not wait for the agent: after waiting up to its period for a new motor command, it steps with
+    the most recent one (as Agent.run does when no behavior was selected).  Environments whose step is a coroutine
+    function are awaited, so that the agent keeps perceiving and deciding during environment I/O.
+
+    If an executor is given, the action stage (procedural memory and action selection) runs in it, overlapping with
+    the environment and perception.  The attention and housekeeping stages, which share procedural memory and the
+    attention codelets with the action stage, never run at the same time as it.
+
+    Every environment step is one cycle: perception publishes CycleStarted, and CycleEnded is published when the
+    next observation arrives (or when the run stops).
+    """
+
+    def __init__(self, agent, environment, periods=None, queue_size=1, executor=None):
+        """
+        :param periods: {stage: seconds between ticks} (see STAGES; by default every stage runs as often as its
+                        input allows, the environment waits up to 0.01s for a command and housekeeping runs every
+                        0.01s)
+        :param queue_size: capacity of the queues between stages
+        :param executor: concurrent.futures.Executor for the action stage (None -> run it in the event loop)
+        """
+        self.agent = agent
+        self.environment = environment
+        self.periods = {stage: 0.0 for stage in STAGES}
+        self.periods.update(environment=0.01, housekeeping=0.01)
+        if periods is not None:
+            unknown = set(periods) - set(STAGES)
+            if unknown:
+                raise ValueError('Unknown stages: {}'.format(', '.join(sorted(unknown))))
+            self.periods.update(periods)
+
+        self.queue_size = queue_size
+        self.executor = executor
+
+        # Number of ticks of each stage in the last run
+        self.ticks = {stage: 0 for stage in STAGES}
+
+    def run(self, n=None):
+        """
+        Runs the agent for n environment steps (forever if n is None).
+        :return: (steps, total reward) as returned by Agent.run
+        """
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(self.run_async(n))
+        finally:
+            loop.close()
+
+    async def run_async(self, n=None):
+        self.ticks = {stage: 0 for stage in STAGES}
+        self._steps = 0
+        self._total_reward = 0.0
+        self._cycle_open = False
+
+        self._sensations = asyncio.Queue(self.queue_size)
+        self._percepts = asyncio.Queue(self.queue_size)
+        self._coalitions = asyncio.Queue(self.queue_size)
+        self._broadcasts = asyncio.Queue(self.queue_size)
+        self._commands = asyncio.Queue(self.queue_size)
+        self._lock = asyncio.Lock()
+
+        workers = [asyncio.ensure_future(coroutine) for coroutine in
+                   [self._perception(), self._attention(), self._global_workspace(), self._action(),
+                    self._housekeeping()]]
+        try:
+            await self._environment(n)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self._end_cycle()
+
+        return self._steps, self._total_reward
+
+    async def _tick(self, stage):
+        self.ticks[stage] += 1
+        await asyncio.sleep(self.periods[stage])
+
+    async def _environment(self, n):
+        agent = self.agent
+        step = self.environment.step
+
+        while n is None or self._steps < n:
+            if self._steps > 0:
+                try:
+                    await asyncio.wait_for(self._commands.get(), self.periods['environment'])
+                except asyncio.TimeoutError:
+                    pass
+
+            result = step(agent.motor_command)
+            if inspect.isawaitable(result):
+                result = await result
+            obs, reward, done, info = result
+
+            self._total_reward += reward if abs(reward) > .99 else 0.0
+            self._steps += 1
+            self.ticks['environment'] += 1
+
+            _put_latest(self._sensations, (obs, reward))
+            await asyncio.sleep(0)
+
+    async def _perception(self):
+        agent = self.agent
+        events = agent.events
+
+        while True:
+            obs, reward = await self._sensations.get()
+
+            self._end_cycle()
+            if agent.profiler is not None:
+                agent.profiler.cycle = agent.cycle
+            if events.has_subscribers(CycleStarted):
+                events.publish(CycleStarted(agent, agent.cycle, obs, reward))
+            self._cycle_open = True
+
+            agent.perceive(obs, reward)
+
+            _put_latest(self._percepts, agent.cycle)
+            await self._tick('perception')
+
+    async def _attention(self):
+        while True:
+            await self._percepts.get()
+            async with self._lock:
+                coalitions = self.agent.attend()
+
+            _put_latest(self._coalitions, coalitions)
+            await self._tick('attention')
+
+    async def _global_workspace(self):
+        while True:
+            coalitions = await self._coalitions.get()
+            broadcast = self.agent.compete(coalitions)
+
+            if broadcast is not None:
+                _put_latest(self._broadcasts, broadcast)
+            await self._tick('global_workspace')
+
+    async def _action(self):
+        agent = self.agent
+
+        while True:
+            broadcast = await self._broadcasts.get()
+            async with self._lock:
+                if self.executor is None:
+                    command = agent.act(broadcast)
+                else:
+                    # get_event_loop returns the running loop inside a coroutine (get_running_loop needs 3.7)
+                    loop = asyncio.get_event_loop()
+                    command = await loop.run_in_executor(self.executor, agent.act, broadcast)
+
+            _put_latest(self._commands, command)
+            await self._tick('action')
+
+    async def _housekeeping(self):
+        agent = self.agent
+        events = agent.events
+
+        while True:
+            await asyncio.sleep(self.periods['housekeeping'])
+            async with self._lock:
+                if events.has_subscribers(HousekeepingStarted):
+                    events.publish(HousekeepingStarted(agent, agent.cycle))
+                agent.housekeeping()
+            self.ticks['housekeeping'] += 1
+
+    def _end_cycle(self):
+        agent = self.agent
+        if not self._cycle_open:
+            return
+
+        if agent.events.has_subscribers(CycleEnded):
+            agent.events.publish(CycleEnded(agent, agent.cycle, agent.motor_command))
+        agent.cycle += 1
+        self._cycle_open = False
+
+
+def make_scheduler(agent, environment, mode='sync', **kwargs):
+    """
+    :param mode: 'sync' (the sequential cycle of Agent.run) or 'async' (AsyncScheduler)
+    :param kwargs: passed to AsyncScheduler
+    """
+    if mode == 'sync':
+        if kwargs:
+            raise TypeError('The sync scheduler takes no options: {}'.format(', '.join(sorted(kwargs))))
+        return SyncScheduler(agent, environment)
+    if mode == 'async':
+        return AsyncScheduler(agent, environment, **kwargs)
+    raise ValueError('Unknown scheduler mode: {}'.format(mode))
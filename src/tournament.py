@@ -0,0 +1,269 @@
+import argparse
+import collections
+import concurrent.futures
+import itertools
+import os
+
+import numpy as np
+
+import checkpoint
+from agent import Agent
+
+import sys
+sys.path.append("..")
+from gym_tictactoe.envs.board import X, O, BitBoard
+from gym_tictactoe.envs.opponents import make_opponent
+
+# Rewards fed back to agents (same values as TicTacToeEnv)
+WIN_REWARD = 1
+LOSE_REWARD = -1
+DRAW_REWARD = 0
+ILLEGAL_MOVE_REWARD = -0.1
+
+# Cognitive cycles an agent may spend on one move before forfeiting the game
+MAX_CYCLES_PER_MOVE = 10
+
+ELO_INITIAL = 1500.0
+ELO_K = 32.0
+
+# A tournament entrant.  kind is 'agent' (config: Agent keyword arguments), 'checkpoint' (config: {'path': ...}) or
+# 'policy' (config: {'policy': a name registered in gym_tictactoe.envs.opponents}).  Entrants are plain data, so
+# that they can be sent to worker processes.
+Entrant = collections.namedtuple('Entrant', ['name', 'kind', 'config'])
+
+
+def agent_entrant(name, **agent_kwargs):
+    return Entrant(name, 'agent', agent_kwargs)
+
+
+def checkpoint_entrant(path, name=None):
+    return Entrant(name or os.path.splitext(os.path.basename(path))[0], 'checkpoint', {'path': path})
+
+
+def policy_entrant(policy, name=None):
+    return Entrant(name or policy, 'policy', {'policy': policy})
+
+
+class PolicyPlayer:
+    """
+    Plays a registered opponent policy, for either side.
+    """
+
+    def __init__(self, policy, rng):
+        self._policies = {mark: make_opponent(policy, mark=mark, rng=rng) for mark in [X, O]}
+
+    def move(self, board, mark):
+        return self._policies[mark](board)
+
+    def end_game(self, board, mark, reward):
+        pass
+
+
+class AgentPlayer:
+    """
+    Plays an agent.  The agent always sees the board from X's side (as it does in TicTacToeEnv), so it plays the same
+    way whether it moves first or second.  Illegal moves are fed back with the environment's illegal move reward and
+    the agent cycles again, forfeiting the game after max_cycles cycles without a legal move.
+    """
+
+    def __init__(self, agent, max_cycles=MAX_CYCLES_PER_MOVE):
+        self.agent = agent
+        self.max_cycles = max_cycles
+        self._reward = 0
+
+    def move(self, board, mark):
+        observation = board.asarray() * mark
+
+        for cycle in range(self.max_cycles):
+            command = self.agent.step(observation, self._reward)
+
+            if command is not None and command.actuator == 'move' and 0 <= command.value < len(board) \
+                    and board.is_blank(command.value):
+                self._reward = 0
+                return command.value
+
+            self._reward = ILLEGAL_MOVE_REWARD
+
+        # Forfeit
+        return None
+
+    def end_game(self, board, mark, reward):
+        # The agent perceives the final board and the outcome of the game
+        self.agent.step(board.asarray() * mark, reward)
+        self._reward = 0
+
+
+def make_player(entrant, seed_sequence):
+    """
+    Creates a fresh player for an entrant.
+    :param seed_sequence: numpy.random.SeedSequence for the player's random choices
+    """
+    if entrant.kind == 'policy':
+        return PolicyPlayer(entrant.config['policy'], np.random.default_rng(seed_sequence))
+    if entrant.kind == 'agent':
+        return AgentPlayer(Agent(rng=seed_sequence, **entrant.config))
+    if entrant.kind == 'checkpoint':
+        agent = checkpoint.load(entrant.config['path'])
+        agent.seed(seed_sequence)
+        return AgentPlayer(agent)
+    raise ValueError('Unknown entrant kind: {}'.format(entrant.kind))
+
+
+def play_game(first, second):
+    """
+    Plays one game; first plays X and moves first.  A player that cannot make a legal move forfeits.
+    :return: 1 if first wins, -1 if second wins, 0 for a draw
+    """
+    board = BitBoard()
+    players = [(first, X), (second, O)]
+
+    outcome = 0
+    for turn in itertools.count():
+        player, mark = players[turn % 2]
+        position = player.move(board, mark)
+        if position is None:
+            outcome = -mark
+            break
+
+        board[position] = mark
+        if board.has_winner(position):
+            outcome = mark
+            break
+        if board.is_full():
+            break
+
+    first.end_game(board, X, WIN_REWARD if outcome == X else LOSE_REWARD if outcome == O else DRAW_REWARD)
+    second.end_game(board, O, WIN_REWARD if outcome == O else LOSE_REWARD if outcome == X else DRAW_REWARD)
+
+    return outcome
+
+
+def play_match(i, j, entrant_i, entrant_j, n_games, seed_sequence):
+    """
+    Plays a match of n_games between two fresh players, alternating which of them moves first.
+    :param i, j: indices of the entrants (returned with the results)
+    :return: dict with the outcome of every game from the point of view of entrant i (1 win, 0 draw, -1 loss)
+    """
+    seed_i, seed_j = seed_sequence.spawn(2)
+    player_i = make_player(entrant_i, seed_i)
+    player_j = make_player(entrant_j, seed_j)
+
+    outcomes = []
+    for game in range(n_games):
+        if game % 2 == 0:
+            outcomes.append(play_game(player_i, player_j))
+        else:
+            outcomes.append(-play_game(player_j, player_i))
+
+    return {'i': i, 'j': j, 'outcomes': outcomes}
+
+
+def elo_ratings(n_entrants, matches, k=ELO_K, initial=ELO_INITIAL):
+    """
+    Replays the games of all matches in a fixed order (by pair, then game) with the Elo update rule.
+    """
+    ratings = np.full(n_entrants, initial)
+    for match in sorted(matches, key=lambda m: (m['i'], m['j'])):
+        i, j = match['i'], match['j']
+        for outcome in match['outcomes']:
+            expected = 1.0 / (1.0 + 10 ** ((ratings[j] - ratings[i]) / 400.0))
+            delta = k * ((outcome + 1) / 2.0 - expected)
+            ratings[i] += delta
+            ratings[j] -= delta
+    return ratings
+
+
+TournamentResult = collections.namedtuple('TournamentResult', ['names', 'wins', 'draws', 'losses', 'ratings'])
+
+
+def round_robin(entrants, n_games=10, seed=None, max_workers=None):
+    """
+    Plays a match between every pair of entrants, in a pool of worker processes.
+    :param n_games: games per match (each entrant moves first in half of them)
+    :param seed: an int or numpy.random.SeedSequence; every match gets its own spawned stream
+    :param max_workers: number of worker processes (None -> number of CPUs, 1 -> run in this process)
+    :return: TournamentResult, where wins[i, j] is the number of games entrant i won against entrant j
+    """
+    names = [entrant.name for entrant in entrants]
+    if len(set(names)) != len(names):
+        raise ValueError('Entrant names must be unique')
+
+    seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    pairs = list(itertools.combinations(range(len(entrants)), 2))
+    arguments = [(i, j, entrants[i], entrants[j], n_games, match_seed)
+                 for (i, j), match_seed in zip(pairs, seed_sequence.spawn(len(pairs)))]
+
+    if max_workers == 1:
+        matches = [play_match(*args) for args in arguments]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+            matches = list(executor.map(play_match, *zip(*arguments))) if arguments else []
+
+    n = len(entrants)
+    wins = np.zeros((n, n), dtype=int)
+    draws = np.zeros((n, n), dtype=int)
+    for match in matches:
+        i, j = match['i'], match['j']
+        outcomes = np.array(match['outcomes'])
+        wins[i, j] = np.sum(outcomes == 1)
+        wins[j, i] = np.sum(outcomes == -1)
+        draws[i, j] = draws[j, i] = np.sum(outcomes == 0)
+
+    return TournamentResult(names, wins, draws, wins.T.copy(), elo_ratings(n, matches))
+
+
+def format_result(result):
+    """
+    Returns the win/draw/loss matrix (row entrant against column entrant) and the ratings as text.
+    """
+    width = max(12, max(len(name) for name in result.names) + 2)
+    lines = [''.ljust(width) + ''.join(name.rjust(width) for name in result.names) + 'rating'.rjust(width)]
+    for i, name in enumerate(result.names):
+        cells = ['-' if i == j else '{}/{}/{}'.format(result.wins[i, j], result.draws[i, j], result.losses[i, j])
+                 for j in range(len(result.names))]
+        lines.append(name.ljust(width) + ''.join(cell.rjust(width) for cell in cells) +
+                     '{:.0f}'.format(result.ratings[i]).rjust(width))
+    return '\n'.join(lines)
+
+
+def parse_agent(spec):
+    """
+    Parses 'name' or 'name:key=value,...' into an agent entrant, e.g. 'strict:activation_threshold=0.8'.
+    """
+    name, _, options = spec.partition(':')
+    kwargs = {}
+    for option in filter(None, options.split(',')):
+        key, _, value = option.partition('=')
+        kwargs[key] = float(value)
+    return agent_entrant(name, **kwargs)
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(description='Plays a round-robin tournament between agents and policies.')
+    parser.add_argument('--agent', action='append', default=[], type=parse_agent,
+                        help="fresh agent as 'name' or 'name:key=value,...' (repeatable)")
+    parser.add_argument('--checkpoint', action='append', default=[], help='agent checkpoint file (repeatable)')
+    parser.add_argument('--policy', action='append', default=[],
+                        help="opponent policy ('random', 'heuristic' or 'perfect'; repeatable)")
+    parser.add_argument('--games', type=int, default=10, help='games per match')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes (default: number of CPUs)')
+    parser.add_argument('--seed', type=int, default=None, help='root seed of the tournament')
+    args = parser.parse_args(args)
+
+    # Without any entrants the default field is played; a partial field is a mistake
+    n_entrants = len(args.agent) + len(args.checkpoint) + len(args.policy)
+    if n_entrants == 1:
+        parser.error('at least two entrants are needed')
+
+    return args
+
+
+if __name__ == '__main__':
+    args = parse_args()
+
+    entrants = args.agent + [checkpoint_entrant(path) for path in args.checkpoint] + \
+               [policy_entrant(policy) for policy in args.policy]
+    if not entrants:
+        entrants = [agent_entrant('agent')] + [policy_entrant(policy) for policy in ['random', 'heuristic', 'perfect']]
+
+    print(format_result(round_robin(entrants, n_games=args.games, seed=args.seed, max_workers=args.workers)))
@@ -0,0 +1,45 @@
+from unittest import TestCase
+
+import numpy as np
+
+from common import ActionSelection, ProceduralMemory, Scheme, spawn_rngs
+
+
+class TestActionSelection(TestCase):
+    def test_selected_behavior(self):
+        behaviors = [Scheme(action=a, current_activation=1.0) for a in range(10)]
+
+        selections = []
+        for run in range(2):
+            action_selection = ActionSelection(rng=np.random.default_rng(5))
+            action_selection.receive_behaviors(behaviors)
+            selections.append([action_selection.selected_behavior for i in range(20)])
+
+        self.assertListEqual(selections[0], selections[1])
+        self.assertGreater(len(set(selections[0])), 1)
+
+    def test_no_behaviors(self):
+        self.assertIsNone(ActionSelection().selected_behavior)
+
+
+class TestSeededProceduralMemory(TestCase):
+    def test_candidate_behaviors(self):
+        # No scheme above the activation threshold, so a single scheme is drawn at random
+        schemes = [Scheme(action=a, base_level_activation=0.1) for a in range(10)]
+
+        candidates = []
+        for run in range(2):
+            pm = ProceduralMemory(initial_schemes=schemes, rng=np.random.default_rng(5))
+            candidates.append([pm.candidate_behaviors[0] for i in range(20)])
+
+        self.assertListEqual(candidates[0], candidates[1])
+
+
+class TestSpawnRngs(TestCase):
+    def test_independent_streams(self):
+        rngs = spawn_rngs(1, 4)
+        draws = [tuple(rng.integers(1 << 30, size=4)) for rng in rngs]
+        self.assertEqual(len(set(draws)), 4)
+
+        # Same seed -> same streams
+        self.assertListEqual(draws, [tuple(rng.integers(1 << 30, size=4)) for rng in spawn_rngs(1, 4)])
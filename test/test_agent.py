@@ -1,13 +1,17 @@
 from unittest import TestCase
 
-from agent import running, run
+from agent import Agent, running, run
+from gym_tictactoe.envs import TicTacToeEnv
 
 
 class TestAgent(TestCase):
     def test_run(self):
         try:
             # Verify termination condition on bounded run
-            count = run(1)
+            env = TicTacToeEnv()
+            env.seed(0)
+            env.reset()
+            count, total_reward = run(env, n=1, render=False)
             self.assertEqual(count, 1)
 
         except Exception as e:
@@ -24,3 +28,55 @@ class TestAgent(TestCase):
 
         except Exception as e:
             self.fail(e)
+
+
+class TestAgentInstances(TestCase):
+    def test_independent_modules(self):
+        agent_1 = Agent()
+        agent_2 = Agent()
+
+        self.assertIsNot(agent_1.procedural_memory, agent_2.procedural_memory)
+        self.assertIsNot(agent_1.workspace.csm, agent_2.workspace.csm)
+        self.assertIs(agent_1.attn_codelets[0].domain, agent_1.workspace.csm)
+
+    def test_step(self):
+        agent = Agent(rng=0)
+        env = TicTacToeEnv()
+        env.seed(0)
+        env.reset()
+
+        obs, reward, done, info = env.step(None)
+        for cycle in range(10):
+            motor_command = agent.step(obs, reward)
+            obs, reward, done, info = env.step(motor_command)
+
+        self.assertIsNotNone(agent.motor_command)
+        self.assertEqual(agent.motor_command.actuator, 'move')
+
+    def test_seed(self):
+        # Seeding reproduces every stochastic module, including those with streams of their own
+        def trace(agent):
+            env = TicTacToeEnv()
+            env.seed(0)
+            env.reset()
+            agent.run(env, n=20, render=False)
+            return ([scheme.base_level_activation for scheme in agent.procedural_memory.content],
+                    agent.episodic_memory._locations.tolist())
+
+        seeded = Agent(episodic_memory=True)
+        seeded.seed(5)
+        self.assertEqual(trace(seeded), trace(Agent(rng=5, episodic_memory=True)))
+
+    def test_run(self):
+        results = []
+        for run in range(2):
+            agent = Agent(rng=3)
+            env = TicTacToeEnv()
+            env.seed(3)
+            env.reset()
+            results.append(agent.run(env, n=20, render=False))
+            results.append([scheme.base_level_activation for scheme in agent.procedural_memory.content])
+
+        self.assertEqual(results[0][0], 20)
+        self.assertEqual(results[0], results[2])
+        self.assertListEqual(results[1], results[3])
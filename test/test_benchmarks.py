@@ -0,0 +1,57 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from benchmarks import harness
+
+
+class TestHarness(TestCase):
+    def setUp(self):
+        self.registry = list(harness.registry)
+
+    def tearDown(self):
+        harness.registry[:] = self.registry
+
+    def test_benchmark_registers_parameter_grid(self):
+        @harness.benchmark('test.grid', a=[1, 2], b=['x', 'y'])
+        def factory(a, b):
+            return lambda: None
+
+        names = [bench.name for bench in harness.registry if bench.name.startswith('test.grid')]
+        self.assertListEqual(names, ['test.grid[a=1,b=x]', 'test.grid[a=1,b=y]',
+                                     'test.grid[a=2,b=x]', 'test.grid[a=2,b=y]'])
+
+    def test_select(self):
+        @harness.benchmark('test.select', n=[10, 1000])
+        def factory(n):
+            return lambda: None
+
+        self.assertListEqual([bench.name for bench in harness.select('test.select', max_scale=100)],
+                             ['test.select[n=10]'])
+
+    def test_time_benchmark(self):
+        calls = []
+
+        @harness.benchmark('test.time', number=5, ops=2, repeat=2)
+        def factory():
+            return lambda: calls.append(None)
+
+        result = harness.time_benchmark(harness.select('test.time')[0])
+        self.assertEqual(len(calls), 10)
+        self.assertEqual(result['repeat'], 2)
+        self.assertGreater(result['ops_per_second'], 0.0)
+
+    def test_save_load_compare(self):
+        baseline = {'a': {'seconds': 1.0}, 'b': {'seconds': 1.0}, 'removed': {'seconds': 1.0}}
+        results = {'a': {'seconds': 1.1}, 'b': {'seconds': 2.0}, 'new': {'seconds': 1.0}}
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baseline.json')
+            harness.save(baseline, path)
+            self.assertDictEqual(harness.load(path), baseline)
+
+        comparisons = {comparison.name: comparison for comparison in harness.compare(results, baseline)}
+        self.assertSetEqual(set(comparisons), {'a', 'b'})
+        self.assertFalse(comparisons['a'].regression)
+        self.assertTrue(comparisons['b'].regression)
+        self.assertAlmostEqual(comparisons['b'].ratio, 2.0)
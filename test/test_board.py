@@ -0,0 +1,111 @@
+import random
+from unittest import TestCase
+
+import numpy as np
+
+from gym_tictactoe.envs.board import Board, BitBoard, BLANK, X, O
+
+
+class TestBitBoard(TestCase):
+    def test_from_list(self):
+        board = [X, O, BLANK, BLANK, X, O, BLANK, BLANK, X]
+        bitboard = BitBoard.from_list(board)
+
+        self.assertListEqual(list(bitboard.asarray()), board)
+        self.assertListEqual([bitboard[pos] for pos in range(9)], board)
+        self.assertListEqual(bitboard.blanks, [2, 3, 6, 7])
+        self.assertTrue(bitboard.has_winner())
+        self.assertEqual(bitboard.winner, X)
+
+    def test_matches_board(self):
+        rng = random.Random(0)
+        for game in range(200):
+            board = Board()
+            bitboard = BitBoard()
+            mark = X
+            while not board.has_winner() and not board.is_full():
+                pos = rng.choice(board.blanks)
+                board[pos] = mark
+                bitboard[pos] = mark
+                mark = -mark
+
+                self.assertListEqual(board.blanks, bitboard.blanks)
+                self.assertListEqual(list(board.asarray()), list(bitboard.asarray()))
+                self.assertListEqual(list(bitboard.write_to(np.zeros(9, dtype=np.int64))), list(board.asarray()))
+                self.assertEqual(board.has_winner(), bitboard.has_winner())
+                self.assertEqual(board.is_full(), bitboard.is_full())
+                self.assertEqual(board.is_draw(), bitboard.is_draw())
+                self.assertEqual(str(board), str(bitboard))
+
+    def test_is_blank(self):
+        bitboard = BitBoard()
+        bitboard[4] = O
+
+        self.assertFalse(bitboard.is_blank(4))
+        self.assertTrue(bitboard.is_blank(0))
+        self.assertFalse(bitboard.is_blank(9))
+        self.assertFalse(bitboard.is_blank(-1))
+        self.assertFalse(bitboard.is_empty())
+
+    def test_setitem(self):
+        bitboard = BitBoard()
+        bitboard[0] = X
+        bitboard[0] = O
+        self.assertEqual(bitboard[0], O)
+        bitboard[0] = BLANK
+        self.assertTrue(bitboard.is_empty())
+
+        with self.assertRaises(ValueError):
+            bitboard[0] = 2
+
+
+class TestLargeBoards(TestCase):
+    def test_board_string(self):
+        board = Board(size=4)
+        board[0] = X
+        board[15] = O
+
+        rows = str(board).strip('\n').split('\n')
+        self.assertEqual(len(rows), 7)
+        self.assertEqual(rows[0], 'X│ │ │ ')
+        self.assertEqual(rows[1], '─┼─┼─┼─')
+        self.assertEqual(rows[6], ' │ │ │O')
+
+    def test_is_empty(self):
+        for board_class in [Board, BitBoard]:
+            board = board_class(size=5)
+            self.assertTrue(board.is_empty())
+            board[12] = X
+            self.assertFalse(board.is_empty())
+
+    def test_k_in_a_row(self):
+        for board_class in [Board, BitBoard]:
+            # 4 in a row along an off-center diagonal of a 5x5 board
+            board = board_class(size=5, k=4)
+            for pos in [1, 7, 13]:
+                board[pos] = X
+                self.assertFalse(board.has_winner())
+                self.assertFalse(board.has_winner(pos))
+
+            board[19] = X
+            self.assertTrue(board.has_winner())
+            self.assertTrue(board.has_winner(19))
+            self.assertTrue(board.has_winner(7))
+
+    def test_incremental_matches_full_scan(self):
+        rng = random.Random(1)
+        for size, k in [(3, 3), (5, 4), (7, 5)]:
+            for game in range(50):
+                board = Board(size=size, k=k)
+                bitboard = BitBoard(size=size, k=k)
+                mark = X
+                while True:
+                    pos = rng.choice(board.blanks)
+                    board[pos] = mark
+                    bitboard[pos] = mark
+
+                    self.assertEqual(board.has_winner(pos), board.has_winner())
+                    self.assertEqual(bitboard.has_winner(pos), board.has_winner())
+                    if board.has_winner() or board.is_full():
+                        break
+                    mark = -mark
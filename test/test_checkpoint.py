@@ -0,0 +1,125 @@
+import copy
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+import checkpoint
+from agent import Agent
+from events import EventBus
+from gym_tictactoe.envs import TicTacToeEnv
+
+
+def trained_agent(n=50):
+    environment = TicTacToeEnv()
+    environment.seed(0)
+    environment.reset()
+
+    agent = Agent(rng=0)
+    agent.run(environment, n=n, render=False)
+    return agent, environment
+
+
+def scheme_state(agent):
+    return [(None if s.context is None else [str(c) for c in s.context], s.action,
+             None if s.result is None else [str(c) for c in s.result], s.current_activation, s.base_level_activation)
+            for s in agent.procedural_memory.content]
+
+
+class TestCheckpoint(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'agent.npz')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        agent, _ = trained_agent()
+        checkpoint.save(agent, self.path)
+
+        restored = checkpoint.load(self.path)
+        self.assertEqual(restored.cycle, agent.cycle)
+        self.assertEqual(restored.motor_command, agent.motor_command)
+        self.assertListEqual(scheme_state(restored), scheme_state(agent))
+        self.assertListEqual([(c.tag, c.activation) for c in restored.attn_codelets],
+                             [(c.tag, c.activation) for c in agent.attn_codelets])
+        self.assertListEqual([(str(c), c.activation) for c in restored.pam.content],
+                             [(str(c), c.activation) for c in agent.pam.content])
+        self.assertEqual(len(restored.workspace.csm.content), len(agent.workspace.csm.content))
+        self.assertEqual(restored.rng.bit_generator.state, agent.rng.bit_generator.state)
+
+    def test_pam_links(self):
+        agent = Agent(rng=0)
+        happy, sad = agent.pam.content
+        agent.pam.add_link(happy, sad, 0.25)
+        happy.current_activation = 1.0
+        agent.pam.spread_activation()
+        checkpoint.save(agent, self.path)
+
+        restored = checkpoint.load(self.path)
+        restored_happy, restored_sad = restored.pam.content
+        self.assertListEqual(restored.pam.links, [(restored_happy, restored_sad, 0.25)])
+
+        restored_happy.current_activation = 0.0
+        restored.pam.spread_activation()
+        self.assertAlmostEqual(restored_sad.current_activation, 0.0)
+
+    def test_episodic_memory(self):
+        agent = Agent(rng=0, episodic_memory=True)
+        environment = TicTacToeEnv()
+        environment.seed(0)
+        environment.reset()
+        agent.run(environment, n=10, render=False)
+        checkpoint.save(agent, self.path)
+
+        # Reseeding a restored agent keeps the addresses its episodes were stored at
+        restored = checkpoint.load(self.path)
+        restored.seed(1)
+        np.testing.assert_array_equal(restored.episodic_memory._locations, agent.episodic_memory._locations)
+        np.testing.assert_array_equal(restored.episodic_memory._counters, agent.episodic_memory._counters)
+        self.assertListEqual(restored.episodic_memory.vocabulary, agent.episodic_memory.vocabulary)
+
+    def test_no_pickled_objects(self):
+        agent, _ = trained_agent(10)
+        checkpoint.save(agent, self.path)
+
+        with np.load(self.path, allow_pickle=False) as archive:
+            self.assertTrue(all(archive[name].dtype != object for name in archive.files))
+
+    def test_shared_nodes(self):
+        agent, _ = trained_agent(10)
+        checkpoint.save(agent, self.path)
+        restored = checkpoint.load(self.path)
+
+        def n_shared(agent):
+            return len({id(node) for node in agent.pam.content} & {id(node) for node in agent.workspace.csm.content})
+
+        self.assertEqual(n_shared(restored), n_shared(agent))
+
+    def test_resume(self):
+        # A resumed run continues exactly as the uninterrupted run would have
+        agent, environment = trained_agent(20)
+        checkpoint.save(agent, self.path)
+        state = copy.deepcopy(environment._board), environment._done
+
+        agent.run(environment, n=20, render=False)
+
+        environment._board, environment._done = state
+        restored = checkpoint.load(self.path, events=EventBus())
+        restored.run(environment, n=20, render=False)
+
+        self.assertEqual(restored.cycle, agent.cycle)
+        self.assertListEqual(scheme_state(restored), scheme_state(agent))
+
+    def test_checkpointer(self):
+        agent = Agent(rng=0)
+        checkpoint.Checkpointer(self.path, every=5).attach(agent)
+
+        environment = TicTacToeEnv()
+        environment.reset()
+        agent.run(environment, n=7, render=False)
+
+        self.assertEqual(checkpoint.load(self.path).cycle, 5)
+        self.assertFalse(os.path.exists(self.path + '.tmp'))
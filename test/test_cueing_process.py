@@ -1,7 +1,8 @@
 from unittest import TestCase
 from unittest.mock import MagicMock
 
-from common import CueingProcess, PerceptualAssociativeMemory
+from common import CueingProcess, PerceptualAssociativeMemory, CognitiveContent, FeelingNode, SensoryScene, Workspace, \
+    merge_cues
 
 
 class TestCueingProcess(TestCase):
@@ -27,3 +28,49 @@ class TestCueingProcess(TestCase):
 
         cued_content = next(cue)
         self.assertEqual([content, 'happy'], cued_content[0])
+
+
+class TestCueCache(TestCase):
+    def setUp(self):
+        self.happy = FeelingNode('happy', valence=1.0)
+        self.pam = PerceptualAssociativeMemory([self.happy])
+        self.pam.receive_cue = MagicMock(side_effect=self.pam.receive_cue)
+        self.cue_process = CueingProcess([self.pam])
+        self.workspace = Workspace()
+
+    def perceive(self):
+        scene = [CognitiveContent('happy', current_activation=1.0), CognitiveContent('X_0', current_activation=1.0)]
+        self.workspace.csm.receive_sensory_scene(SensoryScene(observation=scene, outcome=1))
+
+    def test_process(self):
+        self.perceive()
+        self.cue_process.process(self.workspace)
+
+        # The feeling node replaces the cued feature in the perceptual scene and the CSM
+        self.assertIs(self.workspace.csm.perceptual_scene.content[-1], self.happy)
+        self.assertIs(self.workspace.csm.content.get('happy'), self.happy)
+        self.assertEqual(self.happy.current_activation, 1.0)
+        self.assertEqual(len(self.workspace.csm.content), 2)
+
+    def test_cache(self):
+        for cycle in range(3):
+            self.perceive()
+            self.cue_process.process(self.workspace)
+        self.assertEqual(self.pam.receive_cue.call_count, 2)
+
+        # Changing PAM's concepts invalidates its cached cues
+        self.pam.add_concept(CognitiveContent('X_0'))
+        self.perceive()
+        self.cue_process.process(self.workspace)
+        self.assertEqual(self.pam.receive_cue.call_count, 4)
+        self.assertEqual(len(self.workspace.csm.content), 2)
+
+    def test_merge_cues(self):
+        x_0, o_1 = CognitiveContent('X_0', current_activation=0.5), CognitiveContent('O_1')
+        cued = CognitiveContent('X_0')
+        contents = [x_0, o_1]
+
+        merge_cues([(x_0, [cued]), (o_1, [o_1]), (o_1, [])], contents)
+        self.assertListEqual(contents, [o_1, cued])
+        self.assertIs(contents[1], cued)
+        self.assertEqual(cued.current_activation, 0.5)
@@ -0,0 +1,88 @@
+from unittest import TestCase
+
+from common import CurrentSituationalModel, ContentStore, CognitiveContent, GarbageCollector, merge_cue, \
+    merge_cues, PerceptualAssociativeMemory
+
+
+class TestContentStore(TestCase):
+    def test_deduplicates(self):
+        x_0 = CognitiveContent('X_0', current_activation=0.5)
+        store = ContentStore([x_0, CognitiveContent('O_1')])
+
+        store.extend([CognitiveContent('X_0', current_activation=1.0), CognitiveContent('X_0', current_activation=0.2)])
+        self.assertEqual(len(store), 2)
+        self.assertIs(store.get('X_0'), x_0)
+        self.assertEqual(x_0.current_activation, 1.0)
+        self.assertListEqual([str(node) for node in store], ['X_0', 'O_1'])
+
+    def test_remove(self):
+        store = ContentStore([CognitiveContent('X_0')])
+        store.remove(CognitiveContent('X_0'))
+        self.assertNotIn(CognitiveContent('X_0'), store)
+
+        with self.assertRaises(ValueError):
+            store.remove(CognitiveContent('X_0'))
+
+    def test_merge_cue(self):
+        x_0 = CognitiveContent('X_0', current_activation=0.7)
+        happy = CognitiveContent('happy')
+        store = ContentStore([x_0])
+
+        merge_cue([x_0, [happy]], store)
+        self.assertListEqual(store.copy(), [happy])
+        self.assertEqual(happy.current_activation, 0.7)
+
+    def test_merge_cues_from_several_modules(self):
+        # Content cued by several modules is replaced once
+        x_0 = CognitiveContent('X_0')
+        store = ContentStore([x_0])
+
+        merge_cues([(x_0, [CognitiveContent('X_0')]), (x_0, [x_0, CognitiveContent('happy')])], store)
+        self.assertListEqual([node.content for node in store], ['X_0', 'happy'])
+
+
+class TestStructureContent(TestCase):
+    def test_unhashable_content(self):
+        # Structure building codelets may create nodes whose content is a list of nodes
+        x_0, x_1 = CognitiveContent('X_0'), CognitiveContent('X_1')
+        line = CognitiveContent([x_0, x_1], current_activation=0.5)
+        csm = CurrentSituationalModel()
+
+        csm.receive_content([line, CognitiveContent([x_0, x_1], current_activation=1.0),
+                             CognitiveContent({'mark': 'X', 'positions': [0, 1]})])
+        self.assertEqual(len(csm.content), 2)
+        self.assertIs(csm.content.get([x_0, x_1]), line)
+        self.assertEqual(line.current_activation, 1.0)
+        self.assertIn(CognitiveContent([CognitiveContent('X_0'), CognitiveContent('X_1')]), csm.content)
+
+        csm.content.remove(CognitiveContent([x_0, x_1]))
+        self.assertEqual(len(csm.content), 1)
+
+    def test_unhashable_pam_content(self):
+        line = CognitiveContent(['X_0', 'X_1'])
+        pam = PerceptualAssociativeMemory([line])
+
+        self.assertListEqual(pam.concepts_with_content(['X_0', 'X_1']), [line])
+        self.assertListEqual(pam.receive_cue(CognitiveContent(['X_0', 'X_1'])), [line])
+        pam.remove_concept(line)
+        self.assertListEqual(pam.concepts_with_content(['X_0', 'X_1']), [])
+
+
+class TestCurrentSituationalModel(TestCase):
+    def test_receive_content(self):
+        csm = CurrentSituationalModel()
+        for cycle in range(10):
+            csm.receive_content([CognitiveContent('X_{}'.format(pos), current_activation=1.0) for pos in range(9)])
+        self.assertEqual(len(csm.content), 9)
+
+    def test_capacity(self):
+        csm = CurrentSituationalModel(capacity=3)
+        csm.receive_content([CognitiveContent(str(i), current_activation=a) for i, a in enumerate([.5, .1, .9, .3])])
+        self.assertListEqual([str(node) for node in csm], ['0', '2', '3'])
+
+    def test_garbage_collector(self):
+        csm = CurrentSituationalModel()
+        csm.receive_content([CognitiveContent(str(i), current_activation=float(i % 2)) for i in range(10)])
+
+        GarbageCollector(csm, 'current_activation')
+        self.assertListEqual([str(node) for node in csm], ['1', '3', '5', '7', '9'])
@@ -0,0 +1,145 @@
+import os
+import pickle
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from common import DeclarativeMemory, CognitiveContent, Coalition, AttentionCodelet, CueingProcess, Workspace, \
+    CurrentSituationalModel
+
+
+def entry(*contents):
+    return [CognitiveContent(content) for content in contents]
+
+
+class TestDeclarativeMemory(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'declarative')
+        self.memory = DeclarativeMemory(self.path, depth=2)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_recall(self):
+        self.memory.store(entry('X_0', 'O_4', 'happy'))
+        self.memory.store(entry('X_0', 'X_8'))
+        self.memory.store(entry('X_0', 'O_2'))
+
+        self.assertEqual(len(self.memory), 3)
+        # Only the depth most recent entries of a content are recalled, most recent first
+        self.assertListEqual(self.memory.recall('X_0'), ['O_2', 'X_8'])
+        self.assertListEqual(self.memory.recall('happy'), ['X_0', 'O_4'])
+        self.assertListEqual(self.memory.recall('unseen'), [])
+
+    def test_persists(self):
+        self.memory.store(entry('X_0', 'happy'), activation=1.5)
+        self.memory.flush()
+
+        memory = DeclarativeMemory(self.path, mode='r')
+        self.assertEqual(len(memory), 1)
+        self.assertListEqual(memory.recall('X_0'), ['happy'])
+        self.assertEqual(memory._entries['activation'][0], 1.5)
+
+    def test_grows(self):
+        n = DeclarativeMemory.INITIAL_CAPACITY + 10
+        self.memory.store_entries([(entry('X_0', 'entry_{}'.format(i)), 0.0) for i in range(n)])
+        for i in range(20):
+            self.memory.store(entry('O_4', 'X_0'))
+
+        self.assertEqual(len(self.memory), n + 20)
+        self.assertListEqual(self.memory.recall('entry_0'), ['X_0'])
+        self.assertListEqual(self.memory.recall('X_0'), ['O_4'])
+
+    def test_bulk_index(self):
+        # Indexing entries in bulk (when a store is opened) agrees with indexing them one at a time
+        rng = np.random.default_rng(0)
+        contents = ['content_{}'.format(i) for i in range(50)]
+        for i in range(500):
+            self.memory.store(rng.choice(contents, size=int(rng.integers(0, 5)), replace=False).tolist())
+
+        memory = DeclarativeMemory(self.path, depth=2, mode='r')
+        self.assertListEqual(memory.vocabulary, self.memory.vocabulary)
+        np.testing.assert_array_equal(memory._index[:len(memory.vocabulary)],
+                                      self.memory._index[:len(memory.vocabulary)])
+
+    def test_read_only(self):
+        self.memory.store(entry('X_0', 'happy'))
+        reader = DeclarativeMemory(self.path, mode='r')
+
+        with self.assertRaises(ValueError):
+            reader.store(entry('X_0'))
+
+        self.memory.store(entry('X_0', 'sad'))
+        self.assertListEqual(reader.recall('X_0'), ['happy'])
+        reader.refresh()
+        self.assertListEqual(reader.recall('X_0'), ['sad', 'happy'])
+
+        with self.assertRaises(FileNotFoundError):
+            DeclarativeMemory(os.path.join(self.directory.name, 'missing'), mode='r')
+
+    def test_refresh_while_writing(self):
+        self.memory.store(entry('X_0', 'happy'))
+        reader = DeclarativeMemory(self.path, mode='r')
+
+        # The writer adds an entry with new contents between the reader's reads of the count and the vocabulary
+        read_vocabulary = reader._read_vocabulary
+
+        def interleaved():
+            self.memory.store(entry('X_0', 'sad'))
+            read_vocabulary()
+
+        reader._read_vocabulary = interleaved
+        reader.refresh()
+        self.assertListEqual(reader.recall('X_0'), ['happy'])
+
+        reader._read_vocabulary = read_vocabulary
+        reader.refresh()
+        self.assertListEqual(reader.recall('X_0'), ['sad', 'happy'])
+
+        # A partly written line of the vocabulary is left for the next refresh
+        with open(self.memory.vocabulary_path, 'a') as file:
+            file.write('"O_')
+        reader.refresh()
+        self.assertNotIn('O_', reader.vocabulary)
+        with open(self.memory.vocabulary_path, 'a') as file:
+            file.write('4"\n')
+        reader.refresh()
+        self.assertEqual(reader.vocabulary[-1], 'O_4')
+
+    def test_pickle(self):
+        self.memory.store(entry('X_0', 'happy'))
+        memory = pickle.loads(pickle.dumps(DeclarativeMemory(self.path, mode='r')))
+
+        self.assertEqual(memory.mode, 'r')
+        self.assertListEqual(memory.recall('X_0'), ['happy'])
+
+    def test_receive_broadcast(self):
+        broadcast = Coalition(entry('X_0', 'happy'), AttentionCodelet(domain=CurrentSituationalModel()))
+        self.memory.receive_broadcast(broadcast)
+        self.memory.receive_broadcast(broadcast)
+
+        self.assertEqual(len(self.memory), 1)
+        self.assertListEqual(self.memory.recall('happy'), ['X_0'])
+
+    def test_receive_cue(self):
+        self.memory.store(entry('X_0', 'happy'))
+
+        cue = CognitiveContent('X_0')
+        cued_content = self.memory.receive_cue(cue)
+        self.assertIs(cued_content[0], cue)
+        self.assertListEqual([node.content for node in cued_content[1:]], ['happy'])
+        self.assertTrue(cued_content[1].virtual)
+
+        self.assertListEqual(self.memory.receive_cue(CognitiveContent('unseen')), [])
+        self.assertIsNone(self.memory.receive_cue(None))
+
+    def test_cueing_process(self):
+        self.memory.store(entry('X_0', 'happy'))
+
+        workspace = Workspace()
+        workspace.csm.receive_content(entry('X_0'))
+        CueingProcess([self.memory]).process(workspace)
+
+        self.assertIn(CognitiveContent('happy'), workspace.csm.content)
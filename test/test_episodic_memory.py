@@ -0,0 +1,107 @@
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from common import TransientEpisodicMemory, CognitiveContent, CueingProcess, Workspace
+
+
+def episode(*contents):
+    return [CognitiveContent(content) for content in contents]
+
+
+class TestTransientEpisodicMemory(TestCase):
+    def setUp(self):
+        self.memory = TransientEpisodicMemory(rng=0)
+
+    def test_recall(self):
+        self.memory.store_episodes([episode('X_0', 'O_4', 'happy'), episode('X_8', 'sad')])
+
+        self.assertListEqual(self.memory.recall(episode('X_0')), ['X_0', 'O_4', 'happy'])
+        self.assertListEqual(self.memory.recall(episode('sad')), ['X_8', 'sad'])
+        self.assertListEqual(self.memory.recall(episode('unseen')), [])
+
+    def test_vocabulary_is_bounded(self):
+        memory = TransientEpisodicMemory(n_bits=2, rng=0)
+        memory.store(episode('X_0', 'O_1', 'X_2'))
+
+        self.assertListEqual(memory.vocabulary, ['X_0', 'O_1'])
+        self.assertEqual(memory.encode(episode('X_2')).sum(), 0.0)
+
+    def test_decay(self):
+        memory = TransientEpisodicMemory(decay=0.5, rng=0)
+        memory.store(episode('X_0', 'O_4'))
+        counters = memory._counters.copy()
+
+        memory.store(episode('X_8'))
+        untouched = np.abs(memory._counters - counters * 0.5) < 1e-6
+        self.assertGreater(untouched.sum(), 0)
+
+    def test_receive_cue(self):
+        self.memory.store(episode('X_0', 'O_4', 'happy'))
+        self.memory.store(episode('X_8'))
+
+        cue = CognitiveContent('X_0')
+        cued_content = self.memory.receive_cue(cue)
+
+        self.assertIs(cued_content[0], cue)
+        # Content of the last episode is already in the situation
+        recalled = {node.content: node for node in cued_content[1:]}
+        self.assertSetEqual(set(recalled), {'O_4', 'happy'})
+        self.assertTrue(all(node.virtual for node in recalled.values()))
+
+        self.assertListEqual(self.memory.receive_cue(CognitiveContent('unseen')), [])
+        self.assertIsNone(self.memory.receive_cue(None))
+
+    def test_cueing_process(self):
+        self.memory.store(episode('X_0', 'happy'))
+        self.memory.store(episode('O_4'))
+
+        workspace = Workspace()
+        workspace.csm.receive_content(episode('X_0'))
+        CueingProcess([self.memory]).process(workspace)
+
+        self.assertIn(CognitiveContent('happy'), workspace.csm.content)
+
+    def test_receive_cues(self):
+        self.memory.store(episode('X_0', 'O_4', 'happy'))
+        self.memory.store(episode('X_8', 'sad'))
+        self.memory.store(episode('B_1'))
+
+        cues = [CognitiveContent('X_0'), None, CognitiveContent('unseen'), CognitiveContent('sad')]
+        batch = self.memory.receive_cues(cues)
+        single = [self.memory.receive_cue(cue) for cue in cues]
+
+        self.assertEqual(batch[1], None)
+        self.assertListEqual(batch[2], [])
+        self.assertListEqual([[node.content for node in cued] for cued in batch if cued is not None],
+                             [[node.content for node in cued] for cued in single if cued is not None])
+
+    def test_virtual_content_is_not_stored(self):
+        recollection = CognitiveContent('happy')
+        recollection.virtual = True
+        self.memory.store(episode('X_0') + [recollection])
+
+        self.assertListEqual(self.memory.vocabulary, ['X_0'])
+
+    def test_cueing_process_batches_and_caches(self):
+        self.memory.store(episode('X_0', 'happy'))
+        self.memory.store(episode('O_4'))
+        self.memory.receive_cues = MagicMock(side_effect=self.memory.receive_cues)
+
+        workspace = Workspace()
+        workspace.csm.receive_content(episode('X_0', 'O_4'))
+        cueing = CueingProcess([self.memory])
+        cueing.process(workspace)
+
+        # One read for the (empty) perceptual scene and one for the CSM
+        self.assertEqual(self.memory.receive_cues.call_count, 2)
+        self.assertIn(CognitiveContent('happy'), workspace.csm.content)
+
+        # Only the recollection added to the CSM is new to the cache
+        cueing.process(workspace)
+        self.assertListEqual([cue.content for cue in self.memory.receive_cues.call_args[0][0]], ['happy'])
+
+        version = self.memory.version
+        self.memory.store(episode('X_8'))
+        self.assertEqual(self.memory.version, version + 1)
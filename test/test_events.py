@@ -0,0 +1,55 @@
+from unittest import TestCase
+
+from events import EventBus, CycleStarted, CycleEnded, BroadcastSent, HousekeepingStarted
+from agent import Agent, attach_console_subscribers
+from gym_tictactoe.envs import TicTacToeEnv
+
+
+class TestEventBus(TestCase):
+    def test_subscribe(self):
+        bus = EventBus()
+        received = []
+
+        self.assertFalse(bus.has_subscribers(CycleStarted))
+        callback = bus.subscribe(CycleStarted, received.append)
+        self.assertTrue(bus.has_subscribers(CycleStarted))
+        self.assertFalse(bus.has_subscribers(CycleEnded))
+
+        event = CycleStarted(None, 0, None, 0.0)
+        bus.publish(event)
+        bus.publish(CycleEnded(None, 0, None))
+        self.assertListEqual(received, [event])
+
+        bus.unsubscribe(CycleStarted, callback)
+        self.assertFalse(bus.has_subscribers(CycleStarted))
+
+    def test_unknown_event_type(self):
+        with self.assertRaises(ValueError):
+            EventBus().subscribe(int, print)
+
+
+class TestAgentEvents(TestCase):
+    def test_cycle_events(self):
+        agent = Agent(rng=0)
+        received = []
+        for event_type in [CycleStarted, BroadcastSent, HousekeepingStarted, CycleEnded]:
+            agent.events.subscribe(event_type, received.append)
+
+        env = TicTacToeEnv()
+        env.seed(0)
+        env.reset()
+        agent.run(env, n=5, render=False)
+
+        cycle_starts = [event.cycle for event in received if isinstance(event, CycleStarted)]
+        cycle_ends = [event.cycle for event in received if isinstance(event, CycleEnded)]
+        self.assertListEqual(cycle_starts, [0, 1, 2, 3, 4])
+        self.assertListEqual(cycle_ends, [0, 1, 2, 3, 4])
+        self.assertIsInstance(received[0], CycleStarted)
+        self.assertIsInstance(received[-1], CycleEnded)
+        self.assertTrue(all(event.agent is agent for event in received))
+
+    def test_console_subscribers(self):
+        agent = Agent(rng=0)
+        attach_console_subscribers(agent, render=False)
+        self.assertTrue(agent.events.has_subscribers(CycleEnded))
+        self.assertTrue(agent.events.has_subscribers(HousekeepingStarted))
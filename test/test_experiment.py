@@ -0,0 +1,33 @@
+from unittest import TestCase
+
+import numpy as np
+
+from experiment import iter_trials, run_trial, summarize
+
+
+class TestExperiment(TestCase):
+    def test_run_trial(self):
+        result = run_trial(3, np.random.SeedSequence(0), n_steps=10)
+
+        self.assertEqual(result['trial'], 3)
+        self.assertEqual(result['steps'], 10)
+
+        # Same seed -> same trial
+        self.assertDictEqual(result, run_trial(3, np.random.SeedSequence(0), n_steps=10))
+
+    def test_iter_trials(self):
+        serial = sorted(iter_trials(n_trials=4, n_steps=10, seed=1, max_workers=1), key=lambda r: r['trial'])
+        parallel = sorted(iter_trials(n_trials=4, n_steps=10, seed=1, max_workers=2), key=lambda r: r['trial'])
+
+        self.assertListEqual([r['trial'] for r in serial], [0, 1, 2, 3])
+        self.assertListEqual(serial, parallel)
+
+    def test_summarize(self):
+        results = [{'reward': reward, 'wins': 1, 'draws': 2, 'losses': 3} for reward in [1.0, 2.0, 3.0]]
+        summary = summarize(results)
+
+        self.assertEqual(summary['trials'], 3)
+        self.assertAlmostEqual(summary['mean_reward'], 2.0)
+        self.assertLess(summary['ci_low'], 2.0)
+        self.assertGreater(summary['ci_high'], 2.0)
+        self.assertEqual((summary['wins'], summary['draws'], summary['losses']), (3, 6, 9))
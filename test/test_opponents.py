@@ -0,0 +1,80 @@
+from unittest import TestCase
+
+import numpy as np
+
+from gym_tictactoe.envs.board import Board, BitBoard, BLANK, X, O
+from gym_tictactoe.envs.opponents import HeuristicOpponent, PerfectOpponent, RandomOpponent, \
+    get_minimax_table, make_opponent
+from gym_tictactoe.envs.state_table import get_state_table
+
+
+def play(x_policy, o_policy):
+    board = BitBoard()
+    policies = {X: x_policy, O: o_policy}
+    mark = X
+    while not board.has_winner() and not board.is_full():
+        pos = policies[mark](board)
+        assert board.is_blank(pos)
+        board[pos] = mark
+        mark = -mark
+    return board.winner
+
+
+class TestOpponents(TestCase):
+    def test_make_opponent(self):
+        self.assertIsInstance(make_opponent('random'), RandomOpponent)
+        self.assertIsInstance(make_opponent('heuristic'), HeuristicOpponent)
+        self.assertIsInstance(make_opponent('perfect'), PerfectOpponent)
+
+        policy = lambda board: board.blanks[0]
+        self.assertIs(make_opponent(policy), policy)
+
+        with self.assertRaises(ValueError):
+            make_opponent('unknown')
+
+    def test_minimax_values(self):
+        table = get_state_table()
+        minimax = get_minimax_table()
+
+        # Tic-tac-toe is a draw with perfect play
+        self.assertEqual(minimax.values[0], 0)
+        self.assertIs(get_minimax_table(), minimax)
+
+        # O to move must block the top row
+        state = table.index([X, X, BLANK, BLANK, O, BLANK, BLANK, BLANK, BLANK])
+        self.assertListEqual(minimax.optimal_move_lists[state], [2])
+
+    def test_heuristic_completes_and_blocks(self):
+        heuristic = HeuristicOpponent(mark=O)
+        self.assertEqual(heuristic(BitBoard.from_list([X, X, BLANK, O, O, BLANK, X, BLANK, BLANK])), 5)
+        self.assertEqual(heuristic(BitBoard.from_list([X, X, BLANK, BLANK, O, BLANK, BLANK, BLANK, BLANK])), 2)
+        self.assertEqual(heuristic(BitBoard.from_list([X] + [BLANK] * 8)), 4)
+
+    def test_perfect_never_loses(self):
+        rng = np.random.default_rng(0)
+        perfect = PerfectOpponent(mark=O, rng=rng)
+        for opponent in [RandomOpponent(mark=X, rng=rng), HeuristicOpponent(mark=X, rng=rng)]:
+            for game in range(100):
+                self.assertNotEqual(play(opponent, perfect), X)
+
+        self.assertIsNone(play(PerfectOpponent(mark=X, deterministic=True), PerfectOpponent(mark=O)))
+
+    def test_perfect_bitboard_matches_board(self):
+        table = get_state_table()
+        perfect = PerfectOpponent(deterministic=True)
+        for index in np.flatnonzero(~table.is_terminal)[::11]:
+            board = table.board(index)
+            self.assertEqual(perfect(BitBoard.from_list(board)), perfect(Board.from_list(board.astype(np.int64))))
+
+    def test_perfect_unreachable_board(self):
+        perfect = PerfectOpponent(deterministic=True)
+        for board in [BitBoard.from_list([X, X] + [BLANK] * 7), Board.from_list([X, X] + [BLANK] * 7)]:
+            with self.assertRaises(ValueError):
+                perfect(board)
+
+    def test_seeded_choices(self):
+        board = BitBoard.from_list([X] + [BLANK] * 8)
+        for opponent_class in [RandomOpponent, PerfectOpponent]:
+            moves_1 = [opponent_class(rng=np.random.default_rng(42))(board) for i in range(10)]
+            moves_2 = [opponent_class(rng=np.random.default_rng(42))(board) for i in range(10)]
+            self.assertListEqual(moves_1, moves_2)
@@ -0,0 +1,172 @@
+from unittest import TestCase
+
+import numpy as np
+
+from common import PerceptualAssociativeMemory, CognitiveContent, FeelingNode, FeatureDetectorBank, Decay
+
+
+class TestPerceptualAssociativeMemory(TestCase):
+    def setUp(self):
+        self.happy = FeelingNode('happy', valence=1.0)
+        self.sad = FeelingNode('sad', valence=-1.0)
+        self.x_0 = CognitiveContent('X_0')
+        self.pam = PerceptualAssociativeMemory([self.happy, self.sad, self.x_0])
+
+    def test_index(self):
+        self.assertListEqual(self.pam.concepts_with_content('happy'), [self.happy])
+        self.assertListEqual(self.pam.concepts_of_type(FeelingNode), [self.happy, self.sad])
+
+        self.pam.remove_concept(self.happy)
+        self.assertListEqual(self.pam.concepts_with_content('happy'), [])
+        self.assertListEqual(self.pam.content, [self.sad, self.x_0])
+
+        self.pam.clear()
+        self.assertListEqual(self.pam.content, [])
+        self.assertListEqual(self.pam.concepts_of_type(FeelingNode), [])
+
+    def test_remove_same_content(self):
+        # Concepts with equal content are different nodes, and are removed from every index by identity
+        a = CognitiveContent('O_0')
+        b = CognitiveContent('O_0')
+        self.pam.add_concept(a)
+        self.pam.add_concept(b)
+        self.pam.remove_concept(b)
+
+        self.assertTrue(any(c is a for c in self.pam.concepts_of_type(CognitiveContent)))
+        self.assertFalse(any(c is b for c in self.pam.concepts_of_type(CognitiveContent)))
+        self.assertTrue(any(c is a for c in self.pam.concepts_with_content('O_0')))
+        self.assertFalse(any(c is b for c in self.pam.content))
+
+    def test_receive_cue(self):
+        self.assertListEqual(self.pam.receive_cue(CognitiveContent('X_0')), [self.x_0])
+        self.assertListEqual(self.pam.receive_cue(CognitiveContent('O_0')), [])
+        self.assertListEqual(self.pam.receive_cue('X_0'), [])
+        self.assertIsNone(self.pam.receive_cue(None))
+
+    def test_receive_features(self):
+        self.pam.receive_features([CognitiveContent('X_0', current_activation=1.0)])
+        self.assertEqual(self.x_0.current_activation, 1.0)
+
+    def test_receive_feature_activations(self):
+        bank = FeatureDetectorBank(affect_detectors=[('happy', 1.0), ('sad', -1.0)],
+                                   mark_detectors=[('X_0', 0, 1)])
+
+        self.pam.receive_feature_activations(bank.concept_ids, bank.apply((np.array([1]), -1)))
+        self.assertListEqual([c.current_activation for c in self.pam.content], [0.0, 1.0, 1.0])
+
+        # Concepts added after the first call are bound too
+        x_0 = CognitiveContent('X_0')
+        self.pam.add_concept(x_0)
+        self.pam.receive_feature_activations(bank.concept_ids, bank.apply((np.array([0]), 1)))
+        self.assertListEqual([c.current_activation for c in self.pam.content], [1.0, 0.0, 0.0, 0.0])
+
+
+class TestPercept(TestCase):
+    def test_percept(self):
+        happy = FeelingNode('happy', valence=1.0)
+        sad = FeelingNode('sad', valence=-1.0)
+        pam = PerceptualAssociativeMemory([happy, sad], percept_threshold=0.8)
+        self.assertListEqual(pam.percept, [])
+
+        happy.current_activation = 1.0
+        self.assertListEqual(pam.percept, [happy])
+
+        sad.base_level_activation = 0.9
+        happy.current_activation = 0.5
+        self.assertListEqual(pam.percept, [sad])
+
+        pam.percept_threshold = 0.4
+        self.assertListEqual(sorted(pam.percept, key=str), [happy, sad])
+
+        pam.remove_concept(sad)
+        sad.base_level_activation = 0.0
+        self.assertListEqual(pam.percept, [happy])
+
+    def test_matches_full_scan(self):
+        rng = np.random.default_rng(0)
+        concepts = [CognitiveContent('c{}'.format(i)) for i in range(50)]
+        pam = PerceptualAssociativeMemory(concepts)
+
+        for step in range(100):
+            for i in rng.choice(len(concepts), size=5):
+                concepts[i].current_activation = rng.random()
+            Decay(pam.content)
+
+            expected = {id(c) for c in concepts if c.activation > pam.percept_threshold}
+            self.assertSetEqual({id(c) for c in pam.percept}, expected)
+
+
+class TestSpreadingActivation(TestCase):
+    def setUp(self):
+        self.x_0 = CognitiveContent('X_0')
+        self.x_1 = CognitiveContent('X_1')
+        self.line = CognitiveContent('X_line_0')
+        self.threat = FeelingNode('threat', valence=1.0)
+        self.pam = PerceptualAssociativeMemory([self.x_0, self.x_1, self.line, self.threat], spread_decay=1.0,
+                                               spread_depth=2)
+        self.pam.add_link(self.x_0, self.line, 0.5)
+        self.pam.add_link(self.x_1, self.line, 0.5)
+        self.pam.add_link(self.line, self.threat, 1.0)
+
+    def test_spread(self):
+        self.x_0.current_activation = 1.0
+        self.x_1.current_activation = 1.0
+        self.pam.spread_activation()
+
+        self.assertAlmostEqual(self.line.current_activation, 1.0)
+        self.assertAlmostEqual(self.threat.current_activation, 1.0)
+        self.assertListEqual(self.pam.percept, [self.x_0, self.x_1, self.line, self.threat])
+
+    def test_depth_and_decay(self):
+        self.pam.spread_depth = 1
+        self.pam.spread_decay = 0.5
+        self.x_0.current_activation = 1.0
+        self.pam.spread_activation()
+
+        self.assertAlmostEqual(self.line.current_activation, 0.25)
+        self.assertAlmostEqual(self.threat.current_activation, 0.0)
+
+    def test_spreading_does_not_accumulate(self):
+        self.x_0.current_activation = 1.0
+        for cycle in range(3):
+            self.pam.spread_activation()
+        self.assertAlmostEqual(self.line.current_activation, 0.5)
+
+        self.x_0.current_activation = 0.0
+        self.pam.spread_activation()
+        self.assertAlmostEqual(self.line.current_activation, 0.0)
+        self.assertAlmostEqual(self.threat.current_activation, 0.0)
+
+    def test_spreading_with_features(self):
+        # Feature activations replace the activation of concepts every cycle, including what they received from
+        # spreading in the previous cycle
+        x_0 = CognitiveContent('X_0')
+        happy = FeelingNode('happy', valence=1.0)
+        pam = PerceptualAssociativeMemory([x_0, happy], spread_decay=1.0, spread_depth=1)
+        pam.add_link(x_0, happy, 0.5)
+        bank = FeatureDetectorBank(affect_detectors=[('happy', 1.0)], mark_detectors=[('X_0', 0, 1)])
+
+        for reward in [0.2, 0.2, 0.2]:
+            pam.receive_feature_activations(bank.concept_ids, bank.apply((np.array([1]), reward)))
+            pam.spread_activation()
+            self.assertAlmostEqual(x_0.current_activation, 1.0)
+            self.assertAlmostEqual(happy.current_activation, 0.7)
+
+        pam.receive_features([CognitiveContent('X_0', current_activation=0.4)])
+        pam.spread_activation()
+        self.assertAlmostEqual(x_0.current_activation, 0.4)
+        self.assertAlmostEqual(happy.current_activation, 0.4)
+
+    def test_links(self):
+        with self.assertRaises(ValueError):
+            self.pam.add_link(self.x_0, CognitiveContent('O_0'))
+
+        self.pam.remove_link(self.line, self.threat)
+        self.pam.remove_concept(self.x_1)
+        self.assertListEqual(self.pam.links, [(self.x_0, self.line, 0.5)])
+
+        # Concepts with equal content are different nodes
+        other = CognitiveContent('X_0')
+        self.pam.add_concept(other)
+        self.pam.remove_concept(other)
+        self.assertTrue(any(concept is self.x_0 for concept in self.pam.content))
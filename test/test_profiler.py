@@ -0,0 +1,66 @@
+import csv
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from agent import Agent
+from profiler import CycleProfiler
+from gym_tictactoe.envs import TicTacToeEnv
+
+
+class TestCycleProfiler(TestCase):
+    def test_stage(self):
+        profiler = CycleProfiler()
+        for cycle in range(3):
+            profiler.cycle = cycle
+            with profiler.stage('a'):
+                sum(range(1000))
+            with profiler.stage('b'):
+                pass
+            with profiler.stage('b'):
+                pass
+
+        totals = profiler.totals()
+        self.assertListEqual(profiler.stages, ['a', 'b'])
+        self.assertEqual(totals['a']['calls'], 3)
+        self.assertEqual(totals['b']['calls'], 6)
+        self.assertGreater(totals['a']['wall'], 0.0)
+        self.assertListEqual(list(profiler.per_cycle('b')), [0, 1, 2])
+
+    def test_agent_stages(self):
+        profiler = CycleProfiler()
+        agent = Agent(rng=0, profiler=profiler)
+        env = TicTacToeEnv()
+        env.seed(0)
+        env.reset()
+        agent.run(env, n=10, render=False)
+
+        totals = profiler.totals()
+        for stage in ['sensory_memory', 'pam', 'csm', 'cueing', 'attention_codelets', 'coalition_manager',
+                      'global_workspace', 'procedural_memory', 'action_selection', 'procedural_learning', 'decay',
+                      'forget', 'garbage_collector']:
+            self.assertEqual(totals[stage]['calls'], 10)
+        self.assertSetEqual({record.cycle for record in profiler.records}, set(range(10)))
+        self.assertIn('garbage_collector', profiler.summary())
+
+    def test_export(self):
+        profiler = CycleProfiler()
+        with profiler.stage('a'):
+            pass
+
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = os.path.join(directory, 'timings.json')
+            csv_path = os.path.join(directory, 'timings.csv')
+            profiler.to_json(json_path)
+            profiler.to_csv(csv_path)
+
+            with open(json_path) as file:
+                timings = json.load(file)
+            self.assertEqual(timings['totals']['a']['calls'], 1)
+            self.assertEqual(timings['records'][0]['stage'], 'a')
+
+            with open(csv_path) as file:
+                rows = list(csv.reader(file))
+            self.assertListEqual(rows[0], ['cycle', 'stage', 'wall', 'cpu'])
+            self.assertEqual(rows[1][1], 'a')
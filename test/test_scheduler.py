@@ -0,0 +1,75 @@
+import asyncio
+import concurrent.futures
+from unittest import TestCase
+
+from agent import Agent
+from events import CycleStarted, CycleEnded
+from scheduler import AsyncScheduler, SyncScheduler, make_scheduler
+from gym_tictactoe.envs import TicTacToeEnv
+
+
+def make_env(seed=0):
+    environment = TicTacToeEnv()
+    environment.seed(seed)
+    environment.reset()
+    return environment
+
+
+class AsyncEnv:
+    def __init__(self, environment):
+        self.environment = environment
+        self.steps = 0
+
+    async def step(self, action):
+        await asyncio.sleep(0.001)
+        self.steps += 1
+        return self.environment.step(action)
+
+
+class TestSyncScheduler(TestCase):
+    def test_matches_agent_run(self):
+        agent_1 = Agent(rng=0)
+        result_1 = agent_1.run(make_env(), n=30, render=False)
+
+        agent_2 = Agent(rng=0)
+        result_2 = make_scheduler(agent_2, make_env(), mode='sync').run(n=30)
+
+        self.assertEqual(result_1, result_2)
+        self.assertEqual(agent_1.motor_command, agent_2.motor_command)
+        self.assertListEqual([s.base_level_activation for s in agent_1.procedural_memory.content],
+                             [s.base_level_activation for s in agent_2.procedural_memory.content])
+
+
+class TestAsyncScheduler(TestCase):
+    def test_run(self):
+        agent = Agent(rng=0)
+        started, ended = [], []
+        agent.events.subscribe(CycleStarted, lambda event: started.append(event.cycle))
+        agent.events.subscribe(CycleEnded, lambda event: ended.append(event.cycle))
+
+        scheduler = AsyncScheduler(agent, make_env(), periods={'environment': 0.001, 'housekeeping': 0.001})
+        steps, reward = scheduler.run(n=20)
+
+        self.assertEqual(steps, 20)
+        self.assertEqual(scheduler.ticks['environment'], 20)
+        self.assertGreater(scheduler.ticks['perception'], 0)
+        self.assertGreater(scheduler.ticks['action'], 0)
+        self.assertListEqual(started, ended)
+        self.assertEqual(agent.cycle, len(ended))
+        self.assertIsNotNone(agent.motor_command)
+
+    def test_async_environment_and_executor(self):
+        agent = Agent(rng=0)
+        environment = AsyncEnv(make_env())
+        with concurrent.futures.ThreadPoolExecutor(1) as executor:
+            steps, _ = AsyncScheduler(agent, environment, periods={'environment': 0.001}, executor=executor).run(n=10)
+
+        self.assertEqual(steps, 10)
+        self.assertEqual(environment.steps, 10)
+
+    def test_invalid_options(self):
+        with self.assertRaises(ValueError):
+            AsyncScheduler(Agent(), make_env(), periods={'unknown': 1.0})
+        with self.assertRaises(ValueError):
+            make_scheduler(Agent(), make_env(), mode='threads')
+        self.assertIsInstance(make_scheduler(Agent(), make_env()), SyncScheduler)
@@ -1,5 +1,8 @@
 from unittest import TestCase
 
+import numpy as np
+
+from agent import create_feature_detectors, create_feature_detector_bank
 from common import SensoryMemory
 
 
@@ -32,3 +35,42 @@ class TestSensoryMemory(TestCase):
                 self.assertEqual(expected, actual)
         except Exception as e:
             self.fail(e)
+
+
+class TestFeatureDetectorBank(TestCase):
+    def setUp(self):
+        self.bank = create_feature_detector_bank()
+        self.detectors = create_feature_detectors()
+
+    def test_matches_feature_detectors(self):
+        rng = np.random.default_rng(0)
+        for reward in [-1, -0.1, 0, 1]:
+            obs = rng.integers(-1, 2, size=9)
+            activations = self.bank.apply((obs, reward))
+
+            self.assertListEqual(self.bank.concepts, [fd.concept for fd in self.detectors])
+            self.assertListEqual(activations.tolist(),
+                                 [fd.apply((obs, reward)).current_activation for fd in self.detectors])
+
+    def test_sensory_memory(self):
+        sm = SensoryMemory(feature_detectors=self.bank)
+        sm.receive_sensors(([1, 0, 0, 0, -1, 0, 0, 0, 0], 1))
+
+        features = sm.detected_features
+        self.assertIs(features, sm.detected_features)
+        self.assertIs(sm.sensory_scene.observation, features)
+        self.assertListEqual([str(f) for f in features], ['happy', 'X_0'] + ['B_{}'.format(pos) for pos in [1, 2, 3]]
+                             + ['O_4'] + ['B_{}'.format(pos) for pos in [5, 6, 7, 8]])
+        self.assertEqual(sm.feature_activations[self.bank.concept_ids['happy']], 1.0)
+
+    def test_build_sensory_scene(self):
+        sm = SensoryMemory(feature_detectors=self.bank)
+        sm.receive_sensors(([1, 0, 0, 0, -1, 0, 0, 0, 0], 1))
+
+        scene = sm.build_sensory_scene()
+        self.assertIs(scene, sm.sensory_scene)
+        self.assertIs(scene, sm.build_sensory_scene())
+        self.assertIs(scene.observation, sm.detected_features)
+
+        sm.receive_sensors(([0, 0, 0, 0, 0, 0, 0, 0, 0], 0))
+        self.assertIsNot(sm.build_sensory_scene(), scene)
@@ -0,0 +1,57 @@
+from unittest import TestCase
+
+import numpy as np
+
+from gym_tictactoe.envs.board import BitBoard, BLANK, X, O
+from gym_tictactoe.envs.state_table import get_state_table, SYMMETRIES
+
+
+class TestStateTable(TestCase):
+    def setUp(self):
+        self.table = get_state_table()
+
+    def test_counts(self):
+        self.assertEqual(len(self.table), 5478)
+        self.assertEqual(self.table.n_canonical_states, 765)
+        self.assertEqual(self.table.index([BLANK] * 9), 0)
+
+    def test_shared(self):
+        self.assertIs(get_state_table(), self.table)
+
+    def test_index_round_trip(self):
+        indices = self.table.index(self.table.boards)
+        self.assertTrue(np.array_equal(indices, np.arange(len(self.table))))
+
+        # Unreachable board (two more X's than O's)
+        self.assertEqual(self.table.index([X, X, BLANK] + [BLANK] * 6), -1)
+
+    def test_index_of_masks(self):
+        for index in range(len(self.table)):
+            board = BitBoard.from_list(self.table.board(index))
+            self.assertEqual(self.table.index_of_masks(board.x_mask, board.o_mask), index)
+
+        self.assertEqual(self.table.index_of_masks(0b11, 0), -1)
+
+    def test_terminal_status(self):
+        for index in range(0, len(self.table), 7):
+            board = BitBoard.from_list(self.table.board(index))
+            self.assertEqual(self.table.winner[index], board.winner or BLANK)
+            self.assertEqual(self.table.is_draw[index], board.is_draw())
+            self.assertEqual(self.table.is_terminal[index], board.has_winner() or board.is_full())
+
+    def test_successors(self):
+        index = self.table.index([X, O, BLANK, BLANK, X, BLANK, BLANK, BLANK, BLANK])
+        self.assertEqual(self.table.to_move[index], O)
+
+        successor = self.table.successors[index, 8]
+        self.assertEqual(list(self.table.board(successor)), [X, O, BLANK, BLANK, X, BLANK, BLANK, BLANK, O])
+        self.assertEqual(self.table.successors[index, 0], -1)
+
+        # No successors from terminal states
+        self.assertTrue(np.all(self.table.successors[self.table.is_terminal] == -1))
+
+    def test_canonical_index(self):
+        board = np.array([X, BLANK, BLANK, BLANK, O, BLANK, BLANK, BLANK, BLANK])
+        canonical = self.table.canonical_index(board)
+        for symmetry in SYMMETRIES:
+            self.assertEqual(self.table.canonical_index(board[symmetry]), canonical)
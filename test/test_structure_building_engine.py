@@ -0,0 +1,59 @@
+import concurrent.futures
+from unittest import TestCase
+
+from common import StructureBuildingCodelet, StructureBuildingEngine, CurrentSituationalModel, CognitiveContent, \
+    GarbageCollector
+
+
+def line_codelet(mark):
+    # Builds a line node from mark nodes on the top row
+    return StructureBuildingCodelet(select=lambda x: str(x) in ['{}_{}'.format(mark, pos) for pos in range(3)],
+                                    transform=lambda x: CognitiveContent('{}_line'.format(mark), current_activation=1.0))
+
+
+class TestStructureBuildingEngine(TestCase):
+    def setUp(self):
+        self.x_codelet = line_codelet('X')
+        self.o_codelet = line_codelet('O')
+        self.engine = StructureBuildingEngine([self.x_codelet, self.o_codelet])
+        self.csm = CurrentSituationalModel()
+
+    def test_run(self):
+        self.csm.receive_content([CognitiveContent('X_0', current_activation=1.0)])
+        structures = self.engine.run(self.csm)
+
+        self.assertListEqual([str(s) for s in structures], ['X_line'])
+        self.assertIsNotNone(self.csm.content.get('X_line'))
+
+    def test_dirty_tracking(self):
+        self.csm.receive_content([CognitiveContent('X_0', current_activation=1.0)])
+        self.engine.run(self.csm)
+        self.assertListEqual(self.engine.last_run, [self.x_codelet, self.o_codelet])
+
+        # Nothing changed (re-received content is merged)
+        self.csm.receive_content([CognitiveContent('X_0', current_activation=1.0)])
+        self.engine.run(self.csm)
+        self.assertListEqual(self.engine.last_run, [])
+
+        # Only the codelet selecting the new content runs
+        self.csm.receive_content([CognitiveContent('O_1', current_activation=1.0)])
+        self.engine.run(self.csm)
+        self.assertListEqual(self.engine.last_run, [self.o_codelet])
+
+        # A removed structure is rebuilt
+        self.csm.content.get('X_line').current_activation = 0.0
+        GarbageCollector(self.csm, 'current_activation')
+        self.engine.run(self.csm)
+        self.assertListEqual(self.engine.last_run, [self.x_codelet])
+        self.assertIsNotNone(self.csm.content.get('X_line'))
+
+    def test_executor(self):
+        self.csm.receive_content([CognitiveContent('X_0'), CognitiveContent('O_0')])
+        with concurrent.futures.ThreadPoolExecutor(2) as executor:
+            self.engine.executor = executor
+            structures = self.engine.run(self.csm)
+
+        self.assertListEqual([str(s) for s in structures], ['X_line', 'O_line'])
+
+    def test_no_codelets(self):
+        self.assertListEqual(StructureBuildingEngine().run(self.csm), [])
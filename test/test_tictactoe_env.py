@@ -0,0 +1,103 @@
+import random
+from unittest import TestCase
+
+import numpy as np
+
+from gym_tictactoe.envs.board import Board, BitBoard, X, O
+from gym_tictactoe.envs.tictactoe_env import TicTacToeEnv, COMMENT_ILLEGAL, COMMENT_NO_ACTION, COMMENT_NONE
+
+
+class TestTicTacToeEnv(TestCase):
+    def test_step(self):
+        env = TicTacToeEnv()
+        env.reset()
+
+        obs, reward, done, info = env.step(None)
+        self.assertEqual(info['comment'], 'No action taken')
+
+        obs, reward, done, info = env.step(('move', 4))
+        self.assertEqual(obs[4], X)
+        self.assertEqual(np.sum(obs == O), 1)
+        self.assertEqual(info['board'], str(env._board))
+
+        obs, reward, done, info = env.step(('move', 4))
+        self.assertEqual(reward, env.illegal_move)
+        self.assertEqual(info['comment'], 'illegal action')
+
+    def test_games(self):
+        random.seed(0)
+        for board_class in [Board, BitBoard]:
+            env = TicTacToeEnv(board_class=board_class)
+            for game in range(50):
+                env.reset()
+                done = False
+                while not done:
+                    obs, reward, done, info = env.step(('move', random.choice(env._board.blanks)))
+
+                self.assertIn(info['comment'], ['player wins', 'opponent wins', 'draw'])
+
+    def test_seed(self):
+        boards = []
+        for seed in [7, 7, np.random.SeedSequence(7).spawn(1)[0], np.random.SeedSequence(7).spawn(1)[0]]:
+            env = TicTacToeEnv()
+            env.seed(seed)
+            env.reset()
+            env.step(('move', 0))
+            env.step(('move', 4))
+            boards.append(list(env._board.asarray()))
+
+        self.assertListEqual(boards[0], boards[1])
+        self.assertListEqual(boards[2], boards[3])
+
+    def test_fast_mode(self):
+        env = TicTacToeEnv(fast=True)
+        env.reset()
+        buffer = np.zeros(9, dtype=np.int64)
+
+        obs, reward, done, info = env.step(None, out=buffer)
+        self.assertIs(obs, buffer)
+        self.assertEqual(info.code, COMMENT_NO_ACTION)
+
+        obs, reward, done, info = env.step(('move', 0), out=buffer)
+        self.assertIs(obs, buffer)
+        self.assertEqual(obs[0], X)
+        self.assertEqual(info['code'], COMMENT_NONE)
+
+        # Board string is formatted from the board as it was at the end of the step; the info is reused by the next
+        # step, so it is copied to be kept
+        self.assertEqual(info['board'], str(env._board))
+        kept = dict(info)
+        _, _, _, next_info = env.step(('move', random.choice(env._board.blanks)), out=buffer)
+        self.assertIs(next_info, info)
+        self.assertNotEqual(kept['board'], str(env._board))
+
+        obs, reward, done, info = env.step(('move', 0))
+        self.assertIsNot(obs, buffer)
+        self.assertEqual(info.code, COMMENT_ILLEGAL)
+        self.assertEqual(info['comment'], 'illegal action')
+        self.assertSetEqual(set(info), {'board', 'done', 'comment', 'code'})
+
+
+class TestRender(TestCase):
+    def test_ansi(self):
+        env = TicTacToeEnv()
+        env.reset()
+        env.step(('move', 4))
+        self.assertEqual(env.render(mode='ansi'), str(env._board))
+
+    def test_rgb_array(self):
+        try:
+            import pygame
+        except ImportError:
+            self.skipTest('pygame is not installed')
+
+        env = TicTacToeEnv()
+        env.reset()
+        blank_frame = env.render(mode='rgb_array')
+        self.assertEqual(blank_frame.ndim, 3)
+        self.assertEqual(blank_frame.dtype, np.uint8)
+
+        env.step(('move', 4))
+        frame = env.render(mode='rgb_array')
+        self.assertEqual(frame.shape, blank_frame.shape)
+        self.assertFalse(np.array_equal(frame, blank_frame))
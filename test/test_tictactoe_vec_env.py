@@ -0,0 +1,65 @@
+from unittest import TestCase
+
+import numpy as np
+
+from gym_tictactoe.envs.board import BitBoard, BLANK, X, O
+from gym_tictactoe.envs.tictactoe_vec_env import TicTacToeVecEnv
+
+
+class TestTicTacToeVecEnv(TestCase):
+    def test_reset(self):
+        env = TicTacToeVecEnv(n_envs=4)
+        obs = env.reset()
+        self.assertEqual(obs.shape, (4, 9))
+        self.assertTrue(np.all(obs == BLANK))
+
+    def test_illegal_action(self):
+        env = TicTacToeVecEnv(n_envs=2)
+        env.reset()
+        obs, rewards, dones, info = env.step([4, 4])
+
+        # Replaying an occupied position (or one off the board) is illegal and leaves the board unchanged
+        obs, rewards, dones, info = env.step([4, 9])
+        self.assertTrue(np.all(info['illegal']))
+        self.assertTrue(np.all(rewards == env.illegal_move))
+        self.assertFalse(np.any(dones))
+        self.assertTrue(np.all(np.sum(obs != BLANK, axis=1) == 2))
+
+    def test_random_games(self):
+        np.random.seed(0)
+        env = TicTacToeVecEnv(n_envs=64)
+        env.seed(0)
+        obs = env.reset()
+        n_done = 0
+        for step in range(20):
+            actions = [np.random.choice(np.flatnonzero(board == BLANK)) for board in obs]
+            obs, rewards, dones, info = env.step(actions)
+
+            for terminal, reward, done in zip(info['terminal_observation'], rewards, dones):
+                board = BitBoard.from_list(terminal)
+                if not done:
+                    self.assertFalse(board.has_winner())
+                    self.assertFalse(board.is_full())
+                elif reward == env.win_reward:
+                    self.assertEqual(board.winner, X)
+                elif reward == env.lose_reward:
+                    self.assertEqual(board.winner, O)
+                else:
+                    self.assertTrue(board.is_draw())
+
+            # Finished games are reset automatically
+            self.assertTrue(np.all(obs[dones] == BLANK))
+            n_done += np.sum(dones)
+
+        self.assertGreater(n_done, 64)
+
+    def test_seed(self):
+        trajectories = []
+        for run in range(2):
+            env = TicTacToeVecEnv(n_envs=8)
+            env.seed(123)
+            env.reset()
+            trajectories.append([env.step(np.full(8, step))[0] for step in range(9)])
+
+        for obs_1, obs_2 in zip(*trajectories):
+            self.assertTrue(np.array_equal(obs_1, obs_2))
@@ -0,0 +1,64 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+import checkpoint
+from agent import Agent
+from tournament import round_robin, play_game, play_match, elo_ratings, format_result, parse_agent, \
+    agent_entrant, checkpoint_entrant, policy_entrant, parse_args, PolicyPlayer
+
+
+class TestTournament(TestCase):
+    def test_play_game(self):
+        perfect = PolicyPlayer('perfect', np.random.default_rng(0))
+        for game in range(4):
+            self.assertEqual(play_game(perfect, perfect), 0)
+
+    def test_play_match_swaps_sides(self):
+        match = play_match(0, 1, policy_entrant('perfect'), policy_entrant('random'), 6, np.random.SeedSequence(0))
+        self.assertEqual(len(match['outcomes']), 6)
+        self.assertNotIn(-1, match['outcomes'])
+
+    def test_round_robin(self):
+        entrants = [agent_entrant('agent'), policy_entrant('random'), policy_entrant('perfect')]
+        serial = round_robin(entrants, n_games=4, seed=0, max_workers=1)
+        parallel = round_robin(entrants, n_games=4, seed=0, max_workers=2)
+
+        self.assertListEqual(serial.names, ['agent', 'random', 'perfect'])
+        np.testing.assert_array_equal(serial.wins, parallel.wins)
+        np.testing.assert_array_equal(serial.wins + serial.draws + serial.losses, 4 * (1 - np.eye(3)))
+        np.testing.assert_array_equal(serial.losses, serial.wins.T)
+        self.assertAlmostEqual(serial.ratings.sum(), 3 * 1500.0)
+        self.assertEqual(serial.wins[1, 2], 0)
+        self.assertIn('perfect', format_result(serial))
+
+    def test_checkpoint_entrant(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'trained.npz')
+            checkpoint.save(Agent(rng=0), path)
+
+            result = round_robin([checkpoint_entrant(path), policy_entrant('random')], n_games=2, seed=0,
+                                 max_workers=1)
+            self.assertListEqual(result.names, ['trained', 'random'])
+
+    def test_elo_ratings(self):
+        ratings = elo_ratings(2, [{'i': 0, 'j': 1, 'outcomes': [1, 1, 0]}])
+        self.assertGreater(ratings[0], ratings[1])
+        self.assertAlmostEqual(ratings.sum(), 3000.0)
+
+    def test_parse_agent(self):
+        entrant = parse_agent('strict:activation_threshold=0.8')
+        self.assertEqual(entrant.name, 'strict')
+        self.assertDictEqual(entrant.config, {'activation_threshold': 0.8})
+
+    def test_parse_args_entrants(self):
+        self.assertListEqual(parse_args([]).policy, [])
+        self.assertListEqual(parse_args(['--policy', 'random', '--policy', 'perfect']).policy, ['random', 'perfect'])
+        with self.assertRaises(SystemExit):
+            parse_args(['--policy', 'random'])
+
+    def test_unique_names(self):
+        with self.assertRaises(ValueError):
+            round_robin([policy_entrant('random'), policy_entrant('random')], max_workers=1)